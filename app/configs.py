@@ -1,12 +1,146 @@
 import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bundled data files resolve against the project root, so the server can be started from any directory
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 
 class Config:
     """Base configuration"""
     DEBUG = False
     TESTING = False
-    YFINANCE_CACHE_TTL = 300  # Cache stock data for 5 minutes
+    # StockInfo field groups, refreshed independently
+    STOCK_PROFILE_TTL = 24 * 3600  # Name, exchange, sector, industry
+    STOCK_FUNDAMENTALS_TTL = 3600  # Market cap, ratios, 52-week range, previous close
+    STOCK_QUOTE_TTL = 5  # Price, volume, day range
+    # How long past its TTL each group may still be served while one background refresh runs
+    STOCK_PROFILE_STALE_TTL = 7 * 24 * 3600
+    STOCK_FUNDAMENTALS_STALE_TTL = 24 * 3600
+    STOCK_QUOTE_STALE_TTL = 60
     NEWS_CACHE_TTL = 1800  # Cache news for 30 minutes
-    
+    NEWS_RESPONSE_TTL = 60  # Seconds clients may reuse a fully summarized /api/news response (Cache-Control max-age)
+    BATCH_MAX_SYMBOLS = 300  # Symbols accepted by POST /api/stocks/batch
+    POPULAR_SYMBOLS = [
+        "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
+        "HINDUNILVR.NS", "ITC.NS", "KOTAKBANK.NS", "LT.NS", "BAJFINANCE.NS"
+    ]
+
+    # Exchange trading holidays, {"NSE": ["YYYY-MM-DD", ...], "BSE": [...]}; update from the yearly exchange circular
+    MARKET_HOLIDAYS_FILE = os.getenv("MARKET_HOLIDAYS_FILE", os.path.join(DATA_DIR, "market_holidays.json"))
+
+    # Symbol master: NSE/BSE listing files (data/symbols.csv format, or the exchanges' own equity lists)
+    SYMBOL_MASTER_FILES = [
+        path for path in os.getenv("SYMBOL_MASTER_FILES", os.path.join(DATA_DIR, "symbols.csv")).split(os.pathsep) if path
+    ]
+    SYMBOL_MASTER_STRICT = os.getenv("SYMBOL_MASTER_STRICT", "false").lower() == "true"  # Reject unlisted tickers outright
+    SYMBOL_NEGATIVE_TTL = 6 * 3600  # Seconds an unknown ticker is answered with 404 without asking yfinance
+    SYMBOL_SEARCH_LIMIT = 10
+
+    # Startup cache warm-up: POPULAR_SYMBOLS plus the previous run's most-requested symbols
+    CACHE_WARMUP_ENABLED = os.getenv("CACHE_WARMUP", "false").lower() == "true"
+    CACHE_WARMUP_TOP_SYMBOLS = 20
+    SYMBOL_USAGE_FILE = os.getenv("SYMBOL_USAGE_FILE", os.path.join(DATA_DIR, "symbol_usage.json"))  # Written on shutdown
+    SYMBOL_USAGE_MAX_TRACKED = 5000  # Distinct symbols counted per run
+
+    # Live quote stream (/api/stocks/stream)
+    STREAM_POLL_INTERVAL = 5  # Seconds between upstream refreshes of all subscribed symbols
+    STREAM_QUEUE_SIZE = 100  # Messages buffered per client before it is resynced with a snapshot
+    STREAM_MAX_SYMBOLS = 300  # Symbols one client may subscribe to
+
+    # On-disk OHLCV bar store
+    BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", os.path.join(DATA_DIR, "bars"))
+    BAR_REFRESH_INTERVAL = {"1m": 30, "5m": 60, "15m": 120, "30m": 300, "1h": 600, "1d": 3600, "1wk": 6 * 3600}
+    BAR_RETENTION = {"1m": 8 * 86400}  # Seconds of bars kept per interval (unlisted: kept forever); yfinance serves 7 days of 1m bars
+
+    # Technical indicators
+    INDICATOR_LOOKBACK = 300  # Bars per symbol fed to the indicator engine
+    INDICATOR_CACHE_TTL = 24 * 3600  # Keyed by last bar, so new bars miss the cache anyway
+
+    # Portfolio analytics (/api/portfolio/analyze)
+    PORTFOLIO_BENCHMARK = "^NSEI"
+    PORTFOLIO_LOOKBACK_DAYS = 252  # Trading days of daily returns
+    PORTFOLIO_MIN_HISTORY = 20  # Daily returns a holding needs to count towards volatility, correlation and beta
+    TRADING_DAYS_PER_YEAR = 252
+
+    # Shared L2 cache (Redis protocol); enabled when REDIS_URL or REDIS_HOST is set
+    REDIS_URL = os.getenv("REDIS_URL")
+    REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+    REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+    REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+    REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+    REDIS_ENABLED = bool(os.getenv("REDIS_URL") or os.getenv("REDIS_HOST"))
+    REDIS_SOCKET_TIMEOUT = 0.5
+    CACHE_KEY_PREFIX = "market-mentor:"
+    CACHE_L1_TTL = 30  # Max seconds a worker keeps its local copy when L2 is on
+    # In-process L1 limits
+    CACHE_MAX_ENTRIES = 50000
+    CACHE_MAX_BYTES = 256 * 1024 * 1024  # Estimated from value sizes
+    CACHE_SHARDS = 16  # Independently locked partitions
+    CACHE_ADMISSION_POLICY = "tinylfu"  # "lru" admits every new key; "tinylfu" keeps frequently used keys
+    CACHE_XFETCH_BETA = 1.0  # >1 refreshes hot keys earlier, 0 disables early expiration
+
+    # Blocking upstream calls run on one bounded thread pool per dependency
+    UPSTREAM_MAX_WORKERS = {"yfinance": 16, "groq": 8, "rss": 8, "article": 16, "embedding": 2, "compute": 2, "redis": 8}
+    UPSTREAM_DEFAULT_WORKERS = 4
+
+    # Groq client: sized to the account quota
+    GROQ_REQUESTS_PER_MINUTE = 30
+    GROQ_BURST = 5
+    GROQ_MAX_RETRIES = 3
+    GROQ_BASE_BACKOFF = 0.5  # Seconds, doubled per attempt (with jitter)
+    GROQ_MAX_BACKOFF = 20
+    GROQ_TIMEOUT = 30
+    GROQ_QUEUE_TIMEOUT = 30  # Max seconds a request waits for the rate limiter
+
+    # LLM answer cache: exact matches in the shared cache, near-duplicates in a per-worker index
+    LLM_ANSWER_CACHE_TTL = 6 * 3600
+    LLM_SEMANTIC_CACHE_ENABLED = os.getenv("LLM_SEMANTIC_CACHE", "false").lower() == "true"
+    LLM_SEMANTIC_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    LLM_SEMANTIC_THRESHOLD = 0.92  # Cosine similarity needed to reuse an answer
+    LLM_SEMANTIC_MAX_PER_SYMBOL = 500
+
+    # News summarization
+    NEWS_SUMMARY_MODE = "async"  # "async": return news at once and fill summaries in later; "sync": wait for them
+    SUMMARY_BATCH_SIZE = 8  # Articles per Groq request
+    SUMMARY_BATCH_WAIT = 0.2  # Seconds the background queue waits to fill a batch
+    SUMMARY_INPUT_CHARS = 2000  # Article text sent to the LLM (full text when extracted, else the feed blurb)
+    SUMMARY_CACHE_TTL = 7 * 24 * 3600  # Summaries keyed by content hash
+    SUMMARY_BACKEND = os.getenv("SUMMARY_BACKEND", "groq").lower()  # "groq" or "local" (CPU model below)
+    LOCAL_SUMMARY_MODEL = os.getenv("LOCAL_SUMMARY_MODEL", "sshleifer/distilbart-cnn-6-6")
+    LOCAL_SUMMARY_THREADS = int(os.getenv("LOCAL_SUMMARY_THREADS", "4"))  # torch intra-op threads
+    LOCAL_SUMMARY_QUANTIZE = os.getenv("LOCAL_SUMMARY_QUANTIZE", "true").lower() == "true"  # int8 dynamic quantization
+    LOCAL_SUMMARY_MAX_BATCH = 8  # Articles per padded generate() call
+    LOCAL_SUMMARY_BATCH_WAIT = 0.01  # Seconds the batcher waits for more articles after the first
+    LOCAL_SUMMARY_INPUT_TOKENS = 512
+    LOCAL_SUMMARY_MAX_TOKENS = 96
+    LOCAL_SUMMARY_BEAMS = 2
+
+    # Background news ingestion
+    NEWS_INGESTION_ENABLED = True
+    NEWS_INGEST_TICK = 5  # Seconds between checks for feeds that are due
+    NEWS_STORE_MAX_ARTICLES = 5000
+    FEED_FETCH_TIMEOUT = 8  # Default per-source deadline in seconds
+    NEWS_FEEDS = [
+        {"name": "Economic Times", "url": "https://economictimes.indiatimes.com/markets/stocks/rssfeeds/2146842.cms", "interval": 300},
+        {"name": "Moneycontrol", "url": "http://www.moneycontrol.com/rss/results.xml", "interval": 300},
+        {"name": "Business Standard", "url": "https://www.business-standard.com/rss/markets-106.rss", "interval": 300},
+    ]
+    # Google News is searched per tracked symbol
+    GOOGLE_NEWS_URL = "https://news.google.com/rss/search?q={query}+stock+share+price&hl=en-IN&gl=IN&ceid=IN:en"
+    GOOGLE_NEWS_INTERVAL = 900
+    NEWS_MAX_TRACKED_SYMBOLS = 200  # Requested symbols indexed (and searched on Google News) beyond POPULAR_SYMBOLS, least recently used dropped first
+    NEWS_DUPLICATE_DISTANCE = 3  # Max differing SimHash bits for two stories to be folded into one
+
+    # Full-text extraction of tagged articles, before they are summarized
+    ARTICLE_EXTRACTION_ENABLED = True
+    ARTICLE_EXTRACTION_BATCH = 20  # Pages fetched per ingestion tick
+    ARTICLE_PER_DOMAIN_LIMIT = 2  # Concurrent page fetches per host
+    ARTICLE_FETCH_TIMEOUT = 10
+    ARTICLE_MAX_BYTES = 2 * 1024 * 1024  # Pages are cut off here; the article body comes early
+    ARTICLE_SKIP_DOMAINS = ["news.google.com"]  # Links that only redirect via JavaScript
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -15,11 +149,12 @@ class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
+    REDIS_ENABLED = False
     
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
-    YFINANCE_CACHE_TTL = 600  # Cache stock data for 10 minutes in production
+    STOCK_QUOTE_TTL = 10  # Fewer quote refreshes in production
     
 # Configuration dictionary
 config_dict = {
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+from app.configs import active_config
+
+class Holding(BaseModel):
+    symbol: str
+    quantity: float = Field(..., gt=0)
+    cost: float = Field(..., ge=0, description="Average purchase price per share")
+
+class PortfolioRequest(BaseModel):
+    holdings: List[Holding] = Field(..., min_length=1, max_length=active_config.BATCH_MAX_SYMBOLS)
+    lookback: int = Field(active_config.PORTFOLIO_LOOKBACK_DAYS, ge=20, le=1250, description="Trading days of daily returns")
+
+class HoldingAnalysis(BaseModel):
+    symbol: str
+    quantity: float
+    cost: float
+    price: Optional[float] = None
+    value: Optional[float] = None
+    weight: Optional[float] = None  # Share of the portfolio's current value
+    pnl: Optional[float] = None
+    pnl_percent: Optional[float] = None
+    volatility: Optional[float] = None  # Annualized, from daily returns
+    beta: Optional[float] = None
+    error: Optional[str] = None
+
+class DailyReturn(BaseModel):
+    date: date
+    value: float  # Closing value of the current holdings
+    daily_return: float
+
+class CorrelationMatrix(BaseModel):
+    symbols: List[str]
+    matrix: List[List[Optional[float]]]
+
+class PortfolioAnalysis(BaseModel):
+    benchmark: str
+    as_of: Optional[date] = None  # Last close in the return series
+    value: float
+    cost: float
+    pnl: float
+    pnl_percent: Optional[float] = None
+    volatility: Optional[float] = None
+    beta: Optional[float] = None
+    returns: List[DailyReturn]
+    correlation: CorrelationMatrix
+    holdings: List[HoldingAnalysis]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 class APIResponse(BaseModel):
     success: bool
     data: Optional[Any] = None
+    meta: Optional[Dict[str, Any]] = None
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
+from app.configs import active_config
 
 class StockInfo(BaseModel):
     symbol: str
@@ -35,3 +36,66 @@ class StockInfo(BaseModel):
     # Additional info
     sector: Optional[str] = None
     industry: Optional[str] = None
+
+class BatchQuoteRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=active_config.BATCH_MAX_SYMBOLS)
+
+class BatchQuoteResult(BaseModel):
+    symbol: str
+    data: Optional[StockInfo] = None
+    error: Optional[str] = None
+    cache: Optional[str] = None  # fresh, stale or miss
+
+class BatchQuoteResponse(BaseModel):
+    results: List[BatchQuoteResult]
+    count: int
+
+class PriceBar(BaseModel):
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+class PriceHistory(BaseModel):
+    symbol: str
+    interval: str
+    bars: List[PriceBar]
+    count: int
+
+class IndicatorRequest(BaseModel):
+    symbols: List[str] = Field(..., min_length=1, max_length=active_config.BATCH_MAX_SYMBOLS)
+    interval: str = "1d"
+
+class IndicatorValues(BaseModel):
+    symbol: str
+    last_bar: Optional[datetime] = None
+    sma_20: Optional[float] = None
+    sma_50: Optional[float] = None
+    ema_12: Optional[float] = None
+    ema_26: Optional[float] = None
+    rsi_14: Optional[float] = None
+    macd: Optional[float] = None
+    macd_signal: Optional[float] = None
+    macd_hist: Optional[float] = None
+    bb_upper: Optional[float] = None
+    bb_middle: Optional[float] = None
+    bb_lower: Optional[float] = None
+    vwap_20: Optional[float] = None
+    error: Optional[str] = None
+
+class IndicatorResponse(BaseModel):
+    interval: str
+    results: List[IndicatorValues]
+    count: int
+
+class SymbolMatch(BaseModel):
+    symbol: str  # Yahoo ticker, e.g. RELIANCE.NS
+    name: str
+    exchange: str
+
+class SymbolSearchResponse(BaseModel):
+    query: str
+    results: List[SymbolMatch]
+    count: int
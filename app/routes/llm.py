@@ -1,7 +1,11 @@
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.models.response_models import APIResponse
-from app.services.llm_service import get_stock_analysis
+from app.services.groq_client import groq_client
+from app.services.llm_service import answer_stock_question, stream_stock_analysis
+from app.services.symbol_master import check_symbol
 
 router = APIRouter()
 
@@ -9,9 +13,39 @@ class LLMQueryRequest(BaseModel):
     symbol: str
     question: str
 
+def _ticker(request: LLMQueryRequest) -> str:
+    """Canonical ticker for the request, or 404 before any Groq call (503 if Groq is not configured)"""
+    if not groq_client.available:
+        raise HTTPException(status_code=503, detail="LLM is not configured (GROQ_API_KEY is not set)")
+    symbol = check_symbol(request.symbol)
+    if symbol is None:
+        raise HTTPException(status_code=404, detail=f"Unknown symbol: {request.symbol}")
+    return symbol
+
 @router.post("/llm-query", response_model=APIResponse)
 async def llm_query(request: LLMQueryRequest):
     """Query LLM for stock analysis and information"""
     # Get analysis from LLM service
-    answer = get_stock_analysis(request.symbol, request.question)
-    return APIResponse(success=True, data={"answer": answer})
\ No newline at end of file
+    answer, cache_meta = await answer_stock_question(_ticker(request), request.question)
+    return APIResponse(success=True, data={"answer": answer}, meta=cache_meta)
+
+@router.post("/llm-query/stream")
+async def llm_query_stream(request: LLMQueryRequest):
+    """Stream the LLM answer token by token as Server-Sent Events"""
+    symbol = _ticker(request)
+
+    async def events():
+        try:
+            async for token in stream_stock_analysis(symbol, request.question):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        except Exception as e:
+            print(f"LLM stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': 'Sorry, I could not analyze that stock at the moment.'})}\n\n"
+            return
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,11 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from typing import Optional
 from app.models.news_models import StockNews
-from app.services.news_service import get_stock_news
+from app.services.news_service import get_stock_news_response
+from app.utils.responses import json_response
 
 router = APIRouter()
 
 @router.get("/news/{symbol}", response_model=StockNews)
-async def news_endpoint(symbol: str):
-    """Get recent news articles for a given stock symbol"""
-    articles = get_stock_news(symbol)
-    return StockNews(symbol=symbol, articles=articles)
+async def news_endpoint(
+    request: Request,
+    symbol: str,
+    summaries: Optional[str] = Query(None, pattern="^(sync|async)$", description="Wait for summaries (sync) or return at once and fill them in later (async)")
+):
+    """Get recent news articles for a given stock symbol (ETag / If-None-Match aware)"""
+    return json_response(request, await get_stock_news_response(symbol, summary_mode=summaries))
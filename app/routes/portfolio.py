@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.models.portfolio_models import PortfolioRequest, PortfolioAnalysis
+from app.services.portfolio import analyze_portfolio
+
+router = APIRouter()
+
+@router.post("/portfolio/analyze", response_model=PortfolioAnalysis)
+async def analyze_portfolio_endpoint(request: PortfolioRequest):
+    """Current value, P&L, daily returns, volatility, correlation and beta vs the benchmark for a set of holdings"""
+    return await analyze_portfolio(request.holdings, request.lookback)
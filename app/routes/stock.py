@@ -1,28 +1,46 @@
-from fastapi import APIRouter, HTTPException
-from app.models.stock_models import StockInfo
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from app.configs import active_config
+from app.models.stock_models import (
+    StockInfo,
+    BatchQuoteRequest,
+    BatchQuoteResponse,
+    PriceHistory,
+    IndicatorRequest,
+    IndicatorResponse
+)
+from app.services.bar_store import INTERVAL_SECONDS
+from app.services.indicators import get_indicators_async
+from app.services.price_stream import price_stream
 from app.models.response_models import APIResponse
 from app.services.stock_service import (
-    fetch_stock_data, 
-    get_real_time_price, 
-    get_market_status,
+    fetch_stock_response_async,
+    get_real_time_price_async,
+    get_market_status_async,
+    fetch_stock_batch,
+    get_price_history_async,
     clear_stock_cache
 )
-from typing import List
+from app.utils.responses import json_response
+from datetime import datetime
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
 @router.get("/stocks/{symbol}", response_model=StockInfo)
-async def get_stock_info(symbol: str):
+async def get_stock_info(symbol: str, request: Request):
     """Get comprehensive real-time stock information for a given symbol"""
-    stock_data = fetch_stock_data(symbol)
-    if not stock_data:
+    encoded, cache_state = await fetch_stock_response_async(symbol)
+    if encoded is None:
         raise HTTPException(status_code=404, detail=f"Stock data not found for symbol: {symbol}")
-    return stock_data
+    # FRESH, STALE (served while a background refresh runs) or MISS; If-None-Match gets a 304
+    return json_response(request, encoded, headers={"X-Cache": cache_state.upper()})
 
 @router.get("/stocks/{symbol}/price")
 async def get_stock_price(symbol: str):
     """Get real-time price for a stock symbol"""
-    price = get_real_time_price(symbol)
+    price = await get_real_time_price_async(symbol)
     if price is None:
         raise HTTPException(status_code=404, detail=f"Price data not found for symbol: {symbol}")
     
@@ -32,10 +50,25 @@ async def get_stock_price(symbol: str):
         "timestamp": "real-time"
     }
 
+@router.get("/stocks/{symbol}/history", response_model=PriceHistory)
+async def get_stock_history(
+    symbol: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: str = Query("1d", description="One of " + ", ".join(INTERVAL_SECONDS))
+):
+    """Get OHLCV bars for a time range from the local bar store"""
+    if interval not in INTERVAL_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval: {interval}")
+    bars = await get_price_history_async(symbol, interval, start, end)
+    if not bars:
+        raise HTTPException(status_code=404, detail=f"Price history not found for symbol: {symbol}")
+    return PriceHistory(symbol=symbol, interval=interval, bars=bars, count=len(bars))
+
 @router.get("/stocks/{symbol}/status")
 async def get_stock_market_status(symbol: str):
     """Get market status for a stock"""
-    status = get_market_status(symbol)
+    status = await get_market_status_async(symbol)
     return {
         "symbol": symbol,
         "market_status": status
@@ -47,19 +80,103 @@ async def refresh_stock_cache():
     clear_stock_cache()
     return {"message": "Stock cache cleared successfully"}
 
+@router.post("/stocks/batch", response_model=BatchQuoteResponse)
+async def get_stock_batch(request: BatchQuoteRequest):
+    """Get stock information for many symbols at once, with per-symbol errors"""
+    results = await fetch_stock_batch(request.symbols)
+    return BatchQuoteResponse(results=results, count=len(results))
+
+@router.post("/stocks/indicators", response_model=IndicatorResponse)
+async def get_stock_indicators(request: IndicatorRequest):
+    """Get SMA, EMA, RSI, MACD, Bollinger bands and VWAP for many symbols in one pass"""
+    if request.interval not in INTERVAL_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported interval: {request.interval}")
+    results = await get_indicators_async(request.symbols, request.interval)
+    return IndicatorResponse(interval=request.interval, results=results, count=len(results))
+
+@router.websocket("/stocks/stream")
+async def stream_stock_prices(websocket: WebSocket, symbols: Optional[str] = None):
+    """
+    Live quotes. Subscribe with ?symbols=A,B or by sending
+    {"action": "subscribe" | "unsubscribe", "symbols": [...]}; the server replies with a
+    snapshot of known quotes, then pushes only the fields that change. A malformed
+    message gets an {"type": "error"} frame; the connection stays open.
+    """
+    await websocket.accept()
+    subscriber = price_stream.connect()
+
+    async def send_updates():
+        try:
+            while True:
+                await websocket.send_json(await subscriber.queue.get())
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            print(f"Price stream send error: {e}")
+            await _close(websocket, 1011)
+
+    sender = asyncio.create_task(send_updates())
+    try:
+        if symbols:
+            price_stream.subscribe(subscriber, symbols.split(","))
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            command = _parse_command(message.get("text"))
+            if command is None:
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": 'Expected {"action": "subscribe" | "unsubscribe", "symbols": [...]}'
+                })
+                continue
+            action, requested = command
+            if action == "unsubscribe":
+                price_stream.unsubscribe(subscriber, requested)
+            else:
+                price_stream.subscribe(subscriber, requested)
+            await websocket.send_json({"type": "subscribed", "symbols": sorted(subscriber.symbols)})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Price stream error: {e}")
+        await _close(websocket, 1011)
+    finally:
+        sender.cancel()
+        price_stream.disconnect(subscriber)
+
+
+async def _close(websocket: WebSocket, code: int):
+    """Close the socket unless the client already has"""
+    try:
+        await websocket.close(code=code)
+    except Exception:
+        pass
+
+
+def _parse_command(text: Optional[str]) -> Optional[Tuple[str, List[str]]]:
+    """(action, symbols) from a client message, or None if it isn't a valid command"""
+    try:
+        message = json.loads(text) if text is not None else None
+    except ValueError:
+        return None
+    if not isinstance(message, dict):
+        return None
+    action = message.get("action", "subscribe")
+    requested = message.get("symbols") or []
+    if isinstance(requested, str):
+        requested = requested.split(",")
+    if action not in ("subscribe", "unsubscribe") or not isinstance(requested, list) \
+            or not all(isinstance(symbol, str) for symbol in requested):
+        return None
+    return action, requested
+
+
 @router.get("/stocks/popular/indian")
 async def get_popular_indian_stocks():
     """Get information for popular Indian stocks"""
-    popular_symbols = [
-        "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
-        "HINDUNILVR.NS", "ITC.NS", "KOTAKBANK.NS", "LT.NS", "BAJFINANCE.NS"
-    ]
-    
-    stocks = []
-    for symbol in popular_symbols:
-        stock_data = fetch_stock_data(symbol)
-        if stock_data:
-            stocks.append(stock_data)
+    results = await fetch_stock_batch(active_config.POPULAR_SYMBOLS)
+    stocks = [result.data for result in results if result.data]
     
     return {
         "stocks": stocks,
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Query
+from app.configs import active_config
+from app.models.stock_models import SymbolMatch, SymbolSearchResponse
+from app.services.symbol_master import symbol_master
+
+router = APIRouter()
+
+@router.get("/symbols/search", response_model=SymbolSearchResponse)
+async def search_symbols(
+    q: str = Query(..., min_length=1, max_length=100, description="Start of a ticker, company name or alias"),
+    limit: int = Query(active_config.SYMBOL_SEARCH_LIMIT, ge=1, le=50)
+):
+    """Autocomplete NSE/BSE symbols from the local symbol master (no network call)"""
+    results = [
+        SymbolMatch(symbol=listing.ticker, name=listing.name, exchange=listing.exchange)
+        for listing in symbol_master.search(q, limit)
+    ]
+    return SymbolSearchResponse(query=q, results=results, count=len(results))
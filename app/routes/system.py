@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from app.configs import active_config
+from app.services.answer_cache import answer_cache
+from app.services.local_summarizer import local_summarizer
+from app.services.news_store import article_store
+from app.services.price_stream import price_stream
+from app.services.symbol_master import symbol_master
+from app.services.warmup import symbol_usage
+from app.utils.cache import cache_stats
+from app.utils.metrics import histogram_stats
+from app.utils.singleflight import singleflight_stats
+
+router = APIRouter()
+
+@router.get("/stats")
+async def get_stats():
+    """Internal counters: single-flight coalescing, latency histograms, caches, the news store, the price stream, the symbol master, the summarizer and symbol usage"""
+    return {
+        "singleflight": singleflight_stats(),
+        "latency": histogram_stats(),
+        "cache": cache_stats(),
+        "llm_answer_cache": answer_cache.stats(),
+        "news_store": article_store.stats(),
+        "price_stream": price_stream.stats(),
+        "symbol_master": symbol_master.stats(),
+        "summarizer": {"backend": active_config.SUMMARY_BACKEND, "local": local_summarizer.stats()},
+        "symbol_usage": symbol_usage.stats()
+    }
@@ -0,0 +1,193 @@
+import hashlib
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.configs import active_config
+from app.utils.cache import FRESH, clear_cache, lookup_cache, lookup_cache_async, set_cache
+from app.utils.executors import run_blocking
+from app.utils.metrics import CACHE_LOOKUPS
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial rewordings share a key"""
+    return " ".join(re.sub(r"[^\w\s&]", " ", question.lower()).split())
+
+
+def normalize_symbol(symbol: str) -> str:
+    return symbol.strip().upper()
+
+
+class SemanticIndex:
+    """
+    Per-symbol matrix of unit-length question embeddings. A lookup is one
+    matrix-vector product over the symbol's rows, so cosine similarity against
+    every cached question costs a single NumPy call.
+    """
+
+    def __init__(self, max_per_symbol: int, ttl: float):
+        self.max_per_symbol = max_per_symbol
+        self.ttl = ttl
+        self._vectors: Dict[str, np.ndarray] = {}  # symbol -> (n, dim) float32
+        self._expiry: Dict[str, np.ndarray] = {}  # symbol -> (n,) float64
+        self._answers: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def search(self, symbol: str, vector: np.ndarray) -> Tuple[Optional[str], float]:
+        """Best cached answer for a symbol and its cosine similarity"""
+        with self._lock:
+            vectors = self._vectors.get(symbol)
+            if vectors is None or not len(vectors):
+                return None, 0.0
+            scores = vectors @ vector
+            scores[self._expiry[symbol] <= time.time()] = -1.0
+            best = int(np.argmax(scores))
+            return self._answers[symbol][best], float(scores[best])
+
+    def add(self, symbol: str, vector: np.ndarray, answer: str):
+        with self._lock:
+            vectors = self._vectors.get(symbol)
+            expiry = np.array([time.time() + self.ttl])
+            if vectors is None:
+                self._vectors[symbol] = vector[np.newaxis, :].astype(np.float32)
+                self._expiry[symbol] = expiry
+                self._answers[symbol] = [answer]
+                return
+            # Drop expired rows and the oldest ones beyond the per-symbol cap
+            keep = np.flatnonzero(self._expiry[symbol] > time.time())
+            keep = keep[max(0, len(keep) - self.max_per_symbol + 1):]
+            answers = self._answers[symbol]
+            self._vectors[symbol] = np.vstack([vectors[keep], vector[np.newaxis, :].astype(np.float32)])
+            self._expiry[symbol] = np.concatenate([self._expiry[symbol][keep], expiry])
+            self._answers[symbol] = [answers[i] for i in keep] + [answer]
+
+    def clear(self):
+        with self._lock:
+            self._vectors.clear()
+            self._expiry.clear()
+            self._answers.clear()
+
+
+class QuestionEmbedder:
+    """Small local sentence-embedding model (mean-pooled transformer), loaded on first use"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                from transformers import AutoModel, AutoTokenizer
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModel.from_pretrained(self.model_name)
+                model.eval()
+                self._model = model
+
+    def embed(self, text: str) -> np.ndarray:
+        # Memoized: a miss embeds the question once for the lookup and once for the store
+        return self._embed_cached(text)
+
+    @lru_cache(maxsize=256)
+    def _embed_cached(self, text: str) -> np.ndarray:
+        import torch
+        if self._model is None:
+            self._load()
+        inputs = self._tokenizer(text, return_tensors="pt", truncation=True, max_length=64)
+        with torch.no_grad():
+            hidden = self._model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        vector = pooled[0].numpy().astype(np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class AnswerCache:
+    """
+    Exact lookups first, in the shared cache so every worker reuses an answer, then (if
+    enabled) the nearest cached question for the same symbol from this worker's index
+    """
+
+    def __init__(self):
+        self.ttl = active_config.LLM_ANSWER_CACHE_TTL
+        self.semantic = SemanticIndex(active_config.LLM_SEMANTIC_MAX_PER_SYMBOL, self.ttl)
+        self.embedder = QuestionEmbedder(active_config.LLM_SEMANTIC_MODEL)
+        self.semantic_enabled = active_config.LLM_SEMANTIC_CACHE_ENABLED
+        self.threshold = active_config.LLM_SEMANTIC_THRESHOLD
+        self.hits = {"exact": 0, "semantic": 0, "miss": 0}
+
+    @staticmethod
+    def _key(symbol: str, question: str) -> Tuple[str, str, str]:
+        """(symbol, normalized question, shared cache key)"""
+        symbol, question = normalize_symbol(symbol), normalize_question(question)
+        digest = hashlib.blake2b(question.encode("utf-8"), digest_size=16).hexdigest()
+        return symbol, question, f"llm:answer:{symbol}:{digest}"
+
+    def lookup(self, symbol: str, question: str) -> Tuple[Optional[str], Dict[str, object]]:
+        """Returns (answer or None, metadata describing the cache outcome)"""
+        symbol, question, key = self._key(symbol, question)
+        answer, state, _ = lookup_cache(key, record=False)
+        return self._resolve(symbol, question, answer if state == FRESH else None)
+
+    async def lookup_async(self, symbol: str, question: str) -> Tuple[Optional[str], Dict[str, object]]:
+        """lookup() from async code: the shared cache is read off the loop, questions embedded on their own pool"""
+        symbol, question, key = self._key(symbol, question)
+        answer, state, _ = await lookup_cache_async(key, record=False)
+        answer = answer if state == FRESH else None
+        if answer is None and self.semantic_enabled:
+            return await run_blocking("embedding", self._resolve, symbol, question, None)
+        return self._resolve(symbol, question, answer)
+
+    def _resolve(self, symbol: str, question: str, answer: Optional[str]) -> Tuple[Optional[str], Dict[str, object]]:
+        """Record an exact hit, or fall back to the semantic tier"""
+        if answer is not None:
+            self.hits["exact"] += 1
+            CACHE_LOOKUPS.labels("llm_answer", "exact").inc()
+            return answer, {"cache": "exact"}
+        if self.semantic_enabled:
+            try:
+                answer, similarity = self.semantic.search(symbol, self.embedder.embed(question))
+            except Exception as e:
+                print(f"Semantic answer cache error: {e}")
+                answer, similarity = None, 0.0
+            if answer is not None and similarity >= self.threshold:
+                self.hits["semantic"] += 1
+                CACHE_LOOKUPS.labels("llm_answer", "semantic").inc()
+                return answer, {"cache": "semantic", "similarity": round(similarity, 4)}
+        self.hits["miss"] += 1
+        CACHE_LOOKUPS.labels("llm_answer", "miss").inc()
+        return None, {"cache": "miss"}
+
+    def store(self, symbol: str, question: str, answer: str):
+        symbol, question, key = self._key(symbol, question)
+        set_cache(key, answer, ttl=self.ttl)
+        self._index(symbol, question, answer)
+
+    async def store_async(self, symbol: str, question: str, answer: str):
+        symbol, question, key = self._key(symbol, question)
+        set_cache(key, answer, ttl=self.ttl)
+        if self.semantic_enabled:
+            await run_blocking("embedding", self._index, symbol, question, answer)
+
+    def _index(self, symbol: str, question: str, answer: str):
+        if self.semantic_enabled:
+            try:
+                self.semantic.add(symbol, self.embedder.embed(question), answer)
+            except Exception as e:
+                print(f"Semantic answer cache error: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.hits)
+
+    def clear(self):
+        clear_cache("llm:answer:")
+        self.semantic.clear()
+
+
+answer_cache = AnswerCache()
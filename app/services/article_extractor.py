@@ -0,0 +1,138 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from app.configs import active_config
+from app.utils.executors import run_blocking
+from app.utils.lazy import lazy_import
+from app.utils.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional: BeautifulSoup is the (several times slower) fallback
+    LexborHTMLParser = None
+
+bs4 = lazy_import("bs4")
+
+# Page chrome that never holds article text
+_BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure", "iframe", "svg"]
+_CONTENT_SELECTORS = ["article", "[itemprop=articleBody]", "main"]
+_MIN_PARAGRAPH_CHARS = 40  # Shorter <p>s are bylines, captions and share buttons
+
+_session = requests.Session()
+_session.headers["User-Agent"] = "Mozilla/5.0 (compatible; market-mentor-api/1.0)"
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32))
+_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Per-host fetch slots; created on the ingestion event loop
+_domain_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _paragraphs_lexbor(html: bytes) -> List[str]:
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(_BOILERPLATE_TAGS)
+    root = next((node for node in map(tree.css_first, _CONTENT_SELECTORS) if node is not None), tree.body)
+    if root is None:
+        return []
+    paragraphs = [_clean(node.text(deep=True)) for node in root.css("p")]
+    if not any(paragraphs):
+        meta = tree.css_first('meta[property="og:description"]') or tree.css_first('meta[name="description"]')
+        paragraphs = [_clean(meta.attributes.get("content") or "")] if meta is not None else []
+    return paragraphs
+
+
+def _paragraphs_bs4(html: bytes) -> List[str]:
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+    root = next((node for node in map(soup.select_one, _CONTENT_SELECTORS) if node is not None), soup.body or soup)
+    paragraphs = [_clean(node.get_text(" ")) for node in root.find_all("p")]
+    if not any(paragraphs):
+        meta = soup.find("meta", attrs={"property": "og:description"}) or soup.find("meta", attrs={"name": "description"})
+        paragraphs = [_clean(meta.get("content") or "")] if meta is not None else []
+    return paragraphs
+
+
+def extract_text(html: bytes) -> str:
+    """Article body text from a page: the <p>s of its <article>/<main>, minus page chrome"""
+    paragraphs = _paragraphs_lexbor(html) if LexborHTMLParser is not None else _paragraphs_bs4(html)
+    body = [p for p in paragraphs if len(p) >= _MIN_PARAGRAPH_CHARS]
+    return "\n".join(body or [p for p in paragraphs if p])
+
+
+def _download(url: str, timeout: float) -> Optional[bytes]:
+    """Page HTML, capped at ARTICLE_MAX_BYTES; None for non-HTML responses"""
+    with _session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        if "html" not in response.headers.get("Content-Type", "text/html"):
+            return None
+        chunks, size = [], 0
+        for chunk in response.iter_content(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= active_config.ARTICLE_MAX_BYTES:
+                break
+        return b"".join(chunks)
+
+
+def fetch_article_text(url: str, timeout: Optional[float] = None) -> Optional[str]:
+    """Download and extract one article; None if the page could not be fetched or had no text"""
+    timeout = timeout or active_config.ARTICLE_FETCH_TIMEOUT
+    host = _domain(url)
+    started = time.perf_counter()
+    try:
+        html = _download(url, timeout)
+    except Exception as e:
+        UPSTREAM_ERRORS.labels("article", host).inc()
+        print(f"Error fetching article {url}: {e}")
+        return None
+    finally:
+        UPSTREAM_LATENCY.labels("article", host).observe(time.perf_counter() - started)
+    if not html:
+        return None
+    try:
+        return extract_text(html) or None
+    except Exception as e:
+        print(f"Error extracting article {url}: {e}")
+        return None
+
+
+def _slot(host: str) -> asyncio.Semaphore:
+    slot = _domain_slots.get(host)
+    if slot is None:
+        slot = _domain_slots[host] = asyncio.Semaphore(active_config.ARTICLE_PER_DOMAIN_LIMIT)
+    return slot
+
+
+def can_extract(url: str) -> bool:
+    host = _domain(url)
+    return bool(host) and not any(
+        host == skipped or host.endswith("." + skipped) for skipped in active_config.ARTICLE_SKIP_DOMAINS
+    )
+
+
+async def _fetch_limited(url: str) -> Optional[str]:
+    async with _slot(_domain(url)):
+        return await run_blocking("article", fetch_article_text, url)
+
+
+async def extract_articles(urls: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Fetch and extract many articles concurrently. Every host gets at most
+    ARTICLE_PER_DOMAIN_LIMIT requests in flight, so a burst of one publisher's
+    links queues up instead of hammering its server.
+    """
+    urls = [url for url in dict.fromkeys(urls) if can_extract(url)]
+    texts = await asyncio.gather(*(_fetch_limited(url) for url in urls), return_exceptions=True)
+    return {url: text if isinstance(text, str) else None for url, text in zip(urls, texts)}
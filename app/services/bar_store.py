@@ -0,0 +1,333 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.configs import active_config
+from app.utils.lazy import lazy_import
+from app.utils.metrics import track_upstream
+
+# Imported on first download; annotations that name them are strings so defining functions doesn't load them
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
+
+# One fixed-size record per bar; files are plain arrays of these, appended in time order
+BAR_DTYPE = np.dtype([
+    ("ts", "<i8"),  # Bar open time, epoch seconds (UTC)
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+# Seconds per bar for the intervals the store accepts
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "1d": 86400, "1wk": 604800}
+
+# How far back yfinance serves each interval, and what to download on a cold start
+MAX_LOOKBACK = {"1m": 7 * 86400, "5m": 59 * 86400, "15m": 59 * 86400, "30m": 59 * 86400, "1h": 720 * 86400}
+INITIAL_PERIOD = {"1m": "7d", "5m": "60d", "15m": "60d", "30m": "60d", "1h": "730d", "1d": "5y", "1wk": "10y"}
+
+
+# Relative change in a stored bar's open that means yfinance has re-adjusted the history
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def _frame_ts(frame: "pd.DataFrame") -> np.ndarray:
+    """Epoch seconds (UTC) of a yfinance frame's index"""
+    index = frame.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return np.asarray((index - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1), dtype=np.int64)
+
+
+def frame_to_bars(frame: "pd.DataFrame") -> np.ndarray:
+    """Convert a yfinance OHLCV frame into bar records"""
+    frame = frame.dropna(subset=["Close"])
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars["ts"] = _frame_ts(frame)
+    bars["open"] = frame["Open"].to_numpy(dtype=np.float64)
+    bars["high"] = frame["High"].to_numpy(dtype=np.float64)
+    bars["low"] = frame["Low"].to_numpy(dtype=np.float64)
+    bars["close"] = frame["Close"].to_numpy(dtype=np.float64)
+    bars["volume"] = frame["Volume"].to_numpy(dtype=np.float64) if "Volume" in frame else 0.0
+    return bars
+
+
+def adjustment_changed(frame: "pd.DataFrame", last: Optional[np.void]) -> bool:
+    """
+    Whether a downloaded tail is adjusted on a different basis than the stored bars ending
+    in `last`. yfinance back-adjusts all history for splits and dividends, so after one the
+    stored bars no longer line up with new ones: the download then carries the action after
+    the stored tail, or its copy of the tail bar has a different open.
+    """
+    if last is None or frame is None or frame.empty:
+        return False
+    ts = _frame_ts(frame)
+    after = ts > int(last["ts"])
+    for column in ("Dividends", "Stock Splits"):
+        if column in frame and np.any(frame[column].fillna(0.0).to_numpy(dtype=np.float64)[after] != 0):
+            return True
+    overlap = np.flatnonzero(ts == int(last["ts"]))
+    if len(overlap):
+        stored, fresh = float(last["open"]), float(frame["Open"].iloc[overlap[0]])
+        if np.isfinite(fresh) and abs(fresh - stored) > ADJUSTMENT_TOLERANCE * abs(stored):
+            return True
+    return False
+
+
+def _window(interval: str, since: Optional[int]) -> dict:
+    """
+    history()/download() arguments for the bars since an epoch second: the initial period
+    when nothing is stored or yfinance no longer serves that far back
+    """
+    lookback = MAX_LOOKBACK.get(interval)
+    if since is None or (lookback is not None and time.time() - since > lookback):
+        return {"period": INITIAL_PERIOD.get(interval, "1mo")}
+    return {"start": datetime.fromtimestamp(since, tz=timezone.utc)}
+
+
+def _ordered(bars: np.ndarray) -> np.ndarray:
+    """Bars sorted by timestamp, one per timestamp"""
+    bars = np.sort(bars, order="ts")
+    return bars[np.unique(bars["ts"], return_index=True)[1]]
+
+
+def _ticker_frame(frame: "pd.DataFrame", symbol: str) -> Optional["pd.DataFrame"]:
+    """One symbol's columns of a multi-ticker download (None if it came back empty)"""
+    if frame is None or frame.empty:
+        return None
+    if isinstance(frame.columns, pd.MultiIndex):
+        if symbol not in frame.columns.get_level_values(0):
+            return None
+        return frame[symbol]
+    return frame
+
+
+class BarStore:
+    """
+    On-disk OHLCV store keyed by (symbol, interval). Each series is a flat file of
+    BAR_DTYPE records read through np.memmap, so range queries are a binary search
+    over the timestamp column and a refresh only downloads bars newer than the last one.
+    """
+
+    def __init__(self, root: str, refresh_interval: Dict[str, float], retention: Optional[Dict[str, float]] = None):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self.retention = retention or {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._last_refresh: Dict[Tuple[str, str], float] = {}
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._^-]", "_", symbol.upper())
+        return os.path.join(self.root, interval, f"{safe}.bars")
+
+    def _lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def read(self, symbol: str, interval: str) -> np.ndarray:
+        """All stored bars for a series (memory-mapped, read-only)"""
+        path = self._path(symbol, interval)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return np.empty(0, dtype=BAR_DTYPE)
+        count = size // BAR_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+
+    def append(self, symbol: str, interval: str, bars: np.ndarray) -> int:
+        """
+        Append bars newer than the stored tail. A bar with the tail's timestamp replaces
+        it, since the most recent bar keeps changing until its interval closes.
+        Returns the number of records written.
+        """
+        if not len(bars):
+            return 0
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        existing = self.read(symbol, interval)
+        count = len(existing)
+        last_ts = int(existing["ts"][-1]) if count else None
+        del existing
+        bars = _ordered(bars)
+        if last_ts is not None:
+            bars = bars[bars["ts"] >= last_ts]
+        if not len(bars):
+            return 0
+        if last_ts is not None and int(bars["ts"][0]) == last_ts:
+            count -= 1
+        with open(path, "r+b" if os.path.exists(path) else "wb") as handle:
+            # Offset by whole records, dropping any torn record left by an interrupted write
+            handle.seek(count * BAR_DTYPE.itemsize)
+            handle.write(bars.tobytes())
+            handle.truncate()
+        self._trim(symbol, interval)
+        return len(bars)
+
+    def _trim(self, symbol: str, interval: str):
+        """
+        Drop bars older than the interval's retention window. The file is rewritten at most
+        about once a day per series (when a day's worth has expired), via a temp file and an
+        atomic replace so open memmaps keep reading the old copy.
+        """
+        retention = self.retention.get(interval)
+        if retention is None:
+            return
+        existing = self.read(symbol, interval)
+        cutoff = int(time.time() - retention)
+        if not len(existing) or int(existing["ts"][0]) >= cutoff - 86400:
+            return
+        keep = np.array(existing[int(np.searchsorted(existing["ts"], cutoff, side="left")):])
+        del existing
+        self._write(symbol, interval, keep)
+
+    def _write(self, symbol: str, interval: str, bars: np.ndarray):
+        """Replace a series file via a temp file and an atomic rename (open memmaps keep the old copy)"""
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as handle:
+            handle.write(bars.tobytes())
+        os.replace(tmp, path)
+
+    def replace(self, symbol: str, interval: str, bars: np.ndarray) -> int:
+        """
+        Swap a series for freshly downloaded bars, after yfinance re-adjusted its history.
+        Returns the number of records written.
+        """
+        if not len(bars):
+            return 0
+        bars = _ordered(bars)
+        self._write(symbol, interval, bars)
+        self._trim(symbol, interval)
+        return len(bars)
+
+    def _download(self, symbol: str, interval: str, since: Optional[int]) -> "pd.DataFrame":
+        """Bars since an epoch second, with the dividend and split columns"""
+        with track_upstream("yfinance", "history"):
+            return yf.Ticker(symbol).history(interval=interval, actions=True, **_window(interval, since))
+
+    def _download_many(self, symbols: List[str], interval: str, window: dict) -> "pd.DataFrame":
+        with track_upstream("yfinance", "download"):
+            # ignore_tz=False keeps exchange-local timestamps, the same bars Ticker.history returns
+            return yf.download(symbols, interval=interval, group_by="ticker", threads=True, progress=False,
+                               auto_adjust=True, actions=True, ignore_tz=False, **window)
+
+    def refresh(self, symbol: str, interval: str, force: bool = False) -> int:
+        """
+        Download only the bars missing since the last stored one. If a split or dividend
+        re-adjusted the history in the meantime, the whole series is downloaded again instead.
+        """
+        key = (symbol.upper(), interval)
+        with self._lock(key):
+            now = time.monotonic()
+            min_age = self.refresh_interval.get(interval, INTERVAL_SECONDS.get(interval, 60))
+            if not force and now - self._last_refresh.get(key, float("-inf")) < min_age:
+                return 0
+            existing = self.read(symbol, interval)
+            first_ts = int(existing["ts"][0]) if len(existing) else None
+            last = existing[-1].copy() if len(existing) else None
+            del existing
+            frame = self._download(symbol, interval, None if last is None else int(last["ts"]))
+            self._last_refresh[key] = now
+            if frame is None or frame.empty:
+                return 0
+            if adjustment_changed(frame, last):
+                frame = self._download(symbol, interval, first_ts)
+                if frame is None or frame.empty:
+                    return 0
+                return self.replace(symbol, interval, frame_to_bars(frame))
+            return self.append(symbol, interval, frame_to_bars(frame))
+
+    def refresh_many(self, symbols: List[str], interval: str, force: bool = False) -> int:
+        """
+        Bring many series up to date with one multi-ticker yf.download per group instead
+        of one history call per symbol: symbols with no usable bars get the initial period,
+        the rest the bars since the oldest of their tails. Series that a split or dividend
+        re-adjusted are downloaded again whole, together. Returns the records written.
+        """
+        now = time.monotonic()
+        min_age = self.refresh_interval.get(interval, INTERVAL_SECONDS.get(interval, 60))
+        lookback = MAX_LOOKBACK.get(interval)
+        cold, tails = [], {}
+        for symbol in dict.fromkeys(symbol.upper() for symbol in symbols):
+            if not force and now - self._last_refresh.get((symbol, interval), float("-inf")) < min_age:
+                continue
+            existing = self.read(symbol, interval)
+            if not len(existing) or (lookback is not None and time.time() - int(existing["ts"][-1]) > lookback):
+                cold.append(symbol)
+            else:
+                # (first stored timestamp, last stored bar)
+                tails[symbol] = (int(existing["ts"][0]), existing[-1].copy())
+            del existing
+        groups = []
+        if cold:
+            groups.append((cold, _window(interval, None)))
+        if tails:
+            groups.append((list(tails), _window(interval, min(int(last["ts"]) for _, last in tails.values()))))
+        written = 0
+        rebased = []
+        for group, window in groups:
+            frame = self._download_many(group, interval, window)
+            for symbol in group:
+                self._last_refresh[(symbol, interval)] = now
+                bars = _ticker_frame(frame, symbol)
+                if bars is None:
+                    continue
+                if symbol in tails and adjustment_changed(bars, tails[symbol][1]):
+                    rebased.append(symbol)
+                    continue
+                with self._lock((symbol, interval)):
+                    written += self.append(symbol, interval, frame_to_bars(bars))
+        if rebased:
+            frame = self._download_many(rebased, interval, _window(interval, min(tails[symbol][0] for symbol in rebased)))
+            for symbol in rebased:
+                bars = _ticker_frame(frame, symbol)
+                if bars is None:
+                    continue
+                with self._lock((symbol, interval)):
+                    written += self.replace(symbol, interval, frame_to_bars(bars))
+        return written
+
+    def get_bars(self, symbol: str, interval: str = "1d", start: Optional[int] = None,
+                 end: Optional[int] = None, refresh: bool = True) -> np.ndarray:
+        """Bars with start <= ts <= end (epoch seconds), refreshing the tail first if it is stale"""
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        if refresh:
+            try:
+                self.refresh(symbol, interval)
+            except Exception as e:
+                # Serve whatever is already on disk
+                print(f"Error refreshing {interval} bars for {symbol}: {e}")
+        bars = self.read(symbol, interval)
+        ts = bars["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(bars) if end is None else int(np.searchsorted(ts, end, side="right"))
+        return np.array(bars[lo:hi])
+
+    def latest_close(self, symbol: str, interval: str = "1m") -> Optional[float]:
+        """Most recent close, from disk after an incremental refresh"""
+        try:
+            self.refresh(symbol, interval)
+        except Exception as e:
+            print(f"Error refreshing {interval} bars for {symbol}: {e}")
+        bars = self.read(symbol, interval)
+        if not len(bars):
+            return None
+        return float(bars["close"][-1])
+
+
+bar_store = BarStore(
+    root=active_config.BAR_STORE_DIR,
+    refresh_interval=active_config.BAR_REFRESH_INTERVAL,
+    retention=active_config.BAR_RETENTION
+)
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+from app.utils.executors import run_blocking
+from app.utils.lazy import lazy_import
+from app.utils.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+feedparser = lazy_import("feedparser")
+
+# Stored validators per feed URL: (ETag, Last-Modified)
+_validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_validators_lock = threading.Lock()
+
+
+@dataclass
+class FeedResult:
+    url: str
+    status: str  # 'ok', 'not_modified', 'timeout' or 'error'
+    feed: Any = None
+    error: Optional[str] = None
+
+
+def feed_source_label(url: str) -> str:
+    """Metrics label for a feed: its host, so per-symbol search feeds share one series"""
+    return urlparse(url).netloc or url
+
+
+def fetch_feed(url: str, timeout: float) -> FeedResult:
+    """Conditional GET of one feed, its latency recorded as an 'rss' upstream call labelled by host"""
+    started = time.perf_counter()
+    result = _fetch_feed(url, timeout)
+    UPSTREAM_LATENCY.labels("rss", feed_source_label(url)).observe(time.perf_counter() - started)
+    return result
+
+
+def _fetch_feed(url: str, timeout: float) -> FeedResult:
+    """Conditional GET of one feed; an unchanged feed costs a 304 and no parse"""
+    headers = {"User-Agent": "market-mentor-api/1.0"}
+    with _validators_lock:
+        etag, modified = _validators.get(url, (None, None))
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return FeedResult(url=url, status="not_modified")
+        response.raise_for_status()
+    except requests.exceptions.Timeout as e:
+        return FeedResult(url=url, status="timeout", error=str(e))
+    except Exception as e:
+        return FeedResult(url=url, status="error", error=str(e))
+
+    with _validators_lock:
+        _validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return FeedResult(url=url, status="ok", feed=feedparser.parse(response.content))
+
+
+async def _fetch_with_deadline(url: str, deadline: float) -> FeedResult:
+    # Errors are counted here, once per result handed back: a fetch that outlives its
+    # deadline still finishes (and may time out itself) on the pool thread
+    try:
+        result = await asyncio.wait_for(run_blocking("rss", fetch_feed, url, deadline), deadline)
+    except asyncio.TimeoutError:
+        result = FeedResult(url=url, status="timeout", error=f"no response within {deadline}s")
+    if result.status in ("timeout", "error"):
+        UPSTREAM_ERRORS.labels("rss", feed_source_label(url)).inc()
+    return result
+
+
+async def fetch_feeds(sources: Iterable[Tuple[str, float]]) -> Dict[str, FeedResult]:
+    """
+    Fetch (url, deadline) pairs concurrently on a bounded pool.
+    Sources that miss their deadline come back as 'timeout' results instead of
+    holding up the rest, so callers always get whatever arrived in time.
+    """
+    sources = list(sources)
+    results = await asyncio.gather(*(_fetch_with_deadline(url, deadline) for url, deadline in sources))
+    return {result.url: result for result in results}
+
+
+def clear_validators():
+    """Forget stored ETag/Last-Modified values (next fetch downloads everything)"""
+    with _validators_lock:
+        _validators.clear()
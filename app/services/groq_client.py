@@ -0,0 +1,183 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Iterator, List, Optional
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from app.configs import active_config
+from app.utils.executors import run_blocking
+from app.utils.metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+load_dotenv()
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the client-side token bucket can't grant a request in time"""
+
+
+class TokenBucket:
+    """Client-side limiter: `rate` requests per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to timeout seconds; returns False if none became available"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self, seconds: float):
+        """Server said we're over quota: hold back new requests for a while"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse retry-after style values: '2', '0.5', '1m2.5s', '250ms'"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    total, matched = 0.0, False
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def retry_delay(response: Optional[requests.Response], attempt: int) -> float:
+    """Honor retry-after / rate-limit reset headers, else exponential backoff with full jitter"""
+    if response is not None:
+        for header in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+            delay = _parse_duration(response.headers.get(header))
+            if delay is not None:
+                return min(delay, active_config.GROQ_MAX_BACKOFF) + random.uniform(0, 0.1)
+    backoff = min(active_config.GROQ_MAX_BACKOFF, active_config.GROQ_BASE_BACKOFF * 2 ** attempt)
+    return random.uniform(0, backoff)
+
+
+class GroqClient:
+    """Shared Groq chat-completions client: pooled keep-alive session, rate limiting and retries"""
+
+    def __init__(self, api_key: Optional[str], api_url: str, requests_per_minute: float,
+                 burst: float, max_retries: int, timeout: float, pool_size: int):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=burst)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _post(self, payload: dict, stream: bool = False, timeout: Optional[float] = None,
+              operation: str = "chat") -> requests.Response:
+        """POST with rate limiting and retries; returns a successful response or raises"""
+        response = None
+        for attempt in range(self.max_retries + 1):
+            if not self.bucket.acquire(timeout=active_config.GROQ_QUEUE_TIMEOUT):
+                UPSTREAM_ERRORS.labels("groq", operation).inc()
+                raise RateLimitExceeded("Groq request budget exhausted, try again shortly")
+            started = time.perf_counter()
+            try:
+                response = self.session.post(self.api_url, json=payload, stream=stream,
+                                             timeout=timeout or self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+                UPSTREAM_ERRORS.labels("groq", operation).inc()
+                if attempt == self.max_retries:
+                    raise
+                print(f"Groq request failed ({err}), retrying")
+                time.sleep(retry_delay(None, attempt))
+                continue
+            finally:
+                # Time to response headers; streamed bodies are measured by the caller
+                UPSTREAM_LATENCY.labels("groq", operation).observe(time.perf_counter() - started)
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.labels("groq", operation).inc()
+            if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                break
+            delay = retry_delay(response, attempt)
+            if response.status_code == 429:
+                self.bucket.drain(delay)
+            print(f"Groq HTTP {response.status_code}, retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+        response.raise_for_status()
+        return response
+
+    def chat(self, messages: List[dict], model: str = "llama3-8b-8192",
+             timeout: Optional[float] = None, operation: str = "chat", **params) -> dict:
+        """Chat completion; returns the parsed JSON body. operation labels the call in metrics"""
+        payload = {"model": model, "messages": messages, **params}
+        return self._post(payload, timeout=timeout, operation=operation).json()
+
+    def stream_chat(self, messages: List[dict], model: str = "llama3-8b-8192",
+                    stop_event: Optional[threading.Event] = None, **params) -> Iterator[str]:
+        """Streaming chat completion; yields content tokens as they arrive"""
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        with self._post(payload, stream=True, operation="chat_stream") as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                token = choices[0].get("delta", {}).get("content") if choices else None
+                if token:
+                    yield token
+
+    async def achat(self, messages: List[dict], model: str = "llama3-8b-8192", **params) -> dict:
+        """Async chat completion, run on the Groq pool"""
+        return await run_blocking("groq", self.chat, messages, model, **params)
+
+
+groq_client = GroqClient(
+    api_key=os.getenv("GROQ_API_KEY"),
+    api_url=os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions"),
+    requests_per_minute=active_config.GROQ_REQUESTS_PER_MINUTE,
+    burst=active_config.GROQ_BURST,
+    max_retries=active_config.GROQ_MAX_RETRIES,
+    timeout=active_config.GROQ_TIMEOUT,
+    pool_size=active_config.UPSTREAM_MAX_WORKERS.get("groq", active_config.UPSTREAM_DEFAULT_WORKERS)
+)
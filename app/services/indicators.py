@@ -0,0 +1,243 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.configs import active_config
+from app.models.stock_models import IndicatorValues
+from app.services.bar_store import bar_store
+from app.services.symbol_master import check_symbol
+from app.utils.cache import lookup_many_async, set_cache, FRESH
+from app.utils.executors import run_blocking
+
+# Latest value of each indicator, in response order
+INDICATOR_FIELDS = (
+    "sma_20", "sma_50", "ema_12", "ema_26", "rsi_14",
+    "macd", "macd_signal", "macd_hist",
+    "bb_upper", "bb_middle", "bb_lower", "vwap_20",
+)
+
+
+def stack_series(series: List[np.ndarray], length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Right-align 1-D series into an (n_symbols, length) matrix. Missing history at
+    the front is padded with each row's first value, which leaves EMAs unchanged;
+    the returned counts say how many real bars every row has so warm-up periods
+    can be masked out and RSI seeded from the first real bar.
+    """
+    matrix = np.empty((len(series), length), dtype=np.float64)
+    counts = np.empty(len(series), dtype=np.int64)
+    for row, values in enumerate(series):
+        values = np.asarray(values[-length:], dtype=np.float64)
+        counts[row] = len(values)
+        if not len(values):
+            matrix[row] = np.nan
+            continue
+        matrix[row, length - len(values):] = values
+        matrix[row, :length - len(values)] = values[0]
+    return matrix, counts
+
+
+def _warmup_mask(counts: np.ndarray, length: int, warmup: int) -> np.ndarray:
+    """True where a row has fewer than `warmup` real bars up to and including that column"""
+    first_real = length - counts  # Column of each row's first real bar
+    columns = np.arange(length)
+    return columns[np.newaxis, :] < (first_real + warmup - 1)[:, np.newaxis]
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average along axis 1 via cumulative sums"""
+    out = np.full_like(x, np.nan)
+    if x.shape[1] < window:
+        return out
+    csum = np.cumsum(x, axis=1)
+    out[:, window - 1:] = csum[:, window - 1:]
+    out[:, window:] -= csum[:, :-window]
+    out[:, window - 1:] /= window
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Population standard deviation over a trailing window"""
+    mean = sma(x, window)
+    mean_sq = sma(x * x, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average; the recursion runs over time, vectorized across symbols"""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    out[:, 0] = x[:, 0]
+    for t in range(1, x.shape[1]):
+        out[:, t] = alpha * x[:, t] + (1.0 - alpha) * out[:, t - 1]
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14, start: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Wilder's relative strength index. Each row is seeded from the first `period`
+    changes after its `start` column (its first real bar), so front padding
+    never enters the averages.
+    """
+    rows, length = close.shape
+    out = np.full_like(close, np.nan)
+    start = np.zeros(rows, dtype=np.int64) if start is None else np.asarray(start, dtype=np.int64)
+    first = start + period  # Column of each row's first RSI value
+    if not rows or first.min() >= length:
+        return out
+    delta = np.diff(close, axis=1)
+    gain = np.clip(delta, 0.0, None)
+    loss = np.clip(-delta, 0.0, None)
+    # Seed averages as differences of running sums: gain[:, start:first].mean() per row
+    gain_sum = np.concatenate([np.zeros((rows, 1)), np.cumsum(gain, axis=1)], axis=1)
+    loss_sum = np.concatenate([np.zeros((rows, 1)), np.cumsum(loss, axis=1)], axis=1)
+    index = np.arange(rows)
+    seed_end, seed_start = np.minimum(first, length - 1), np.minimum(start, length - 1)
+    avg_gain = (gain_sum[index, seed_end] - gain_sum[index, seed_start]) / period
+    avg_loss = (loss_sum[index, seed_end] - loss_sum[index, seed_start]) / period
+    for t in range(first.min(), length):
+        later = t > first
+        avg_gain = np.where(later, (avg_gain * (period - 1) + gain[:, t - 1]) / period, avg_gain)
+        avg_loss = np.where(later, (avg_loss * (period - 1) + loss[:, t - 1]) / period, avg_loss)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            value = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+        out[:, t] = np.where(t >= first, value, np.nan)
+    return out
+
+
+def compute_indicator_matrix(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                             volume: np.ndarray, counts: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Every indicator for every symbol in one pass over stacked (n_symbols, n_bars)
+    arrays. Values computed from padded history are set to NaN.
+    """
+    length = close.shape[1]
+    if counts is None:
+        counts = np.full(close.shape[0], length)
+
+    ema_12, ema_26 = ema(close, 12), ema(close, 26)
+    macd_line = ema_12 - ema_26
+    macd_signal = ema(macd_line, 9)
+    middle = sma(close, 20)
+    band = 2.0 * rolling_std(close, 20)
+    typical = (high + low + close) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = sma(typical * volume, 20) / sma(volume, 20)
+
+    results = {
+        "sma_20": (middle, 20),
+        "sma_50": (sma(close, 50), 50),
+        "ema_12": (ema_12, 12),
+        "ema_26": (ema_26, 26),
+        "rsi_14": (rsi(close, 14, length - counts), 15),
+        "macd": (macd_line, 26),
+        "macd_signal": (macd_signal, 34),
+        "macd_hist": (macd_line - macd_signal, 34),
+        "bb_upper": (middle + band, 20),
+        "bb_middle": (middle, 20),
+        "bb_lower": (middle - band, 20),
+        "vwap_20": (vwap, 20),
+    }
+    masked = {}
+    for name, (values, warmup) in results.items():
+        values = values.copy()
+        values[_warmup_mask(counts, length, warmup)] = np.nan
+        masked[name] = values
+    return masked
+
+
+def _latest(values: Dict[str, np.ndarray], row: int) -> Dict[str, Optional[float]]:
+    latest = {}
+    for name in INDICATOR_FIELDS:
+        value = values[name][row, -1]
+        latest[name] = None if np.isnan(value) else round(float(value), 4)
+    return latest
+
+
+def _indicator_key(symbol: str, interval: str, bars: np.ndarray) -> str:
+    return f"indicators:{symbol}:{interval}:{int(bars['ts'][-1])}"
+
+
+def compute_indicators(bars_by_symbol: Dict[str, np.ndarray], interval: str,
+                       cached: Optional[Dict[str, Dict[str, object]]] = None) -> Dict[str, Dict[str, object]]:
+    """
+    Latest indicator values per symbol. Results are cached under the symbol's last
+    bar timestamp, so only symbols with new bars (not in `cached`) are stacked and recomputed.
+    """
+    results: Dict[str, Dict[str, object]] = dict(cached or {})
+    stale = [symbol for symbol, bars in bars_by_symbol.items() if len(bars) and symbol not in results]
+
+    if stale:
+        length = min(active_config.INDICATOR_LOOKBACK, max(len(bars_by_symbol[s]) for s in stale))
+        close, counts = stack_series([bars_by_symbol[s]["close"] for s in stale], length)
+        high, _ = stack_series([bars_by_symbol[s]["high"] for s in stale], length)
+        low, _ = stack_series([bars_by_symbol[s]["low"] for s in stale], length)
+        volume, _ = stack_series([bars_by_symbol[s]["volume"] for s in stale], length)
+        values = compute_indicator_matrix(close, high, low, volume, counts)
+        for row, symbol in enumerate(stale):
+            bars = bars_by_symbol[symbol]
+            entry = {"last_bar_ts": int(bars["ts"][-1]), **_latest(values, row)}
+            set_cache(_indicator_key(symbol, interval, bars), entry, ttl=active_config.INDICATOR_CACHE_TTL)
+            results[symbol] = entry
+    return results
+
+
+def load_bars(symbols: List[str], interval: str) -> Dict[str, object]:
+    """
+    Recent bars for many symbols, brought up to date by one bulk download. Each symbol
+    maps to its bars, or to the exception raised reading them.
+    """
+    try:
+        bar_store.refresh_many(symbols, interval)
+    except Exception as e:
+        # Serve whatever is already on disk
+        print(f"Error refreshing {interval} bars for {len(symbols)} symbols: {e}")
+    loaded = {}
+    for symbol in symbols:
+        try:
+            loaded[symbol] = bar_store.get_bars(symbol, interval, refresh=False)[-active_config.INDICATOR_LOOKBACK:]
+        except Exception as e:
+            loaded[symbol] = e
+    return loaded
+
+
+async def get_indicators_async(symbols: List[str], interval: str = "1d") -> List[IndicatorValues]:
+    """Indicators for many symbols: bars refresh in one bulk download, then one stacked computation"""
+    requested = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    tickers = {symbol: check_symbol(symbol) for symbol in requested}
+    symbols = list(dict.fromkeys(ticker for ticker in tickers.values() if ticker))
+    loaded = await run_blocking("yfinance", load_bars, symbols, interval) if symbols else {}
+    bars_by_symbol, errors = {}, {}
+    for symbol, bars in loaded.items():
+        if isinstance(bars, Exception):
+            errors[symbol] = f"Error loading price history: {bars}"
+        elif not len(bars):
+            errors[symbol] = f"Price history not found for symbol: {symbol}"
+        else:
+            bars_by_symbol[symbol] = bars
+
+    # Cached results are looked up here, so the compute pool never waits on the shared cache
+    keys = {symbol: _indicator_key(symbol, interval, bars) for symbol, bars in bars_by_symbol.items()}
+    lookups = await lookup_many_async(keys.values())
+    cached = {symbol: lookups[key][0] for symbol, key in keys.items() if lookups[key][1] == FRESH}
+    stale = {symbol: bars for symbol, bars in bars_by_symbol.items() if symbol not in cached}
+    computed = await run_blocking("compute", compute_indicators, stale, interval, cached) if stale else cached
+    by_ticker: Dict[str, IndicatorValues] = {}
+    for symbol in symbols:
+        entry = computed.get(symbol)
+        if entry is None:
+            by_ticker[symbol] = IndicatorValues(symbol=symbol, error=errors.get(symbol, "No indicator data"))
+            continue
+        values = {name: entry.get(name) for name in INDICATOR_FIELDS}
+        last_bar = datetime.fromtimestamp(entry["last_bar_ts"], tz=timezone.utc)
+        by_ticker[symbol] = IndicatorValues(symbol=symbol, last_bar=last_bar, **values)
+    # One entry per ticker, in request order, unknown symbols where they were asked for
+    results = []
+    for symbol, ticker in tickers.items():
+        if not ticker:
+            results.append(IndicatorValues(symbol=symbol, error=f"Unknown symbol: {symbol}"))
+        elif ticker in by_ticker:
+            results.append(by_ticker.pop(ticker))
+    return results
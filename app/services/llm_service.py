@@ -1,37 +1,35 @@
-import os
+import asyncio
+import threading
+import time
 import requests
-from dotenv import load_dotenv
+from app.services.answer_cache import answer_cache, normalize_question, normalize_symbol
+from app.services.groq_client import groq_client
+from app.utils.executors import get_executor, run_blocking
+from app.utils.metrics import histogram
+from app.utils.singleflight import get_flight
 
-# Load environment variables from .env file
-load_dotenv()
+# Without GROQ_API_KEY the app still starts: LLM routes answer 503 and summaries fall back to truncation
+if not groq_client.available:
+    print("GROQ_API_KEY is not set; LLM answers are disabled")
 
-# Get API key from environment variables
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set")
+class LLMUnavailable(Exception):
+    """Raised when an answer is needed but no Groq API key is configured"""
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"  # API endpoint for Groq
 def chat_with_groq(messages, model="llama3-8b-8192"):
     """Send a chat request to Groq API"""
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    payload = {
-        "model": model,
-        "messages": messages
-    }
     try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return groq_client.chat(messages, model=model)
     except requests.exceptions.HTTPError as http_err:
         print(f"HTTP error occurred: {http_err}")
-        print(f"Response content: {response.content}")
+        print(f"Response content: {http_err.response.content if http_err.response is not None else b''}")
     except Exception as err:
         print(f"Other error occurred: {err}")
     return None
 
+def stream_chat_with_groq(messages, model="llama3-8b-8192", stop_event=None):
+    """Send a streaming chat request to Groq API and yield content tokens as they arrive"""
+    return groq_client.stream_chat(messages, model=model, stop_event=stop_event)
+
 def financial_prompt_template(symbol, question):
     """Universal template for any stock-related question"""
     return [
@@ -45,11 +43,103 @@ def financial_prompt_template(symbol, question):
         {"role": "user", "content": f"Stock: {symbol}\nQuestion: {question}"}
     ]
 
-def get_stock_analysis(symbol, question):
-    """Get LLM analysis for any stock question"""
+FALLBACK_ANSWER = "Sorry, I couldn't analyze that stock at the moment."
+
+def _analyze(symbol, question):
+    """Ask Groq; returns None when no answer could be produced"""
+    if not groq_client.available:
+        return None
     messages = financial_prompt_template(symbol, question)
     response = chat_with_groq(messages)
     
     if response and 'choices' in response:
         return response['choices'][0]['message']['content']
-    return "Sorry, I couldn't analyze that stock at the moment."
\ No newline at end of file
+    return None
+
+def get_stock_analysis(symbol, question):
+    """Get LLM analysis for any stock question"""
+    answer, _ = answer_cache.lookup(symbol, question)
+    if answer is None:
+        answer = _analyze(symbol, question)
+        if answer is None:
+            return FALLBACK_ANSWER
+        answer_cache.store(symbol, question, answer)
+    return answer
+
+async def answer_stock_question(symbol, question):
+    """Answer a stock question, served from the answer cache when possible; returns (answer, cache metadata)"""
+    answer, meta = await answer_cache.lookup_async(symbol, question)
+    if answer is not None:
+        return answer, meta
+    if not groq_client.available:
+        raise LLMUnavailable("GROQ_API_KEY is not set")
+
+    async def load():
+        answer = await run_blocking("groq", _analyze, symbol, question)
+        if answer is not None:
+            await answer_cache.store_async(symbol, question, answer)
+        return answer
+
+    # Identical questions asked at the same time share one completion
+    key = (normalize_symbol(symbol), normalize_question(question))
+    answer = await get_flight("llm").do(key, load)
+    return (answer if answer is not None else FALLBACK_ANSWER), meta
+
+async def get_stock_analysis_async(symbol, question):
+    """Async entry point for get_stock_analysis; the Groq call runs on its own bounded pool"""
+    try:
+        answer, _ = await answer_stock_question(symbol, question)
+    except LLMUnavailable:
+        return FALLBACK_ANSWER
+    return answer
+
+async def stream_stock_analysis(symbol, question):
+    """
+    Async generator of answer tokens. The blocking stream is read on the Groq pool
+    and handed over through a queue; time-to-first-token and total latency are
+    recorded separately.
+    """
+    answer, _ = await answer_cache.lookup_async(symbol, question)
+    if answer is not None:
+        # Cached answers are sent as a single chunk
+        yield answer
+        return
+    if not groq_client.available:
+        raise LLMUnavailable("GROQ_API_KEY is not set")
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop_event = threading.Event()
+    done = object()
+    started = time.perf_counter()
+
+    def produce():
+        try:
+            for token in stream_chat_with_groq(financial_prompt_template(symbol, question), stop_event=stop_event):
+                loop.call_soon_threadsafe(queue.put_nowait, token)
+        except Exception as err:
+            loop.call_soon_threadsafe(queue.put_nowait, err)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    loop.run_in_executor(get_executor("groq"), produce)
+    first_token = True
+    tokens = []
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if first_token:
+                histogram("llm_time_to_first_token_seconds", "Time until the first streamed token").observe(time.perf_counter() - started)
+                first_token = False
+            tokens.append(item)
+            yield item
+        histogram("llm_stream_total_seconds", "Total latency of streamed answers").observe(time.perf_counter() - started)
+        if tokens:
+            await answer_cache.store_async(symbol, question, "".join(tokens))
+    finally:
+        # Client went away or the stream failed: stop reading the upstream response
+        stop_event.set()
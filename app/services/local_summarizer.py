@@ -0,0 +1,80 @@
+import threading
+from typing import List, Optional
+
+from app.configs import active_config
+from app.utils.batching import DynamicBatcher
+from app.utils.metrics import track_upstream
+
+
+class LocalSummarizer:
+    """
+    Distilled seq2seq summarization model (distilbart by default) run on CPU, loaded on
+    first use. Concurrent requests are gathered by a DynamicBatcher for a few milliseconds
+    and decoded as one padded batch, which costs little more than a single article.
+    """
+
+    def __init__(self, model_name: str, threads: int, quantize: bool, max_batch: int, batch_wait: float):
+        self.model_name = model_name
+        self.threads = threads
+        self.quantize = quantize
+        self._tokenizer = None
+        self._model = None
+        self._lock = threading.Lock()
+        self.batcher: DynamicBatcher[str, str] = DynamicBatcher(
+            self._generate, max_batch=max_batch, max_wait=batch_wait, name="local-summarizer"
+        )
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        with self._lock:
+            if self._model is not None:
+                return
+            import torch
+            from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+            if self.threads > 0:
+                torch.set_num_threads(self.threads)
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+            model.eval()
+            if self.quantize:
+                # int8 weights for every Linear layer; activations are quantized on the fly
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._model = model
+
+    def _generate(self, texts: List[str]) -> List[str]:
+        """One padded generate() call for the whole batch"""
+        import torch
+        if self._model is None:
+            self.load()
+        inputs = self._tokenizer(
+            texts, return_tensors="pt", padding=True, truncation=True,
+            max_length=active_config.LOCAL_SUMMARY_INPUT_TOKENS
+        )
+        with track_upstream("local_model", "summarize"), torch.inference_mode():
+            output = self._model.generate(
+                **inputs,
+                num_beams=active_config.LOCAL_SUMMARY_BEAMS,
+                max_new_tokens=active_config.LOCAL_SUMMARY_MAX_TOKENS,
+                no_repeat_ngram_size=3,
+                early_stopping=True
+            )
+        return [" ".join(summary.split()) for summary in self._tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+    def summarize(self, texts: List[str], timeout: Optional[float] = None) -> List[str]:
+        """Summaries in input order; the texts may share batches with other callers'"""
+        return self.batcher.map(texts, timeout=timeout)
+
+    def stats(self):
+        return {"model": self.model_name, "loaded": self.loaded, "quantized": self.quantize, **self.batcher.stats()}
+
+
+local_summarizer = LocalSummarizer(
+    model_name=active_config.LOCAL_SUMMARY_MODEL,
+    threads=active_config.LOCAL_SUMMARY_THREADS,
+    quantize=active_config.LOCAL_SUMMARY_QUANTIZE,
+    max_batch=active_config.LOCAL_SUMMARY_MAX_BATCH,
+    batch_wait=active_config.LOCAL_SUMMARY_BATCH_WAIT
+)
@@ -0,0 +1,100 @@
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.configs import active_config
+
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+# Equity sessions in IST; anything outside these windows (and weekends/holidays) is CLOSED
+SESSIONS: List[Tuple[str, time, time]] = [
+    ("PRE", time(9, 0), time(9, 15)),  # Pre-open call auction
+    ("REGULAR", time(9, 15), time(15, 30)),
+    ("CLOSING", time(15, 30), time(15, 40)),  # Closing price calculation
+    ("POST", time(15, 40), time(16, 0)),  # Post-close trades at the closing price
+]
+ACTIVE_SESSIONS = {"PRE", "REGULAR", "CLOSING"}  # Prices can still move
+
+
+def exchange_for_symbol(symbol: str) -> str:
+    return "BSE" if symbol.strip().upper().endswith(".BO") else "NSE"
+
+
+def load_holidays(path: str) -> Dict[str, Set[date]]:
+    """Read {"NSE": ["YYYY-MM-DD", ...], "BSE": [...]}; a missing file means no holidays"""
+    try:
+        with open(path, encoding="utf-8") as handle:
+            raw = json.load(handle)
+    except FileNotFoundError:
+        print(f"Market holiday calendar not found: {path}")
+        return {}
+    except Exception as e:
+        print(f"Error loading market holiday calendar {path}: {e}")
+        return {}
+    return {
+        exchange.upper(): {date.fromisoformat(day) for day in days}
+        for exchange, days in raw.items() if isinstance(days, list)
+    }
+
+
+class MarketClock:
+    """
+    Pure-computation NSE/BSE session clock. Answers "what session is it" and "when
+    does it change" from the time of day, the weekday and a holiday calendar, with no I/O.
+    """
+
+    def __init__(self, holidays: Optional[Dict[str, Set[date]]] = None):
+        self.holidays = holidays or {}
+
+    def load(self, path: str):
+        self.holidays = load_holidays(path)
+
+    def add_holidays(self, exchange: str, days: Iterable[date]):
+        self.holidays.setdefault(exchange.upper(), set()).update(days)
+
+    def is_trading_day(self, day: date, exchange: str = "NSE") -> bool:
+        return day.weekday() < 5 and day not in self.holidays.get(exchange, ())
+
+    def session(self, symbol: str = "", now: Optional[datetime] = None) -> str:
+        """PRE, REGULAR, CLOSING, POST or CLOSED for the symbol's exchange"""
+        now = (now or datetime.now(IST)).astimezone(IST)
+        if not self.is_trading_day(now.date(), exchange_for_symbol(symbol)):
+            return "CLOSED"
+        clock = now.time()
+        for name, start, end in SESSIONS:
+            if start <= clock < end:
+                return name
+        return "CLOSED"
+
+    def is_active(self, symbol: str = "", now: Optional[datetime] = None) -> bool:
+        """True while prices can still change"""
+        return self.session(symbol, now) in ACTIVE_SESSIONS
+
+    def next_change(self, symbol: str = "", now: Optional[datetime] = None) -> datetime:
+        """The next session boundary after `now` (skipping weekends and holidays)"""
+        now = (now or datetime.now(IST)).astimezone(IST)
+        exchange = exchange_for_symbol(symbol)
+        day = now.date()
+        for _ in range(366):
+            if self.is_trading_day(day, exchange):
+                for _, start, end in SESSIONS:
+                    for boundary in (start, end):
+                        moment = datetime.combine(day, boundary, IST)
+                        if moment > now:
+                            return moment
+            day += timedelta(days=1)
+        return now + timedelta(days=1)
+
+    def seconds_until_change(self, symbol: str = "", now: Optional[datetime] = None) -> float:
+        now = (now or datetime.now(IST)).astimezone(IST)
+        return (self.next_change(symbol, now) - now).total_seconds()
+
+    def quote_ttl(self, symbol: str, active_ttl: float) -> float:
+        """Cache lifetime for a quote: short while trading, until the next session otherwise"""
+        now = datetime.now(IST)
+        if self.is_active(symbol, now):
+            return active_ttl
+        return max(active_ttl, self.seconds_until_change(symbol, now))
+
+
+market_clock = MarketClock(load_holidays(active_config.MARKET_HOLIDAYS_FILE))
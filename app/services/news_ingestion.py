@@ -0,0 +1,170 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+
+from app.configs import active_config
+from app.services.article_extractor import extract_articles
+from app.services.feed_fetcher import FeedResult, fetch_feeds
+from app.services.news_store import StoredArticle, article_store, awaiting_extraction
+from app.services.summarizer import summarize_batch
+from app.services.symbol_master import symbol_master
+from app.utils.executors import run_blocking
+from app.utils.lazy import lazy_import
+
+bs4 = lazy_import("bs4")
+
+
+@dataclass
+class FeedSource:
+    name: str
+    url: str
+    interval: float  # Seconds between polls
+    timeout: float = active_config.FEED_FETCH_TIMEOUT  # Per-source deadline
+    symbol: Optional[str] = None  # Set for symbol-specific searches
+    next_poll: float = 0.0
+
+
+_sources: Dict[str, FeedSource] = {
+    feed["url"]: FeedSource(
+        name=feed["name"],
+        url=feed["url"],
+        interval=feed["interval"],
+        timeout=feed.get("timeout", active_config.FEED_FETCH_TIMEOUT)
+    )
+    for feed in active_config.NEWS_FEEDS
+}
+_task: Optional[asyncio.Task] = None
+
+
+def _sync_symbol_sources():
+    """Keep one Google News search per symbol the store tracks, dropping searches for symbols it evicted"""
+    tracked = set(article_store.tracked_symbols())
+    for url in [url for url, source in _sources.items() if source.symbol and source.symbol not in tracked]:
+        del _sources[url]
+    for symbol in tracked:
+        # Search by company name when the symbol master knows it ("Reliance Industries", not "RELIANCE")
+        query = next(iter(symbol_master.aliases(symbol)), symbol)
+        url = active_config.GOOGLE_NEWS_URL.format(query=quote_plus(query))
+        if url not in _sources:
+            _sources[url] = FeedSource(
+                name="Google News",
+                url=url,
+                interval=active_config.GOOGLE_NEWS_INTERVAL,
+                symbol=symbol
+            )
+
+
+def _entry_text(entry) -> str:
+    """Plain text of an entry's summary (feeds often embed HTML)"""
+    summary = entry.get('summary', '')
+    if '<' in summary:
+        summary = bs4.BeautifulSoup(summary, "html.parser").get_text(" ", strip=True)
+    return summary
+
+
+def _entry_published(entry) -> datetime:
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        return datetime(*entry.published_parsed[:6])
+    return datetime.utcnow()
+
+
+def _to_article(source: FeedSource, entry) -> StoredArticle:
+    return StoredArticle(
+        title=entry.get('title', ''),
+        url=entry.get('link', ''),
+        published_at=_entry_published(entry),
+        source=source.name,
+        text=_entry_text(entry),
+        symbols={source.symbol} if source.symbol else set()
+    )
+
+
+def ingest_result(source: FeedSource, result: FeedResult) -> int:
+    """Add a fetched feed's entries to the store; returns the number of new articles"""
+    if result.status != "ok":
+        # 'not_modified' is the cheap path; timeouts and errors are retried next interval
+        if result.status != "not_modified":
+            print(f"{source.name} RSS {result.status}: {result.error}")
+        return 0
+    added = 0
+    for entry in result.feed.entries:
+        if article_store.add(_to_article(source, entry)):
+            added += 1
+    return added
+
+
+async def poll_sources(sources: List[FeedSource]) -> int:
+    """Fetch feeds concurrently, each under its own deadline, and ingest what arrived"""
+    results = await fetch_feeds((source.url, source.timeout) for source in sources)
+    return sum(ingest_result(source, results[source.url]) for source in sources)
+
+
+async def extract_bodies(articles: List[StoredArticle]):
+    """Fetch the full text of articles that have none yet; near-duplicates fold together as it lands"""
+    pending = [article for article in articles if awaiting_extraction(article)]
+    if not pending:
+        return
+    texts = await extract_articles(article.url for article in pending)
+    for article in pending:
+        article_store.set_body(article.url, texts.get(article.url))
+
+
+async def extract_pending():
+    """Extract the newest tagged articles, a bounded batch per tick"""
+    if active_config.ARTICLE_EXTRACTION_ENABLED:
+        await extract_bodies(article_store.pending_extraction(active_config.ARTICLE_EXTRACTION_BATCH))
+
+
+async def summarize_pending():
+    """Summarize newly tagged articles off the request path, several per LLM call"""
+    pending = article_store.pending_summaries()
+    if not pending:
+        return
+    summaries = await run_blocking("groq", summarize_batch, [article.full_text for article in pending])
+    for article, summary in zip(pending, summaries):
+        article_store.set_summary(article.url, summary)
+
+
+async def run_once(now: Optional[float] = None) -> List[FeedSource]:
+    """Poll every feed that is due, extract the full text of what got tagged, then summarize it"""
+    now = time.monotonic() if now is None else now
+    _sync_symbol_sources()
+    due = [source for source in _sources.values() if source.next_poll <= now]
+    if due:
+        await poll_sources(due)
+    for source in due:
+        source.next_poll = now + source.interval
+    await extract_pending()
+    await summarize_pending()
+    return due
+
+
+async def _run_forever():
+    while True:
+        try:
+            await run_once()
+        except Exception as e:
+            print(f"News ingestion error: {e}")
+        await asyncio.sleep(active_config.NEWS_INGEST_TICK)
+
+
+def start_ingestion():
+    """Start the background ingestion loop on the running event loop"""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.create_task(_run_forever())
+    return _task
+
+
+async def stop_ingestion():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
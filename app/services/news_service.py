@@ -1,176 +1,109 @@
-import requests
-from bs4 import BeautifulSoup
-import feedparser
-from app.models.news_models import NewsArticle
-from datetime import datetime
-from typing import List
-import os
-from dotenv import load_dotenv
+import hashlib
+from app.configs import active_config
+from app.models.news_models import NewsArticle, StockNews
+from app.services.news_ingestion import extract_bodies
+from app.services.news_store import article_store, awaiting_extraction
+from app.services.summarizer import summarize_batch, summary_queue
+from app.services.symbol_master import check_symbol, symbol_master
+from app.utils.executors import run_blocking
+from app.utils.responses import EncodedResponse, get_response, store_response
+from app.utils.singleflight import get_flight
+from typing import List, Optional
 
-load_dotenv()
-
-# API Keys
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 
+def get_stock_news(symbol: str, limit: int = 10, summary_mode: Optional[str] = None) -> List[NewsArticle]:
+    """
+    Get news for a given stock symbol from the ingested article index.
+    Feeds are polled by the background ingestion loop, so the only possible network
+    call is summarizing articles that have not been summarized yet:
+    in "sync" mode they are summarized in one batched request before returning,
+    in "async" mode they are queued and the feed text is returned until the summary lands.
+    """
+    summary_mode = summary_mode or active_config.NEWS_SUMMARY_MODE
+    ticker = check_symbol(symbol)
+    if ticker is not None and not article_store.is_tracked(ticker):
+        article_store.track_symbol(ticker, symbol_master.aliases(ticker))
+    articles, pending = _indexed_articles(symbol, limit)
+    if pending and summary_mode == "sync":
+        _store_summaries(pending, summarize_batch([a.full_text for a in pending]))
+    elif pending:
+        _queue_summaries(pending)
+    return [article.to_model() for article in articles]
 
-def summarize_with_groq(text: str, max_length: int = 150) -> str:
-    """Use Groq API to summarize news article text"""
-    if not GROQ_API_KEY or not text.strip():
-        return text[:max_length] + "..." if len(text) > max_length else text
-    
-    try:
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "model": "llama3-8b-8192",
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": "You are a financial news summarizer. Provide ONLY the summary content in 4-5 clear, concise sentences. Focus on key financial information, stock impact, and important developments. Do not include phrases like 'Here is a summary' or 'The article discusses'. Start directly with the summary content."
-                },
-                {
-                    "role": "user", 
-                    "content": f"Summarize this financial news article:\n\n{text[:1000]}"  # Limit input text
-                }
-            ],
-            "max_tokens": 100,
-            "temperature": 0.3
-        }
-        
-        response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if 'choices' in data and len(data['choices']) > 0:
-                summary = data['choices'][0]['message']['content'].strip()
-                return summary if summary else text[:max_length] + "..."
 
-    except Exception as e:
-        print(f"Groq summarization error: {e}")
-    
-    # Fallback to truncation
-    return text[:max_length] + "..." if len(text) > max_length else text
+async def get_stock_news_async(symbol: str, limit: int = 10, summary_mode: Optional[str] = None) -> List[NewsArticle]:
+    """
+    Async entry point for get_stock_news. In "sync" mode missing full texts are
+    extracted first (folding near-duplicates), then summaries run on the Groq pool.
+    """
+    return [article.to_model() for article in await _current_articles(symbol, limit, summary_mode)]
 
 
-def get_stock_news(symbol: str, limit: int = 10) -> List[NewsArticle]:
+async def get_stock_news_response(symbol: str, limit: int = 10, summary_mode: Optional[str] = None) -> EncodedResponse:
     """
-    Fetch news for a given stock symbol using RSS feeds.
-    Returns a list of NewsArticle objects with title, url, published_at, source, and summary.
+    StockNews as encoded JSON for the route. The bytes are cached per version of the
+    symbol's article list (which articles, and which have summaries), so polls between
+    ingestion ticks reuse them. Responses still waiting for summaries are not cached.
     """
-    articles = []
-    
-    # Extract company name from symbol (remove .NS, .BO suffixes)
-    company_query = symbol.replace('.NS', '').replace('.BO', '')
-    
-    # 1. Economic Times RSS
-    try:
-        et_rss_url = "https://economictimes.indiatimes.com/markets/stocks/rssfeeds/2146842.cms"
-        feed = feedparser.parse(et_rss_url)
-        for entry in feed.entries[:limit//4]:
-            if company_query.lower() in entry.title.lower() or company_query.lower() in entry.get('summary', '').lower():
-                original_summary = entry.get('summary', '')
-                summarized = summarize_with_groq(original_summary)
-                articles.append(NewsArticle(
-                    title=entry.title,
-                    url=entry.link,
-                    published_at=datetime(*entry.published_parsed[:6]) if hasattr(entry, 'published_parsed') and entry.published_parsed else datetime.utcnow(),
-                    source="Economic Times",
-                    summary=summarized
-                ))
-    except Exception as e:
-        print(f"Economic Times RSS error: {e}")
+    articles = await _current_articles(symbol, limit, summary_mode)
+    version = hashlib.blake2b(
+        "\n".join(f"{article.url} {article.summary is not None}" for article in articles).encode("utf-8"),
+        digest_size=16
+    ).hexdigest()
+    key = f"response:news:{symbol}:{limit}:{version}"
+    encoded = await get_response(key)
+    if encoded is not None:
+        return encoded
+    ttl = 0 if any(article.summary is None for article in articles) else active_config.NEWS_RESPONSE_TTL
+    return store_response(key, StockNews(symbol=symbol, articles=[article.to_model() for article in articles]), ttl)
+
+
+async def _current_articles(symbol: str, limit: int, summary_mode: Optional[str]):
+    """Indexed articles for the symbol, summarized first in "sync" mode (queued otherwise)"""
+    summary_mode = summary_mode or active_config.NEWS_SUMMARY_MODE
+    ticker = check_symbol(symbol)
+    if ticker is not None and not article_store.is_tracked(ticker):
+        # First request for a symbol: index it under its company name and aliases (its Google News
+        # search starts on the next ingestion tick). check_symbol has already turned away malformed
+        # and known-unknown tickers, and the store only tracks NEWS_MAX_TRACKED_SYMBOLS of them.
+        # Re-tagging the store is a full scan, so it runs off the event loop, once for concurrent requests.
+        await get_flight("news").do(
+            ("track", ticker),
+            lambda: run_blocking("compute", article_store.track_symbol, ticker, symbol_master.aliases(ticker))
+        )
+    articles, pending = _indexed_articles(symbol, limit)
+    if pending and summary_mode == "sync":
+        if any(awaiting_extraction(article) for article in pending):
+            await get_flight("news").do(("extract", symbol), lambda: extract_bodies(pending))
+            articles, pending = _indexed_articles(symbol, limit)
+        # Requests for the same symbol share one batched summarization call
+        key = tuple(article.url for article in pending)
+        summaries = await get_flight("news").do(
+            key, lambda: run_blocking("groq", summarize_batch, [a.full_text for a in pending])
+        )
+        _store_summaries(pending, summaries)
+    elif pending:
+        _queue_summaries(pending)
+    return articles
+
 
-    # 2. Moneycontrol RSS
-    try:
-        mc_rss_url = "http://www.moneycontrol.com/rss/results.xml"
-        feed = feedparser.parse(mc_rss_url)
-        for entry in feed.entries[:limit//4]:
-            if company_query.lower() in entry.title.lower() or company_query.lower() in entry.get('summary', '').lower():
-                original_summary = entry.get('summary', '')
-                summarized = summarize_with_groq(original_summary)
-                articles.append(NewsArticle(
-                    title=entry.title,
-                    url=entry.link,
-                    published_at=datetime(*entry.published_parsed[:6]) if hasattr(entry, 'published_parsed') and entry.published_parsed else datetime.utcnow(),
-                    source="Moneycontrol",
-                    summary=summarized
-                ))
-    except Exception as e:
-        print(f"Moneycontrol RSS error: {e}")
+def _indexed_articles(symbol: str, limit: int):
+    """Newest indexed articles for a symbol, plus the ones still missing a summary"""
+    ticker = check_symbol(symbol)
+    if ticker is None:
+        return [], []
+    articles = article_store.newest(ticker, limit)
+    return articles, [article for article in articles if article.summary is None]
 
-    # 3. Business Standard RSS
-    try:
-        bs_rss_url = "https://www.business-standard.com/rss/markets-106.rss"
-        feed = feedparser.parse(bs_rss_url)
-        for entry in feed.entries[:limit//4]:
-            if company_query.lower() in entry.title.lower() or company_query.lower() in entry.get('summary', '').lower():
-                original_summary = entry.get('summary', '')
-                summarized = summarize_with_groq(original_summary)
-                articles.append(NewsArticle(
-                    title=entry.title,
-                    url=entry.link,
-                    published_at=datetime(*entry.published_parsed[:6]) if hasattr(entry, 'published_parsed') and entry.published_parsed else datetime.utcnow(),
-                    source="Business Standard",
-                    summary=summarized
-                ))
-    except Exception as e:
-        print(f"Business Standard RSS error: {e}")
 
-    # 4. Google News RSS (stock-specific)
-    try:
-        google_news_url = f"https://news.google.com/rss/search?q={company_query}+stock+share+price&hl=en-IN&gl=IN&ceid=IN:en"
-        feed = feedparser.parse(google_news_url)
-        for entry in feed.entries[:limit//4]:
-            original_summary = entry.get('summary', '')
-            summarized = summarize_with_groq(original_summary)
-            articles.append(NewsArticle(
-                title=entry.title,
-                url=entry.link,
-                published_at=datetime(*entry.published_parsed[:6]) if hasattr(entry, 'published_parsed') and entry.published_parsed else datetime.utcnow(),
-                source="Google News",
-                summary=summarized
-            ))
-    except Exception as e:
-        print(f"Google News RSS error: {e}")
+def _store_summaries(articles, summaries):
+    for article, summary in zip(articles, summaries):
+        article_store.set_summary(article.url, summary)
 
-    # 5. NewsAPI functionality (if API key available)
-    '''if NEWSAPI_KEY:
-        try:
-            params = {
-                'apiKey': NEWSAPI_KEY,
-                'q': f'{company_query} AND (stock OR share OR market)',
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'pageSize': limit//4
-            }
-            response = requests.get(NEWSAPI_URL, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for article in data.get('articles', []):
-                    original_description = article.get('description', '')
-                    summarized = summarize_with_groq(original_description)
-                    articles.append(NewsArticle(
-                        title=article.get('title', ''),
-                        url=article.get('url', ''),
-                        published_at=datetime.fromisoformat(article.get('publishedAt', '').replace('Z', '+00:00')) if article.get('publishedAt') else datetime.utcnow(),
-                        source=article.get('source', {}).get('name', 'NewsAPI'),
-                        summary=summarized
-                    ))
-        except Exception as e:
-            print(f"NewsAPI error: {e}")'''
 
-    # Remove duplicates by URL and sort by date
-    seen = set()
-    unique_articles = []
+def _queue_summaries(articles):
+    # Articles still waiting for their full text are summarized by the ingestion loop once it lands
     for article in articles:
-        if article.url not in seen and article.url:
-            unique_articles.append(article)
-            seen.add(article.url)
-    
-    # Sort by published date (newest first)
-    unique_articles.sort(key=lambda x: x.published_at, reverse=True)
-    
-    return unique_articles[:limit]
+        if awaiting_extraction(article):
+            continue
+        summary_queue.submit(article.full_text, lambda summary, url=article.url: article_store.set_summary(url, summary))
@@ -0,0 +1,285 @@
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.configs import active_config
+from app.models.news_models import NewsArticle
+from app.services.symbol_master import symbol_master
+from app.utils.aho_corasick import AhoCorasick, build_matcher
+from app.utils.simhash import SimHashIndex, simhash
+
+
+@dataclass
+class StoredArticle:
+    title: str
+    url: str
+    published_at: datetime
+    source: str
+    text: str  # Plain-text RSS summary used for tagging and summarization
+    summary: Optional[str] = None
+    symbols: Set[str] = field(default_factory=set)
+    body: Optional[bytes] = None  # zlib-compressed full article text, once extracted
+    extracted: bool = False  # Full-text extraction was attempted
+    fingerprint: int = 0  # SimHash of the best text we have
+    duplicates: Set[str] = field(default_factory=set)  # URLs of the same story from other sources
+
+    @property
+    def full_text(self) -> str:
+        """Extracted article body, or the feed text when there is none"""
+        return zlib.decompress(self.body).decode("utf-8") if self.body else self.text
+
+    def to_model(self, max_length: int = 150) -> NewsArticle:
+        summary = self.summary
+        if summary is None:
+            # Not summarized yet, fall back to the truncated feed text
+            summary = self.text[:max_length] + "..." if len(self.text) > max_length else self.text
+        return NewsArticle(
+            title=self.title,
+            url=self.url,
+            published_at=self.published_at,
+            source=self.source,
+            summary=summary
+        )
+
+
+def awaiting_extraction(article: StoredArticle) -> bool:
+    """True while an article's full text may still arrive (summarizing it now would waste an LLM call)"""
+    return active_config.ARTICLE_EXTRACTION_ENABLED and not article.extracted
+
+
+def base_symbol(symbol: str) -> str:
+    """Strip the exchange suffix so RELIANCE.NS and RELIANCE.BO share one index entry"""
+    return symbol.upper().replace('.NS', '').replace('.BO', '').strip()
+
+
+class ArticleStore:
+    """
+    In-memory article store with a per-symbol index built once at ingest time.
+    Near-duplicate stories (the same wire copy from several sources) are folded into
+    the first copy stored, so each story is extracted and summarized once.
+    """
+
+    def __init__(self, max_articles: int = 5000, duplicate_distance: int = 3, max_symbols: int = 200):
+        self.max_articles = max_articles
+        self.max_symbols = max_symbols
+        self._lock = threading.RLock()
+        self._track_lock = threading.Lock()  # One matcher rebuild at a time, outside the store lock
+        self._articles: Dict[str, StoredArticle] = {}  # url -> article
+        self._index: Dict[str, Set[str]] = {}  # base symbol -> urls
+        self._aliases: Dict[str, List[str]] = {}  # base symbol -> patterns
+        self._matcher = AhoCorasick()
+        self._recent: "OrderedDict[str, None]" = OrderedDict()  # Evictable tracked symbols, least recently requested first
+        self._fingerprints = SimHashIndex(duplicate_distance)  # url -> SimHash
+        self._duplicate_of: Dict[str, str] = {}  # folded url -> url of the copy kept
+        self.duplicates_folded = 0
+
+    def is_tracked(self, symbol: str) -> bool:
+        """Whether a symbol is indexed; counts as a use for the least-recently-used eviction"""
+        symbol = base_symbol(symbol)
+        with self._lock:
+            if symbol in self._recent:
+                self._recent.move_to_end(symbol)
+            return symbol in self._aliases
+
+    def track_symbol(self, symbol: str, aliases: Iterable[str] = (), pinned: bool = False) -> bool:
+        """
+        Start indexing a symbol (or add aliases to it); returns True if it was not tracked before.
+        Beyond max_symbols the least recently requested symbol is dropped (pinned ones never are).
+        Rebuilding the matcher and re-tagging stored articles scans the whole store, so it runs
+        outside the store lock; call it off the event loop.
+        """
+        symbol = base_symbol(symbol)
+        with self._track_lock:
+            with self._lock:
+                known = self._aliases.get(symbol)
+                new_aliases = [alias for alias in aliases if alias and alias not in (known or ())]
+                if not pinned and (known is None or symbol in self._recent):
+                    self._recent[symbol] = None
+                    self._recent.move_to_end(symbol)
+                if known is not None and not new_aliases:
+                    return False
+                patterns = (known or [symbol]) + new_aliases
+                self._aliases[symbol] = patterns
+                self._index.setdefault(symbol, set())
+                while len(self._recent) > self.max_symbols:
+                    self._untrack(self._recent.popitem(last=False)[0])
+                tracked = {name: list(names) for name, names in self._aliases.items()}
+                articles = list(self._articles.values())
+
+            matcher = build_matcher((pattern, name) for name, names in tracked.items() for pattern in names)
+            # Tag articles that arrived before the symbol was tracked
+            single = build_matcher((pattern, symbol) for pattern in patterns)
+            scanned = {article.url for article in articles}
+            hits = [article for article in articles if single.search(f"{article.title} {article.text}")]
+
+            with self._lock:
+                self._matcher = matcher
+                # Articles added during the scan were tagged with the old matcher
+                hits += [
+                    article for url, article in self._articles.items()
+                    if url not in scanned and single.search(f"{article.title} {article.text}")
+                ]
+                if symbol in self._aliases:
+                    for article in hits:
+                        if self._articles.get(article.url) is article:
+                            article.symbols.add(symbol)
+                            self._index[symbol].add(article.url)
+            return known is None
+
+    def _untrack(self, symbol: str):
+        """Stop indexing a symbol (caller holds the lock and rebuilds the matcher)"""
+        self._aliases.pop(symbol, None)
+        for url in self._index.pop(symbol, ()):
+            article = self._articles.get(url)
+            if article is not None:
+                article.symbols.discard(symbol)
+
+    def tracked_symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._aliases)
+
+    def add(self, article: StoredArticle) -> bool:
+        """Tag and store an article; returns False if the URL is already stored"""
+        if not article.url:
+            return False
+        with self._lock:
+            existing = self._articles.get(self._duplicate_of.get(article.url, article.url))
+            if existing is not None:
+                # Same story seen from another feed (e.g. a symbol-specific search)
+                self._add_symbols(existing, article.symbols)
+                return False
+            article.symbols |= self._matcher.search(f"{article.title} {article.text}")
+            article.fingerprint = simhash(f"{article.title} {article.text}")
+            original = self._fingerprints.find(article.fingerprint)
+            if original is not None:
+                self._fold(self._articles[original], article)
+                return False
+            self._articles[article.url] = article
+            self._fingerprints.add(article.url, article.fingerprint)
+            for symbol in article.symbols:
+                self._index.setdefault(symbol, set()).add(article.url)
+            if len(self._articles) > self.max_articles:
+                self._evict()
+            return True
+
+    def _add_symbols(self, article: StoredArticle, symbols: Set[str]):
+        for symbol in symbols - article.symbols:
+            article.symbols.add(symbol)
+            self._index.setdefault(symbol, set()).add(article.url)
+
+    def _fold(self, original: StoredArticle, duplicate: StoredArticle):
+        """Merge a near-duplicate into the copy that is kept (removing it if it was stored)"""
+        if self._articles.get(duplicate.url) is duplicate:
+            self._remove(duplicate)
+        self._add_symbols(original, duplicate.symbols)
+        if original.summary is None and duplicate.summary is not None:
+            original.summary = duplicate.summary
+        if original.body is None and duplicate.body is not None:
+            original.body = duplicate.body
+        for url in duplicate.duplicates | {duplicate.url}:
+            original.duplicates.add(url)
+            self._duplicate_of[url] = original.url
+        self.duplicates_folded += 1
+
+    def _remove(self, article: StoredArticle):
+        del self._articles[article.url]
+        self._fingerprints.remove(article.url)
+        for symbol in article.symbols:
+            self._index.get(symbol, set()).discard(article.url)
+
+    def _evict(self):
+        """Drop the oldest tenth of the store once it grows past max_articles"""
+        by_age = sorted(self._articles.values(), key=lambda a: a.published_at)
+        for article in by_age[:max(1, self.max_articles // 10)]:
+            self._remove(article)
+            for url in article.duplicates:
+                self._duplicate_of.pop(url, None)
+
+    def set_summary(self, url: str, summary: Optional[str]):
+        """Record an article's summary; None (summarization failed) leaves it pending for a retry"""
+        if summary is None:
+            return
+        with self._lock:
+            article = self._articles.get(url)
+            if article is not None:
+                article.summary = summary
+
+    def set_body(self, url: str, text: Optional[str]) -> str:
+        """
+        Record an extraction attempt and store the article text compressed. Returns the
+        URL the story now lives under: an earlier copy's, if the full text shows it is a
+        near-duplicate of one.
+        """
+        with self._lock:
+            url = self._duplicate_of.get(url, url)
+            article = self._articles.get(url)
+            if article is None:
+                return url
+            article.extracted = True
+            if not text:
+                return url
+            article.body = zlib.compress(text.encode("utf-8"))
+            article.fingerprint = simhash(text)
+            original = self._fingerprints.find(article.fingerprint, exclude=url)
+            if original is not None:
+                self._fold(self._articles[original], article)
+                return original
+            self._fingerprints.add(url, article.fingerprint)
+            return url
+
+    def pending_extraction(self, limit: int) -> List[StoredArticle]:
+        """Newest articles that mention a tracked symbol and have had no extraction attempt"""
+        with self._lock:
+            pending = [a for a in self._articles.values() if a.symbols and not a.extracted and a.summary is None]
+        pending.sort(key=lambda a: a.published_at, reverse=True)
+        return pending[:limit]
+
+    def pending_summaries(self) -> List[StoredArticle]:
+        """Articles that mention a tracked symbol but have no summary yet (and no full text on the way)"""
+        with self._lock:
+            return [
+                a for a in self._articles.values()
+                if a.symbols and a.summary is None and not awaiting_extraction(a)
+            ]
+
+    def newest(self, symbol: str, limit: int = 10) -> List[StoredArticle]:
+        """Newest stored articles indexed under a symbol"""
+        with self._lock:
+            urls = self._index.get(base_symbol(symbol), ())
+            articles = [self._articles[url] for url in urls]
+        articles.sort(key=lambda a: a.published_at, reverse=True)
+        return articles[:limit]
+
+    def lookup(self, symbol: str, limit: int = 10) -> List[NewsArticle]:
+        """Newest articles indexed under a symbol, as API models"""
+        return [article.to_model() for article in self.newest(symbol, limit)]
+
+    def clear(self):
+        with self._lock:
+            self._articles.clear()
+            self._fingerprints.clear()
+            self._duplicate_of.clear()
+            for urls in self._index.values():
+                urls.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            bodies = [a.body for a in self._articles.values() if a.body]
+            return {
+                "articles": len(self._articles),
+                "extracted": len(bodies),
+                "body_bytes": sum(len(body) for body in bodies),
+                "duplicates_folded": self.duplicates_folded,
+            }
+
+
+article_store = ArticleStore(
+    max_articles=active_config.NEWS_STORE_MAX_ARTICLES,
+    duplicate_distance=active_config.NEWS_DUPLICATE_DISTANCE,
+    max_symbols=active_config.NEWS_MAX_TRACKED_SYMBOLS
+)
+for _symbol in active_config.POPULAR_SYMBOLS:
+    article_store.track_symbol(_symbol, symbol_master.aliases(_symbol), pinned=True)
@@ -0,0 +1,214 @@
+import asyncio
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.configs import active_config
+from app.models.portfolio_models import (
+    Holding,
+    HoldingAnalysis,
+    DailyReturn,
+    CorrelationMatrix,
+    PortfolioAnalysis
+)
+from app.services.bar_store import bar_store
+from app.services.stock_service import fetch_quotes_async
+from app.services.symbol_master import check_symbol
+from app.utils.executors import run_blocking
+
+IST_OFFSET = 19800  # Seconds east of UTC; daily bars are bucketed by their IST trading date
+EPOCH = date(1970, 1, 1)
+
+
+def trading_days(ts: np.ndarray) -> np.ndarray:
+    """IST calendar day (days since the epoch) of each bar timestamp"""
+    return (np.asarray(ts, dtype=np.int64) + IST_OFFSET) // 86400
+
+
+def align_closes(bars: List[np.ndarray], days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (n_symbols, len(days)) close matrix on a shared day calendar. Each column takes the
+    last close on or before that day, so holidays and halts carry the price forward; the
+    mask is False before a symbol's first bar, where the matrix holds NaN.
+    """
+    closes = np.full((len(bars), len(days)), np.nan)
+    for row, series in enumerate(bars):
+        if not len(series):
+            continue
+        index = np.searchsorted(trading_days(series["ts"]), days, side="right") - 1
+        listed = index >= 0
+        closes[row, listed] = np.asarray(series["close"], dtype=np.float64)[index[listed]]
+    return closes, ~np.isnan(closes)
+
+
+def _masked_moments(x: np.ndarray, mx: np.ndarray, y: np.ndarray, my: np.ndarray):
+    """Pairwise-complete counts, covariances and variances of the rows of x against the rows of y"""
+    xz, yz = np.where(mx, x, 0.0), np.where(my, y, 0.0)
+    fx, fy = mx.astype(np.float64), my.astype(np.float64)
+    n = fx @ fy.T
+    sx, sy = xz @ fy.T, fx @ yz.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (xz @ yz.T - sx * sy / n) / (n - 1)
+        var_x = ((xz * xz) @ fy.T - sx * sx / n) / (n - 1)
+        var_y = (fx @ (yz * yz).T - sy * sy / n) / (n - 1)
+    return n, cov, var_x, var_y
+
+
+def risk_statistics(returns: np.ndarray, mask: np.ndarray, market: Optional[np.ndarray],
+                    min_history: int) -> Dict[str, np.ndarray]:
+    """
+    Annualized volatility, pairwise-complete correlation matrix and beta against the
+    market for every row of a daily return matrix, as a handful of matrix products.
+    Entries backed by fewer than min_history overlapping returns are NaN.
+    """
+    n, cov, var_x, var_y = _masked_moments(returns, mask, returns, mask)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[n < min_history] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= min_history, 1.0, np.nan))
+    volatility = np.sqrt(np.diag(var_x) * active_config.TRADING_DAYS_PER_YEAR)
+    volatility[np.diag(n) < min_history] = np.nan
+    beta = np.full(len(returns), np.nan)
+    if market is not None:
+        market_mask = ~np.isnan(market)
+        mn, mcov, _, mvar = _masked_moments(returns, mask, market[np.newaxis, :], market_mask[np.newaxis, :])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            beta = (mcov / mvar)[:, 0]
+        beta[mn[:, 0] < min_history] = np.nan
+    return {"volatility": volatility, "correlation": corr, "beta": beta}
+
+
+def _rounded(value, digits: int = 4) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def compute_portfolio(symbols: List[str], quantities: np.ndarray, costs: np.ndarray,
+                      prices: Dict[str, float], lookback: int) -> PortfolioAnalysis:
+    """Value, P&L and risk of the current holdings over the last `lookback` trading days of the benchmark"""
+    benchmark = active_config.PORTFOLIO_BENCHMARK
+    min_history = active_config.PORTFOLIO_MIN_HISTORY
+    bars = [bar_store.read(symbol, "1d") for symbol in symbols]
+    market_bars = bar_store.read(benchmark, "1d")
+    if len(market_bars):
+        days = np.unique(trading_days(market_bars["ts"]))
+    else:
+        # No benchmark history: fall back to every day any holding traded, and no beta
+        days = np.unique(np.concatenate([trading_days(series["ts"]) for series in bars] or [np.empty(0, np.int64)]))
+    days = days[-(lookback + 1):]
+    closes, listed = align_closes(bars, days)
+    market = align_closes([market_bars], days)[0][0] if len(market_bars) else None
+
+    # Prices: live quote, else the last stored close
+    last_close = np.array([series["close"][-1] if len(series) else np.nan for series in bars], dtype=np.float64)
+    price = np.array([prices.get(symbol, np.nan) for symbol in symbols], dtype=np.float64)
+    price = np.where(np.isnan(price), last_close, price)
+    value = quantities * price
+    basis = quantities * costs
+    total_value = float(np.nansum(value))
+    total_basis = float(basis[~np.isnan(value)].sum())
+
+    # Daily returns of every holding and of the portfolio. Before a holding's first bar its
+    # first close stands in, so the value series doesn't jump on the day it lists
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(closes, axis=1) / closes[:, :-1]
+    return_mask = listed[:, 1:] & listed[:, :-1]
+    # (days is empty when nothing has history yet, e.g. a cold bar store and yfinance down)
+    series_value = np.zeros(len(days))
+    rows = np.flatnonzero(listed.any(axis=1))
+    if len(rows):
+        first = listed[rows].argmax(axis=1)
+        filled = np.where(listed[rows], closes[rows], closes[rows, first][:, np.newaxis])
+        series_value = quantities[rows] @ filled
+    with np.errstate(divide="ignore", invalid="ignore"):
+        portfolio_returns = np.diff(series_value) / series_value[:-1]
+        market_returns = np.diff(market) / market[:-1] if market is not None else None
+    valid = np.isfinite(portfolio_returns)
+
+    stats = risk_statistics(returns, return_mask, market_returns, min_history)
+    portfolio = risk_statistics(portfolio_returns[np.newaxis, :], valid[np.newaxis, :], market_returns, min_history)
+
+    holdings = []
+    for row, symbol in enumerate(symbols):
+        if np.isnan(price[row]):
+            holdings.append(HoldingAnalysis(symbol=symbol, quantity=quantities[row], cost=costs[row],
+                                            error=f"Price data not found for symbol: {symbol}"))
+            continue
+        pnl = value[row] - basis[row]
+        holdings.append(HoldingAnalysis(
+            symbol=symbol,
+            quantity=quantities[row],
+            cost=_rounded(costs[row]),
+            price=_rounded(price[row]),
+            value=_rounded(value[row], 2),
+            weight=_rounded(value[row] / total_value) if total_value else None,
+            pnl=_rounded(pnl, 2),
+            pnl_percent=_rounded(pnl / basis[row] * 100, 2) if basis[row] else None,
+            volatility=_rounded(stats["volatility"][row]),
+            beta=_rounded(stats["beta"][row]),
+            error=None if return_mask[row].sum() >= min_history else "Not enough price history for risk statistics"
+        ))
+
+    pnl = total_value - total_basis
+    return PortfolioAnalysis(
+        benchmark=benchmark,
+        as_of=EPOCH + timedelta(days=int(days[-1])) if len(days) else None,
+        value=round(total_value, 2),
+        cost=round(total_basis, 2),
+        pnl=round(pnl, 2),
+        pnl_percent=round(pnl / total_basis * 100, 2) if total_basis else None,
+        volatility=_rounded(portfolio["volatility"][0]),
+        beta=_rounded(portfolio["beta"][0]),
+        returns=[
+            DailyReturn(date=EPOCH + timedelta(days=int(day)), value=round(float(total), 2), daily_return=round(float(change), 6))
+            for day, total, change, ok in zip(days[1:], series_value[1:], portfolio_returns, valid) if ok
+        ],
+        correlation=CorrelationMatrix(
+            symbols=symbols,
+            matrix=[[_rounded(value) for value in row] for row in stats["correlation"]]
+        ),
+        holdings=holdings
+    )
+
+
+async def analyze_portfolio(holdings: List[Holding], lookback: Optional[int] = None) -> PortfolioAnalysis:
+    """
+    Portfolio value, P&L and risk. Daily bars for every holding and the benchmark come
+    from one bulk download into the bar store, quotes from one bulk quote download,
+    and the statistics from one vectorized pass over the aligned price matrix.
+    """
+    lookback = lookback or active_config.PORTFOLIO_LOOKBACK_DAYS
+    # Repeated symbols are merged into one position at their quantity-weighted cost
+    positions: Dict[str, List[float]] = {}
+    unknown: List[Holding] = []
+    for holding in holdings:
+        ticker = check_symbol(holding.symbol.strip().upper())
+        if ticker is None:
+            unknown.append(holding)
+            continue
+        quantity, basis = positions.get(ticker, (0.0, 0.0))
+        positions[ticker] = [quantity + holding.quantity, basis + holding.quantity * holding.cost]
+    symbols = list(positions)
+    quantities = np.array([positions[symbol][0] for symbol in symbols], dtype=np.float64)
+    costs = np.array([positions[symbol][1] / positions[symbol][0] for symbol in symbols], dtype=np.float64)
+
+    prices: Dict[str, float] = {}
+    if symbols:
+        refreshed, quotes = await asyncio.gather(
+            run_blocking("yfinance", bar_store.refresh_many, symbols + [active_config.PORTFOLIO_BENCHMARK], "1d"),
+            fetch_quotes_async(symbols),
+            return_exceptions=True
+        )
+        if isinstance(refreshed, Exception):
+            # Analyze whatever history is already on disk
+            print(f"Error refreshing daily bars for portfolio: {refreshed}")
+        if isinstance(quotes, dict):
+            prices = {symbol: quote["price"] for symbol, quote in quotes.items() if quote and quote.get("price")}
+
+    analysis = await run_blocking("compute", compute_portfolio, symbols, quantities, costs, prices, lookback)
+    analysis.holdings.extend(
+        HoldingAnalysis(symbol=holding.symbol, quantity=holding.quantity, cost=holding.cost,
+                        error=f"Unknown symbol: {holding.symbol}")
+        for holding in unknown
+    )
+    return analysis
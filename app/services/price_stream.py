@@ -0,0 +1,165 @@
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.configs import active_config
+from app.services.market_clock import market_clock
+from app.services.stock_service import fetch_stock_batch
+from app.services.symbol_master import check_symbol
+
+# StockInfo fields pushed to stream subscribers
+QUOTE_FIELDS = ("price", "change", "percent_change", "volume", "day_high", "day_low", "market_state")
+
+
+def _quote_fields(stock) -> Dict[str, Any]:
+    return {field: getattr(stock, field) for field in QUOTE_FIELDS}
+
+
+def diff_quote(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of `current` that differ from `previous` (all of them for a new symbol)"""
+    if previous is None:
+        return dict(current)
+    return {field: value for field, value in current.items() if previous.get(field) != value}
+
+
+class Subscriber:
+    """
+    One connected client: its symbols and a bounded outbound queue. A client that
+    falls behind has its backlog dropped and is sent a fresh snapshot instead, so a
+    slow consumer costs at most `max_queue` messages of memory and never blocks the poller.
+    """
+
+    def __init__(self, max_queue: int):
+        self.symbols: Set[str] = set()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, message: Dict[str, Any], snapshot: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "snapshot", "data": snapshot})
+
+
+class PriceStreamHub:
+    """
+    Fans one upstream poller out to every stream subscriber. Each tick refreshes the
+    union of subscribed symbols in batches and pushes each client only the fields that
+    changed for its own symbols, so upstream load scales with distinct symbols, not clients.
+    """
+
+    def __init__(self, poll_interval: float, max_queue: int, batch_size: int):
+        self.poll_interval = poll_interval
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self._subscribers: Set[Subscriber] = set()
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.ticks = 0
+
+    def symbols(self) -> Set[str]:
+        return set().union(*(subscriber.symbols for subscriber in self._subscribers))
+
+    def snapshot(self, symbols: Iterable[str]) -> Dict[str, Any]:
+        return {symbol: self._latest[symbol] for symbol in symbols if symbol in self._latest}
+
+    def connect(self) -> Subscriber:
+        subscriber = Subscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        # Forget symbols nobody watches any more
+        watched = self.symbols()
+        for symbol in [symbol for symbol in self._latest if symbol not in watched]:
+            del self._latest[symbol]
+        if not self._subscribers:
+            self.stop()
+
+    def subscribe(self, subscriber: Subscriber, symbols: Iterable[str]) -> List[str]:
+        """Add symbols for a client and queue a snapshot of whatever is already known"""
+        limit = active_config.STREAM_MAX_SYMBOLS
+        added = []
+        for symbol in symbols:
+            # Canonical tickers only, so updates (keyed by ticker) reach the client
+            symbol = check_symbol(symbol)
+            if symbol and symbol not in subscriber.symbols and len(subscriber.symbols) < limit:
+                subscriber.symbols.add(symbol)
+                added.append(symbol)
+        snapshot = self.snapshot(added)
+        if snapshot:
+            subscriber.offer({"type": "snapshot", "data": snapshot}, self.snapshot(subscriber.symbols))
+        self._ensure_running()
+        return added
+
+    def unsubscribe(self, subscriber: Subscriber, symbols: Iterable[str]):
+        for symbol in symbols:
+            subscriber.symbols.discard(check_symbol(symbol) or symbol.strip().upper())
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _fetch(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Current quote fields for the given symbols (expired quotes share one bulk download)"""
+        results = await fetch_stock_batch(symbols)
+        return {result.symbol: _quote_fields(result.data) for result in results if result.data}
+
+    def _due(self) -> bool:
+        """Poll while any subscribed market can move, or a symbol still has no quote"""
+        return any(symbol not in self._latest or market_clock.is_active(symbol) for symbol in self.symbols())
+
+    async def poll_once(self) -> Dict[str, Dict[str, Any]]:
+        """Refresh every subscribed symbol once and push diffs; returns the changed fields"""
+        symbols = sorted(self.symbols())
+        changes: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(symbols), self.batch_size):
+            quotes = await self._fetch(symbols[start:start + self.batch_size])
+            for symbol, quote in quotes.items():
+                changed = diff_quote(self._latest.get(symbol), quote)
+                if changed:
+                    self._latest[symbol] = quote
+                    changes[symbol] = changed
+        self.ticks += 1
+        if changes:
+            now = time.time()
+            for subscriber in list(self._subscribers):
+                data = {symbol: changes[symbol] for symbol in subscriber.symbols if symbol in changes}
+                if data:
+                    subscriber.offer({"type": "update", "ts": now, "data": data}, self.snapshot(subscriber.symbols))
+        return changes
+
+    async def _run(self):
+        while self._subscribers:
+            try:
+                if self._due():
+                    await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Price stream poll error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "symbols": len(self.symbols()),
+            "ticks": self.ticks,
+            "dropped": sum(subscriber.dropped for subscriber in self._subscribers),
+        }
+
+
+price_stream = PriceStreamHub(
+    poll_interval=active_config.STREAM_POLL_INTERVAL,
+    max_queue=active_config.STREAM_QUEUE_SIZE,
+    batch_size=active_config.BATCH_MAX_SYMBOLS
+)
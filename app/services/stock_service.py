@@ -1,91 +1,459 @@
-import yfinance as yf
-from app.models.stock_models import StockInfo
-from typing import Optional
-from functools import lru_cache
-from datetime import datetime, timedelta
+import asyncio
+from app.configs import active_config
+from app.models.stock_models import StockInfo, BatchQuoteResult, PriceBar
+from app.services.bar_store import bar_store
+from app.services.market_clock import market_clock
+from app.services.symbol_master import check_symbol, mark_invalid
+from app.utils.cache import (
+    set_cache, clear_cache, cache_ttl, cached, lookup_cache, lookup_many_async, schedule_refresh, FRESH, STALE, MISS
+)
+from app.utils.executors import run_blocking
+from app.utils.lazy import lazy_import
+from app.utils.metrics import CACHE_LOOKUPS, track_upstream
+from app.utils.responses import EncodedResponse, get_response, store_response
+from app.utils.singleflight import get_flight
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import time
 
-# Cache with shorter TTL for real-time data
-@lru_cache(maxsize=100)
-def fetch_stock_data(symbol: str) -> Optional[StockInfo]:
-    """Fetch comprehensive real-time stock data from yfinance"""
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
+
+# StockInfo is cached as three field groups that go stale at different rates and are merged on read.
+# Profile and fundamentals both come from the slow .info scrape; quotes never touch it.
+PROFILE_FIELDS = ("name", "currency", "exchange", "sector", "industry")
+FUNDAMENTAL_FIELDS = (
+    "market_cap", "avg_volume", "week_52_high", "week_52_low",
+    "pe_ratio", "eps", "dividend_yield", "book_value", "previous_close"
+)
+QUOTE_FIELDS = ("price", "volume", "day_high", "day_low")
+
+def _group_key(group: str, symbol: str) -> str:
+    return f"stock:{group}:{symbol}"
+
+def _combine_states(*states: str) -> str:
+    """The least fresh of several cache states"""
+    for state in (MISS, STALE):
+        if state in states:
+            return state
+    return FRESH
+
+def _profile_from_info(symbol: str, info: dict) -> dict:
+    return {
+        "name": info.get('shortName') or info.get('longName', symbol),
+        "currency": info.get('currency', 'INR'),
+        "exchange": info.get('exchange', 'NSE'),
+        "sector": info.get('sector'),
+        "industry": info.get('industry')
+    }
+
+def _fundamentals_from_info(info: dict) -> dict:
+    return {
+        "market_cap": info.get('marketCap'),
+        "avg_volume": info.get('averageVolume'),
+        "week_52_high": info.get('fiftyTwoWeekHigh'),
+        "week_52_low": info.get('fiftyTwoWeekLow'),
+        "pe_ratio": info.get('trailingPE'),
+        "eps": info.get('trailingEps'),
+        "dividend_yield": info.get('dividendYield'),
+        "book_value": info.get('bookValue'),
+        "previous_close": info.get('regularMarketPreviousClose') or info.get('previousClose'),
+        # Last resort price when no quote source answers
+        "info_price": info.get('regularMarketPrice')
+    }
+
+def _refresh_info_groups(symbol: str) -> Optional[Tuple[dict, dict]]:
+    """Scrape .info once and cache both the profile and fundamentals groups"""
+    start = time.monotonic()
+    with track_upstream("yfinance", "info"):
+        info = yf.Ticker(symbol).info
+    if not info or not (info.get('shortName') or info.get('longName') or info.get('regularMarketPrice')):
+        # yfinance answers unknown tickers with an empty (or near-empty) info dict
+        mark_invalid(symbol)
+        return None
+    profile = _profile_from_info(symbol, info)
+    fundamentals = _fundamentals_from_info(info)
+    delta = time.monotonic() - start
+    set_cache(_group_key("profile", symbol), profile, ttl=active_config.STOCK_PROFILE_TTL,
+              stale_ttl=active_config.STOCK_PROFILE_STALE_TTL, delta=delta)
+    set_cache(_group_key("fundamentals", symbol), fundamentals, ttl=active_config.STOCK_FUNDAMENTALS_TTL,
+              stale_ttl=active_config.STOCK_FUNDAMENTALS_STALE_TTL, delta=delta)
+    return profile, fundamentals
+
+def _load_info_groups(symbol: str) -> Tuple[Optional[dict], Optional[dict], str]:
+    """
+    Profile, fundamentals and their cache state. .info is scraped inline only when a
+    group is missing; a stale group is served as-is while one background scrape refreshes it.
+    """
+    profile, profile_state, profile_due = lookup_cache(_group_key("profile", symbol))
+    fundamentals, fundamentals_state, fundamentals_due = lookup_cache(_group_key("fundamentals", symbol))
+    if MISS in (profile_state, fundamentals_state):
+        groups = _refresh_info_groups(symbol)
+        if groups is None:
+            return None, None, MISS
+        return groups[0], groups[1], MISS
+    if profile_due or fundamentals_due:
+        schedule_refresh(f"stock:info:{symbol}", lambda: _refresh_info_groups(symbol))
+    return profile, fundamentals, _combine_states(profile_state, fundamentals_state)
+
+def _quote_from_bars(bars) -> Optional[dict]:
+    """Quote fields from the latest session's 1-minute bars"""
+    if not len(bars):
+        return None
+    session_start = int(bars["ts"][-1]) // 86400 * 86400  # NSE/BSE sessions fall within one UTC day
+    session = bars[bars["ts"] >= session_start]
+    return {
+        "price": float(session["close"][-1]),
+        "volume": int(session["volume"].sum()),
+        "day_high": float(session["high"].max()),
+        "day_low": float(session["low"].min())
+    }
+
+def _fetch_quote(symbol: str) -> Optional[dict]:
+    """
+    Quote for one symbol; called at most once per quote TTL. A symbol whose 1m bars on disk
+    reach into the last few sessions gets just their tail downloaded (regardless of the bar
+    store's own refresh interval, so the quote is as fresh as its TTL). Anything else asks
+    fast_info rather than downloading a week of 1m bars on the request path.
+    """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        # Get recent data for real-time price
-        hist = ticker.history(period="1d", interval="1m")
-        current_price = float(hist['Close'].iloc[-1]) if not hist.empty else info.get('regularMarketPrice', 0.0)
-        
-        if not info:
+        session_start = int(time.time()) // 86400 * 86400 - 3 * 86400
+        stored = bar_store.read(symbol, "1m")
+        recent = len(stored) > 0 and int(stored["ts"][-1]) >= session_start
+        del stored
+        if recent:
+            bar_store.refresh(symbol, "1m", force=True)
+            quote = _quote_from_bars(bar_store.get_bars(symbol, "1m", start=session_start, refresh=False))
+            if quote is not None:
+                return quote
+    except Exception as e:
+        print(f"Error reading bars for {symbol}: {e}")
+    try:
+        with track_upstream("yfinance", "fast_info"):
+            fast = yf.Ticker(symbol).fast_info
+            price = fast.last_price
+        if price is None:
             return None
-            
-        return StockInfo(
-            symbol=symbol,
-            name=info.get('shortName') or info.get('longName', symbol),
-            price=current_price,
-            currency=info.get('currency', 'INR'),
-            exchange=info.get('exchange', 'NSE'),
-            change=info.get('regularMarketChange', 0.0),
-            percent_change=info.get('regularMarketChangePercent', 0.0),
-            
-            # Market data
-            market_cap=info.get('marketCap'),
-            volume=info.get('volume'),
-            avg_volume=info.get('averageVolume'),
-            
-            # Price ranges
-            day_high=info.get('dayHigh'),
-            day_low=info.get('dayLow'),
-            week_52_high=info.get('fiftyTwoWeekHigh'),
-            week_52_low=info.get('fiftyTwoWeekLow'),
-            
-            # Financial metrics
-            pe_ratio=info.get('trailingPE'),
-            eps=info.get('trailingEps'),
-            dividend_yield=info.get('dividendYield'),
-            book_value=info.get('bookValue'),
-            
-            # Market status
-            market_state=info.get('marketState', 'REGULAR'),
-            last_updated=datetime.now(),
-            
-            # Additional info
-            sector=info.get('sector'),
-            industry=info.get('industry')
-        )
+        return {
+            "price": float(price),
+            "volume": int(fast.last_volume) if fast.last_volume is not None else None,
+            "day_high": fast.day_high,
+            "day_low": fast.day_low
+        }
     except Exception as e:
-        print(f"Error fetching stock data for {symbol}: {e}")
+        print(f"Error fetching quote for {symbol}: {e}")
+        return None
+
+def _quote_ttl(symbol: str) -> float:
+    # Outside trading hours the last quote stays valid until the next session starts
+    return market_clock.quote_ttl(symbol, active_config.STOCK_QUOTE_TTL)
+
+def _load_quote(symbol: str) -> Tuple[Optional[dict], str]:
+    return cached(
+        _group_key("quote", symbol), lambda: _fetch_quote(symbol),
+        ttl=_quote_ttl(symbol), stale_ttl=active_config.STOCK_QUOTE_STALE_TTL
+    )
+
+def _merge_stock_info(symbol: str, profile: dict, fundamentals: dict, quote: Optional[dict]) -> StockInfo:
+    """Assemble StockInfo from its field groups; change is derived from the quote and previous close"""
+    quote = quote or {}
+    price = quote.get("price")
+    if price is None:
+        price = fundamentals.get("info_price") or 0.0
+    previous_close = fundamentals.get("previous_close")
+    change = percent_change = 0.0
+    if previous_close:
+        change = round(price - previous_close, 4)
+        percent_change = round(change / previous_close * 100, 4)
+    return StockInfo(
+        symbol=symbol,
+        price=price,
+        change=change,
+        percent_change=percent_change,
+        market_state=market_clock.session(symbol),
+        last_updated=datetime.now(),
+        **profile,
+        **{field: fundamentals.get(field) for field in FUNDAMENTAL_FIELDS if field != "previous_close"},
+        **{field: quote.get(field) for field in QUOTE_FIELDS if field != "price"}
+    )
+
+def _refresh_quote(symbol: str) -> Optional[dict]:
+    """Reload one symbol's quote group, as _load_quote does on a miss"""
+    start = time.monotonic()
+    quote = _fetch_quote(symbol)
+    if quote is not None:
+        set_cache(_group_key("quote", symbol), quote, ttl=_quote_ttl(symbol),
+                  stale_ttl=active_config.STOCK_QUOTE_STALE_TTL, delta=time.monotonic() - start)
+    return quote
+
+async def _cached_stock_data(symbol: str) -> Optional[Tuple[StockInfo, str]]:
+    """
+    StockInfo and its cache state from the cached field groups alone, or None if any is
+    missing. Stale or early-expiring groups are served as-is and refreshed in the background,
+    so nothing here calls upstream.
+    """
+    keys = [_group_key(group, symbol) for group in ("profile", "fundamentals", "quote")]
+    lookups = await lookup_many_async(keys, record=False)
+    (profile, profile_state, profile_due), (fundamentals, fundamentals_state, fundamentals_due), \
+        (quote, quote_state, quote_due) = (lookups[key] for key in keys)
+    if MISS in (profile_state, fundamentals_state, quote_state):
         return None
+    # Recorded only when served from here; a miss is recorded by the upstream path
+    for key in keys:
+        CACHE_LOOKUPS.labels("stock", lookups[key][1]).inc()
+    if profile_due or fundamentals_due:
+        schedule_refresh(f"stock:info:{symbol}", lambda: _refresh_info_groups(symbol))
+    if quote_due:
+        schedule_refresh(keys[2], lambda: _refresh_quote(symbol))
+    return (_merge_stock_info(symbol, profile, fundamentals, quote),
+            _combine_states(profile_state, fundamentals_state, quote_state))
+
+def _fetch_stock_data(symbol: str) -> Tuple[Optional[StockInfo], str]:
+    """StockInfo and the least fresh cache state among its field groups"""
+    try:
+        profile, fundamentals, info_state = _load_info_groups(symbol)
+        if profile is None:
+            return None, MISS
+        quote, quote_state = _load_quote(symbol)
+        return _merge_stock_info(symbol, profile, fundamentals, quote), _combine_states(info_state, quote_state)
+    except Exception as e:
+        print(f"Error fetching stock data for {symbol}: {e}")
+        return None, MISS
+
+def fetch_stock_data(symbol: str) -> Optional[StockInfo]:
+    """Fetch comprehensive real-time stock data, refreshing only the field groups that expired"""
+    ticker = check_symbol(symbol)
+    return _fetch_stock_data(ticker)[0] if ticker else None
+
+def _download_quotes(symbols: List[str]) -> Dict[str, dict]:
+    """Quote fields for many symbols from a single multi-ticker 1-minute download"""
+    with track_upstream("yfinance", "download"):
+        frame = yf.download(symbols, period="1d", interval="1m", group_by="ticker",
+                            threads=True, progress=False, auto_adjust=False)
+    quotes = {}
+    if frame is None or frame.empty:
+        return quotes
+    for symbol in symbols:
+        try:
+            bars = frame[symbol] if isinstance(frame.columns, pd.MultiIndex) else frame
+            bars = bars.dropna(subset=['Close'])
+        except KeyError:
+            continue
+        if not bars.empty:
+            quotes[symbol] = {
+                "price": float(bars['Close'].iloc[-1]),
+                "volume": int(bars['Volume'].sum()) if 'Volume' in bars else None,
+                "day_high": float(bars['High'].max()),
+                "day_low": float(bars['Low'].min())
+            }
+    return quotes
+
+def _store_quotes(symbols: List[str]) -> Dict[str, dict]:
+    """Bulk-download quotes and cache each symbol's quote group"""
+    start = time.monotonic()
+    quotes = _download_quotes(symbols)
+    delta = time.monotonic() - start
+    for symbol, quote in quotes.items():
+        set_cache(_group_key("quote", symbol), quote, ttl=_quote_ttl(symbol),
+                  stale_ttl=active_config.STOCK_QUOTE_STALE_TTL, delta=delta)
+    return quotes
+
+async def fetch_stock_batch(symbols: List[str]) -> List[BatchQuoteResult]:
+    """
+    Quotes for many symbols: cached field groups are served as-is (stale ones are
+    refreshed in the background), missing quotes come from one bulk download and
+    missing profiles/fundamentals fan out .info lookups on the yfinance pool.
+    A failing symbol gets an error entry instead of failing the whole batch.
+    """
+    requested = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+    tickers = {symbol: check_symbol(symbol) for symbol in requested}
+    symbols = list(dict.fromkeys(ticker for ticker in tickers.values() if ticker))
+    info_groups: Dict[str, Tuple[dict, dict]] = {}
+    quotes: Dict[str, dict] = {}
+    states: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    stale_quotes: List[str] = []
+    lookups = await lookup_many_async(
+        [_group_key(group, symbol) for symbol in symbols for group in ("profile", "fundamentals", "quote")]
+    )
+    for symbol in symbols:
+        profile, profile_state, profile_due = lookups[_group_key("profile", symbol)]
+        fundamentals, fundamentals_state, fundamentals_due = lookups[_group_key("fundamentals", symbol)]
+        quote, quote_state, quote_due = lookups[_group_key("quote", symbol)]
+        states[symbol] = _combine_states(profile_state, fundamentals_state, quote_state)
+        if MISS not in (profile_state, fundamentals_state):
+            info_groups[symbol] = (profile, fundamentals)
+            if profile_due or fundamentals_due:
+                schedule_refresh(f"stock:info:{symbol}", lambda symbol=symbol: _refresh_info_groups(symbol))
+        if quote_state != MISS:
+            quotes[symbol] = quote
+            if quote_due:
+                stale_quotes.append(symbol)
+    if stale_quotes:
+        schedule_refresh(f"stock:quotes:{','.join(stale_quotes)}", lambda: _store_quotes(stale_quotes))
+    need_info = [symbol for symbol in symbols if symbol not in info_groups]
+    need_quote = [symbol for symbol in symbols if symbol not in quotes]
+
+    if need_info or need_quote:
+        quote_tasks = [run_blocking("yfinance", _store_quotes, need_quote)] if need_quote else []
+        info_tasks = [
+            get_flight("stock").do(("info", symbol), lambda symbol=symbol: run_blocking("yfinance", _refresh_info_groups, symbol))
+            for symbol in need_info
+        ]
+        results = await asyncio.gather(*quote_tasks, *info_tasks, return_exceptions=True)
+        fresh_quotes, infos = (results[0], results[1:]) if need_quote else ({}, results)
+        if isinstance(fresh_quotes, Exception):
+            print(f"Bulk quote download failed: {fresh_quotes}")
+            fresh_quotes = {}
+        quotes.update(fresh_quotes)
+        for symbol, groups in zip(need_info, infos):
+            if isinstance(groups, Exception):
+                errors[symbol] = f"Error fetching stock data: {groups}"
+            elif groups is None:
+                errors[symbol] = f"Stock data not found for symbol: {symbol}"
+            else:
+                info_groups[symbol] = groups
+
+    by_ticker: Dict[str, BatchQuoteResult] = {}
+    for symbol in symbols:
+        data = None
+        if symbol in info_groups:
+            try:
+                data = _merge_stock_info(symbol, *info_groups[symbol], quotes.get(symbol))
+            except Exception as e:
+                errors[symbol] = f"Error fetching stock data: {e}"
+        by_ticker[symbol] = BatchQuoteResult(
+            symbol=symbol, data=data, error=errors.get(symbol), cache=states[symbol] if data else None
+        )
+    # One entry per ticker, in request order, unknown symbols where they were asked for
+    results = []
+    for symbol, ticker in tickers.items():
+        if ticker is None:
+            results.append(BatchQuoteResult(symbol=symbol, error=f"Unknown symbol: {symbol}"))
+        elif ticker in by_ticker:
+            results.append(by_ticker.pop(ticker))
+    return results
+
+async def fetch_quotes_async(symbols: List[str]) -> Dict[str, dict]:
+    """Quote fields for many tickers (no .info lookups): cached quotes as-is, the rest from one bulk download"""
+    quotes: Dict[str, dict] = {}
+    missing, stale = [], []
+    lookups = await lookup_many_async([_group_key("quote", symbol) for symbol in symbols])
+    for symbol in symbols:
+        quote, state, refresh_due = lookups[_group_key("quote", symbol)]
+        if state == MISS or not quote:
+            missing.append(symbol)
+            continue
+        quotes[symbol] = quote
+        if refresh_due:
+            stale.append(symbol)
+    if stale:
+        schedule_refresh(f"stock:quotes:{','.join(stale)}", lambda: _store_quotes(stale))
+    if missing:
+        try:
+            quotes.update(await run_blocking("yfinance", _store_quotes, missing))
+        except Exception as e:
+            print(f"Bulk quote download failed: {e}")
+    return quotes
 
 def get_real_time_price(symbol: str) -> Optional[float]:
-    """Get real-time price with minimal latency"""
+    """Get real-time price with minimal latency (quote fields only, never the .info scrape)"""
+    ticker = check_symbol(symbol)
+    if ticker is None:
+        return None
     try:
-        ticker = yf.Ticker(symbol)
-        # Get the most recent price
-        hist = ticker.history(period="1d", interval="1m")
-        if not hist.empty:
-            return float(hist['Close'].iloc[-1])
-        
-        # Fallback to regular market price
-        info = ticker.info
-        return info.get('regularMarketPrice')
+        quote, _ = _load_quote(ticker)
+        return quote["price"] if quote else None
     except Exception as e:
         print(f"Error fetching real-time price for {symbol}: {e}")
         return None
 
 def get_market_status(symbol: str) -> str:
-    """Get current market status"""
-    try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        return info.get('marketState', 'UNKNOWN')
-    except:
-        return 'UNKNOWN'
+    """Get current market status from the local exchange clock (no network call)"""
+    return market_clock.session(symbol)
+
+async def fetch_stock_data_with_state_async(symbol: str) -> Tuple[Optional[StockInfo], str]:
+    """Async entry point for fetch_stock_data, plus the cache state; yfinance runs on its own bounded pool"""
+    symbol = check_symbol(symbol)
+    if symbol is None:
+        # Malformed or known-unknown ticker: answered without an upstream call
+        return None, MISS
+    served = await _cached_stock_data(symbol)
+    if served is not None:
+        return served
+    # Concurrent requests for a cold symbol share one upstream call
+    return await get_flight("stock").do(("stock", symbol), lambda: run_blocking("yfinance", _fetch_stock_data, symbol))
+
+async def fetch_stock_response_async(symbol: str) -> Tuple[Optional[EncodedResponse], str]:
+    """
+    StockInfo as encoded JSON for the route. The bytes are cached until the first of its
+    field groups expires, so polling a fresh symbol skips the merge, the model and the encoding.
+    """
+    ticker = check_symbol(symbol)
+    if ticker is None:
+        return None, MISS
+    key = f"response:stock:{ticker}"
+    encoded = await get_response(key)
+    if encoded is not None:
+        return encoded, FRESH
+    stock, state = await fetch_stock_data_with_state_async(ticker)
+    if stock is None:
+        return None, state
+    ttl = min(cache_ttl(_group_key(group, ticker)) for group in ("profile", "fundamentals", "quote"))
+    return store_response(key, stock, ttl), state
+
+async def fetch_stock_data_async(symbol: str) -> Optional[StockInfo]:
+    stock, _ = await fetch_stock_data_with_state_async(symbol)
+    return stock
+
+async def get_real_time_price_async(symbol: str) -> Optional[float]:
+    symbol = check_symbol(symbol)
+    if symbol is None:
+        return None
+    return await get_flight("stock").do(
+        ("price", symbol), lambda: run_blocking("yfinance", get_real_time_price, symbol)
+    )
+
+async def get_market_status_async(symbol: str) -> str:
+    return get_market_status(symbol)
+
+def get_price_history(symbol: str, interval: str = "1d", start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> List[PriceBar]:
+    """OHLCV bars for a time range, served from the local bar store"""
+    ticker = check_symbol(symbol)
+    if ticker is None:
+        return []
+    bars = bar_store.get_bars(
+        ticker, interval,
+        start=int(start.timestamp()) if start else None,
+        end=int(end.timestamp()) if end else None
+    )
+    return [
+        PriceBar(
+            timestamp=datetime.fromtimestamp(int(bar["ts"]), tz=timezone.utc),
+            open=float(bar["open"]),
+            high=float(bar["high"]),
+            low=float(bar["low"]),
+            close=float(bar["close"]),
+            volume=float(bar["volume"])
+        )
+        for bar in bars
+    ]
+
+async def get_price_history_async(symbol: str, interval: str = "1d", start: Optional[datetime] = None,
+                                  end: Optional[datetime] = None) -> List[PriceBar]:
+    symbol = check_symbol(symbol)
+    if symbol is None:
+        return []
+    return await get_flight("stock").do(
+        ("history", symbol, interval, start, end),
+        lambda: run_blocking("yfinance", get_price_history, symbol, interval, start, end)
+    )
 
 def clear_stock_cache():
     """Clear the stock data cache to ensure fresh data"""
-    fetch_stock_data.cache_clear()
+    clear_cache("stock:")
+    clear_cache("response:stock:")
 
 # Enhanced test function
 def test_fetch_indian_stocks():
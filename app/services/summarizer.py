@@ -0,0 +1,195 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.configs import active_config
+from app.services.groq_client import groq_client
+from app.services.local_summarizer import local_summarizer
+from app.utils.cache import get_cache, set_cache
+
+SYSTEM_PROMPT = (
+    "You are a financial news summarizer. Provide ONLY the summary content in 4-5 clear, concise sentences. "
+    "Focus on key financial information, stock impact, and important developments. "
+    "Do not include phrases like 'Here is a summary' or 'The article discusses'. Start directly with the summary content."
+)
+
+BATCH_PROMPT = (
+    SYSTEM_PROMPT + " You will receive several numbered articles. "
+    'Reply with JSON only, in the form {"summaries": [{"id": <article number>, "summary": "<summary>"}]}, '
+    "with exactly one entry per article."
+)
+
+
+def _truncate(text: str, max_length: int = 150) -> str:
+    return text[:max_length] + "..." if len(text) > max_length else text
+
+
+def content_hash(text: str) -> str:
+    """Cache key for a summary: identical article text is summarized once"""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+def _cache_key(digest: str) -> str:
+    return f"summary:{digest}"
+
+
+def summarize_with_groq(text: str, max_length: int = 150) -> str:
+    """Use Groq API to summarize news article text"""
+    summary = summarize_batch([text])[0]
+    return summary if summary is not None else _truncate(text, max_length)
+
+
+def _summarize_chunk(texts: List[str]) -> Dict[int, str]:
+    """One Groq request for several articles; returns summaries by position"""
+    articles = "\n\n".join(
+        f"Article {i + 1}:\n{text[:active_config.SUMMARY_INPUT_CHARS]}" for i, text in enumerate(texts)
+    )
+    payload = {
+        "model": "llama3-8b-8192",
+        "messages": [
+            {"role": "system", "content": BATCH_PROMPT},
+            {"role": "user", "content": f"Summarize each of these financial news articles:\n\n{articles}"}
+        ],
+        "response_format": {"type": "json_object"},
+        "max_tokens": 120 * len(texts),
+        "temperature": 0.3
+    }
+    data = groq_client.chat(timeout=10 + 2 * len(texts), operation="summarize", **payload)
+    if not data.get('choices'):
+        return {}
+    content = data['choices'][0]['message']['content']
+    summaries = {}
+    for item in json.loads(content).get("summaries", []):
+        try:
+            index = int(item["id"]) - 1
+        except (KeyError, TypeError, ValueError):
+            continue
+        summary = str(item.get("summary", "")).strip()
+        if 0 <= index < len(texts) and summary:
+            summaries[index] = summary
+    return summaries
+
+
+def _summarize_chunk_local(texts: List[str]) -> Dict[int, str]:
+    """Summaries from the local CPU model; the batcher splits and pads the chunk itself"""
+    summaries = local_summarizer.summarize([text[:active_config.SUMMARY_INPUT_CHARS] for text in texts])
+    return {i: summary for i, summary in enumerate(summaries) if summary}
+
+
+def _backend() -> Optional[Tuple[Callable[[List[str]], Dict[int, str]], Optional[int]]]:
+    """(chunk summarizer, chunk size) for SUMMARY_BACKEND, or None if it can't be used"""
+    if active_config.SUMMARY_BACKEND == "local":
+        return _summarize_chunk_local, None
+    if groq_client.available:
+        return _summarize_chunk, active_config.SUMMARY_BATCH_SIZE
+    return None
+
+
+def summarize_batch(texts: List[str]) -> List[Optional[str]]:
+    """
+    Summarize many articles with as few model calls as possible (Groq requests, or
+    padded batches on the local model when SUMMARY_BACKEND is "local").
+    Summaries are cached by content hash, so each distinct article text is summarized
+    at most once. Articles that can't be summarized (backend error, no API key) come
+    back as None, so callers leave them unsummarized and retry on a later pass.
+    """
+    results: List[Optional[str]] = [None] * len(texts)
+    missing: Dict[str, List[int]] = {}
+    for i, text in enumerate(texts):
+        if not text.strip():
+            results[i] = text
+            continue
+        digest = content_hash(text)
+        cached = get_cache(_cache_key(digest))
+        if cached is not None:
+            results[i] = cached
+        else:
+            missing.setdefault(digest, []).append(i)
+
+    backend = _backend() if missing else None
+    if backend is not None:
+        summarize_chunk, size = backend
+        digests = list(missing)
+        size = size or len(digests)
+        for start in range(0, len(digests), size):
+            chunk = digests[start:start + size]
+            try:
+                summaries = summarize_chunk([texts[missing[d][0]] for d in chunk])
+            except Exception as e:
+                print(f"Summarization error ({active_config.SUMMARY_BACKEND}): {e}")
+                continue
+            for position, summary in summaries.items():
+                digest = chunk[position]
+                set_cache(_cache_key(digest), summary, ttl=active_config.SUMMARY_CACHE_TTL)
+                for i in missing[digest]:
+                    results[i] = summary
+
+    return results
+
+
+class SummaryQueue:
+    """
+    Background summarization: submit() returns immediately and the callback runs
+    once the article's batch has been summarized (with None if it couldn't be). Requests arriving within
+    SUMMARY_BATCH_WAIT seconds of each other share one Groq call (or local model batch).
+    """
+
+    def __init__(self, batch_size: int, batch_wait: float):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self._callbacks: Dict[str, List[Callable[[Optional[str]], None]]] = {}
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, text: str, callback: Callable[[Optional[str]], None]):
+        digest = content_hash(text)
+        with self._lock:
+            waiting = self._callbacks.setdefault(digest, [])
+            waiting.append(callback)
+            if len(waiting) > 1:
+                # Already queued or in flight
+                return
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="summary-queue", daemon=True)
+                self._worker.start()
+        self._queue.put((digest, text))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._callbacks)
+
+    def _next_batch(self) -> List[Tuple[str, str]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            summaries = summarize_batch([text for _, text in batch])
+            for (digest, _), summary in zip(batch, summaries):
+                with self._lock:
+                    callbacks = self._callbacks.pop(digest, [])
+                for callback in callbacks:
+                    try:
+                        callback(summary)
+                    except Exception as e:
+                        print(f"Summary callback error: {e}")
+
+
+summary_queue = SummaryQueue(
+    batch_size=active_config.SUMMARY_BATCH_SIZE,
+    batch_wait=active_config.SUMMARY_BATCH_WAIT
+)
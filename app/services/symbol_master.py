@@ -0,0 +1,201 @@
+import csv
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.configs import active_config
+from app.utils.cache import get_cache, set_cache
+
+# Yahoo ticker suffix per exchange; index rows keep their own symbol (e.g. ^NSEI)
+EXCHANGE_SUFFIXES = {"NSE": ".NS", "BSE": ".BO", "INDEX": ""}
+# Characters that can appear in an NSE/BSE/Yahoo ticker (M&M.NS, BAJAJ-AUTO.NS, ^NSEI)
+TICKER_PATTERN = re.compile(r"^\^?[A-Z0-9][A-Z0-9&._-]{0,24}$")
+_CORPORATE_SUFFIX = re.compile(r"\s+(limited|ltd\.?)$", re.IGNORECASE)
+
+# Search key kinds, best first
+_KEY_SYMBOL, _KEY_NAME, _KEY_WORD = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class Listing:
+    ticker: str  # Yahoo ticker, e.g. RELIANCE.NS
+    symbol: str  # Exchange symbol, e.g. RELIANCE
+    exchange: str
+    name: str
+    aliases: Tuple[str, ...] = ()
+
+
+def normalize_query(text: str) -> str:
+    """Upper-case, single-spaced search text"""
+    return " ".join(text.upper().replace(",", " ").split())
+
+
+def company_name(name: str) -> str:
+    """Name as it appears in headlines: without "The", "(India)" or a Limited/Ltd suffix"""
+    name = re.sub(r"\s*\([^)]*\)", "", name).strip()
+    name = _CORPORATE_SUFFIX.sub("", name)
+    if name.lower().startswith("the "):
+        name = name[4:]
+    return name.strip()
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or "").split(";") if part.strip()]
+
+
+def _listings_from_row(row: Dict[str, str]) -> List[Listing]:
+    """
+    One CSV row as listings. Understands data/symbols.csv (symbol, name, exchanges,
+    aliases), the NSE equity list (SYMBOL, NAME OF COMPANY) and the BSE scrip list
+    (Security Id, Security Name/Issuer Name).
+    """
+    row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+    if "name of company" in row:
+        symbol, name, exchanges, aliases = row.get("symbol"), row["name of company"], ["NSE"], []
+    elif "security id" in row:
+        symbol, name, exchanges, aliases = (
+            row["security id"], row.get("security name") or row.get("issuer name"), ["BSE"], []
+        )
+    else:
+        symbol, name = row.get("symbol"), row.get("name")
+        exchanges, aliases = [e.upper() for e in _split(row.get("exchanges"))] or ["NSE"], _split(row.get("aliases"))
+    if not symbol or not name:
+        return []
+    symbol = symbol.upper()
+    return [
+        Listing(ticker=symbol + EXCHANGE_SUFFIXES.get(exchange, ""), symbol=symbol, exchange=exchange,
+                name=name, aliases=tuple(aliases))
+        for exchange in exchanges if exchange in EXCHANGE_SUFFIXES
+    ]
+
+
+def load_listings(paths: Iterable[str]) -> List[Listing]:
+    """Read every listing file; missing or unreadable files are skipped"""
+    listings = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as handle:
+                for row in csv.DictReader(handle):
+                    listings.extend(_listings_from_row(row))
+        except FileNotFoundError:
+            print(f"Symbol listing not found: {path}")
+        except Exception as e:
+            print(f"Error loading symbol listing {path}: {e}")
+    return listings
+
+
+class SymbolMaster:
+    """
+    In-memory NSE/BSE symbol index. Exact lookups go through a ticker dict; prefix
+    search runs over one sorted array of keys (symbols, full names and every word-
+    suffix of a name or alias) with parallel arrays pointing back at the listing,
+    so autocomplete is a binary search plus a short scan.
+    """
+
+    def __init__(self, listings: Iterable[Listing] = ()):
+        self.load(listings)
+
+    def load(self, listings: Iterable[Listing]):
+        self._listings: List[Listing] = list({listing.ticker: listing for listing in listings}.values())
+        self._by_ticker: Dict[str, int] = {listing.ticker: i for i, listing in enumerate(self._listings)}
+        # Base symbol, name or alias -> listings; NSE comes first so it wins when resolving
+        self._by_text: Dict[str, List[int]] = {}
+        keys: List[Tuple[str, int, int]] = []
+        for i, listing in enumerate(self._listings):
+            keys.append((listing.symbol, _KEY_SYMBOL, i))
+            keys.append((listing.ticker, _KEY_SYMBOL, i))
+            for text in (listing.name, company_name(listing.name)) + listing.aliases:
+                words = normalize_query(text).split(" ")
+                keys.append((" ".join(words), _KEY_NAME, i))
+                keys.extend((" ".join(words[start:]), _KEY_WORD, i) for start in range(1, len(words)))
+            for text in {listing.symbol, normalize_query(listing.name), normalize_query(company_name(listing.name)),
+                         *(normalize_query(alias) for alias in listing.aliases)}:
+                self._by_text.setdefault(text, []).append(i)
+        for owners in self._by_text.values():
+            owners.sort(key=lambda i: self._exchange_rank(self._listings[i]))
+        keys = sorted(set(keys))
+        self._keys: List[str] = [key for key, _, _ in keys]
+        self._kinds = array("B", (kind for _, kind, _ in keys))
+        self._owners = array("I", (owner for _, _, owner in keys))
+
+    @staticmethod
+    def _exchange_rank(listing: Listing) -> int:
+        return ("NSE", "INDEX", "BSE").index(listing.exchange) if listing.exchange in ("NSE", "INDEX", "BSE") else 3
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def get(self, ticker: str) -> Optional[Listing]:
+        index = self._by_ticker.get(ticker.strip().upper())
+        return self._listings[index] if index is not None else None
+
+    def resolve(self, text: str) -> Optional[str]:
+        """Ticker for an exact ticker, exchange symbol, company name or alias (NSE preferred)"""
+        query = normalize_query(text)
+        if query in self._by_ticker:
+            return query
+        owners = self._by_text.get(query)
+        return self._listings[owners[0]].ticker if owners else None
+
+    def search(self, query: str, limit: int = 10) -> List[Listing]:
+        """Listings whose symbol, name or a word of the name starts with query, best matches first"""
+        query = normalize_query(query)
+        if not query:
+            return []
+        best: Dict[int, Tuple[int, int]] = {}
+        position = bisect_left(self._keys, query)
+        while position < len(self._keys) and self._keys[position].startswith(query):
+            owner = self._owners[position]
+            # Exact matches (e.g. the alias "SBI") beat prefixes, then symbols beat names
+            rank = (0 if self._keys[position] == query else 1, self._kinds[position])
+            if owner not in best or rank < best[owner]:
+                best[owner] = rank
+            position += 1
+        ranked = sorted(best, key=lambda i: (
+            best[i], self._exchange_rank(self._listings[i]), len(self._listings[i].name), self._listings[i].ticker
+        ))
+        return [self._listings[i] for i in ranked[:limit]]
+
+    def aliases(self, ticker: str) -> List[str]:
+        """Names to look for in news headlines: the company name and any listed aliases"""
+        resolved = self.resolve(ticker)
+        if resolved is None:
+            return []
+        listing = self.get(resolved)
+        return list(dict.fromkeys([company_name(listing.name), *listing.aliases]))
+
+    def stats(self) -> Dict[str, int]:
+        return {"listings": len(self._listings), "search_keys": len(self._keys)}
+
+
+def _invalid_key(ticker: str) -> str:
+    return f"symbol:invalid:{ticker}"
+
+
+def check_symbol(text: str) -> Optional[str]:
+    """
+    Ticker to request upstream for user input, or None if it cannot be valid: malformed,
+    not listed (in strict mode), or recently reported unknown by yfinance. No network call.
+    """
+    ticker = symbol_master.resolve(text)
+    if ticker is not None:
+        return ticker
+    ticker = text.strip().upper()
+    if not TICKER_PATTERN.match(ticker):
+        return None
+    if active_config.SYMBOL_MASTER_STRICT and len(symbol_master):
+        return None
+    if get_cache(_invalid_key(ticker)):
+        return None
+    return ticker
+
+
+def mark_invalid(ticker: str):
+    """Negatively cache a ticker yfinance knows nothing about (listed tickers are never marked)"""
+    if symbol_master.get(ticker) is None:
+        set_cache(_invalid_key(ticker.strip().upper()), True, ttl=active_config.SYMBOL_NEGATIVE_TTL)
+
+
+symbol_master = SymbolMaster(load_listings(active_config.SYMBOL_MASTER_FILES))
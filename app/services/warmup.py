@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+from app.configs import active_config
+from app.services.stock_service import fetch_stock_batch, get_price_history_async
+
+
+class SymbolUsage:
+    """
+    Successful requests per symbol in this run, saved on shutdown. The next start warms
+    the caches for the symbols users actually asked for, not just POPULAR_SYMBOLS.
+    """
+
+    def __init__(self, max_tracked: int):
+        self.max_tracked = max_tracked
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self.previous: Dict[str, int] = {}
+
+    def record(self, symbol: str):
+        with self._lock:
+            if symbol in self._counts or len(self._counts) < self.max_tracked:
+                self._counts[symbol] += 1
+
+    def top(self, n: int) -> List[str]:
+        with self._lock:
+            return [symbol for symbol, _ in self._counts.most_common(n)]
+
+    def load(self, path: str):
+        """Read the previous run's counts; they carry over at half weight so recent demand dominates"""
+        try:
+            with open(path) as handle:
+                counts = {str(symbol): int(count) for symbol, count in json.load(handle).items()}
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading symbol usage {path}: {e}")
+            return
+        self.previous = counts
+        with self._lock:
+            for symbol, count in counts.items():
+                if count > 1:
+                    self._counts[symbol] += count // 2
+
+    def save(self, path: str):
+        with self._lock:
+            counts = dict(self._counts.most_common(self.max_tracked))
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # Write then rename, so a crash mid-write never leaves a truncated file
+            with open(path + ".tmp", "w") as handle:
+                json.dump(counts, handle)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            print(f"Error saving symbol usage {path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"tracked": len(self._counts), "previous_run": len(self.previous)}
+
+
+def warmup_symbols() -> List[str]:
+    """POPULAR_SYMBOLS plus the previous run's most-requested symbols"""
+    previous = sorted(symbol_usage.previous, key=symbol_usage.previous.get, reverse=True)
+    return list(dict.fromkeys(active_config.POPULAR_SYMBOLS + previous[:active_config.CACHE_WARMUP_TOP_SYMBOLS]))
+
+
+async def warm_caches() -> Dict[str, float]:
+    """
+    Load stock info for the warm-up symbols with one bulk quote download, plus daily
+    bars for the previous run's favourites. Quote TTLs follow the market clock, so a
+    warm-up outside trading hours stays fresh until the open; during the session the
+    quotes are served stale-while-revalidate by the first requests.
+    """
+    started = time.perf_counter()
+    symbols = warmup_symbols()
+    try:
+        results = await fetch_stock_batch(symbols)
+        favourites = [symbol for symbol in symbols if symbol in symbol_usage.previous]
+        await asyncio.gather(*(get_price_history_async(symbol, "1d") for symbol in favourites), return_exceptions=True)
+    except Exception as e:
+        print(f"Cache warm-up error: {e}")
+        results = []
+    warmed = sum(1 for result in results if result.data)
+    elapsed = time.perf_counter() - started
+    print(f"Cache warm-up: {warmed}/{len(symbols)} symbols in {elapsed:.2f}s")
+    return {"symbols": len(symbols), "warmed": warmed, "seconds": round(elapsed, 3)}
+
+
+symbol_usage = SymbolUsage(active_config.SYMBOL_USAGE_MAX_TRACKED)
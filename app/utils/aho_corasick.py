@@ -0,0 +1,84 @@
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern matcher that finds every known pattern in one pass over the text"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Hashable]]] = [[]]
+        self._built = True
+
+    def add(self, pattern: str, payload: Hashable):
+        """Register a pattern; matching is case-insensitive"""
+        pattern = pattern.lower().strip()
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (breadth-first over the trie)"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            current = queue.popleft()
+            for char, next_state in self._goto[current].items():
+                queue.append(next_state)
+                fallback = self._fail[current]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def search(self, text: str, whole_words: bool = True) -> Set[Hashable]:
+        """Return the payloads of every pattern found in text"""
+        if not self._built:
+            self.build()
+        text = text.lower()
+        found = set()
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._output[state]:
+                if payload in found:
+                    continue
+                if whole_words and not _is_word_match(text, index - length + 1, index + 1):
+                    continue
+                found.add(payload)
+        return found
+
+
+def _is_word_match(text: str, start: int, end: int) -> bool:
+    """Reject matches that sit inside a longer word (e.g. 'ITC' in 'switch')"""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+def build_matcher(patterns: Iterable[Tuple[str, Hashable]]) -> AhoCorasick:
+    """Build a matcher from (pattern, payload) pairs"""
+    matcher = AhoCorasick()
+    for pattern, payload in patterns:
+        matcher.add(pattern, payload)
+    matcher.build()
+    return matcher
@@ -0,0 +1,78 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class DynamicBatcher(Generic[T, R]):
+    """
+    Collects items submitted from any thread for up to `max_wait` seconds (or until
+    `max_batch` are waiting) and runs them through `fn` as one batch on a single
+    worker thread. Suits models where one padded batch costs little more than one item.
+    """
+
+    def __init__(self, fn: Callable[[List[T]], List[R]], max_batch: int, max_wait: float, name: str = "batcher"):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue[Tuple[T, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def submit(self, item: T) -> "Future[R]":
+        future: "Future[R]" = Future()
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+        self._queue.put((item, future))
+        return future
+
+    def map(self, items: List[T], timeout: Optional[float] = None) -> List[R]:
+        """Submit several items and wait for all of them (they may share batches with other callers)"""
+        futures = [self.submit(item) for item in items]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _next_batch(self) -> List[Tuple[T, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            started = time.perf_counter()
+            try:
+                results = self.fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            self.batches += 1
+            self.items += len(batch)
+            self.busy_seconds += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "queued": self._queue.qsize(),
+        }
@@ -1,32 +1,387 @@
-from functools import lru_cache
+import asyncio
+import math
+import random
 import time
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+from app.configs import active_config
+from app.utils import serialization
+from app.utils.cache_engine import CacheEngine
+from app.utils.executors import get_executor, run_blocking
+from app.utils.metrics import CACHE_LOOKUPS
+
+# Lookup states: FRESH before the soft TTL, STALE between the soft and hard TTL, MISS otherwise
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+# L1: bounded in-process cache, key -> (value, soft expiry, hard expiry, recompute seconds) (one copy per worker)
+cache = CacheEngine(
+    max_entries=active_config.CACHE_MAX_ENTRIES,
+    max_bytes=active_config.CACHE_MAX_BYTES,
+    shards=active_config.CACHE_SHARDS,
+    policy=active_config.CACHE_ADMISSION_POLICY
+)
+
+# Keys with a background refresh in progress, so a stale key is only refreshed once
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+_refresh_tasks = set()
+
+# L2: optional shared cache speaking the Redis protocol (shared by all workers)
+_l2 = None
+_l2_checked = False
+_l2_lock = threading.Lock()
+
+
+def configure_cache(l2_client=None):
+    """
+    Use the given Redis-compatible client as the shared L2 (e.g. redis.Redis or
+    fakeredis.FakeRedis); pass None to run with the in-process L1 only.
+    """
+    global _l2, _l2_checked
+    with _l2_lock:
+        _l2 = l2_client
+        _l2_checked = True
+
+
+def _connect_l2():
+    """Connect to Redis using the REDIS_* settings, or return None if not configured"""
+    if not active_config.REDIS_ENABLED:
+        return None
+    try:
+        import redis
+    except ImportError:
+        print("Redis cache disabled: the 'redis' package is not installed")
+        return None
+    try:
+        if active_config.REDIS_URL:
+            client = redis.Redis.from_url(active_config.REDIS_URL, socket_timeout=active_config.REDIS_SOCKET_TIMEOUT)
+        else:
+            client = redis.Redis(
+                host=active_config.REDIS_HOST,
+                port=active_config.REDIS_PORT,
+                db=active_config.REDIS_DB,
+                password=active_config.REDIS_PASSWORD or None,
+                socket_timeout=active_config.REDIS_SOCKET_TIMEOUT
+            )
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Redis cache disabled, could not connect: {e}")
+        return None
+
+
+def get_l2():
+    """The shared L2 client, connecting on first use (blocking: call it off the event loop)"""
+    global _l2, _l2_checked
+    if not _l2_checked:
+        with _l2_lock:
+            if not _l2_checked:
+                _l2 = _connect_l2()
+                _l2_checked = True
+    return _l2
+
+
+def _l2_configured() -> bool:
+    """Whether an L2 is (or, before the first connection attempt, is expected to be) in use; no I/O"""
+    return _l2 is not None if _l2_checked else active_config.REDIS_ENABLED
+
+
+def _on_event_loop() -> bool:
+    """True when called on a thread that is running an asyncio event loop"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _l2_key(key):
+    return f"{active_config.CACHE_KEY_PREFIX}{key}"
+
+
+def _set_l1(key, value, expiry, hard_expiry, delta=0.0):
+    if _l2_configured():
+        # Keep the local copy short-lived so workers converge on the shared value
+        hard_expiry = min(hard_expiry, time.time() + active_config.CACHE_L1_TTL)
+    cache.set(key, (value, expiry, hard_expiry, delta), hard_expiry)
+
+
+def _read_l1(key):
+    """(value, soft expiry, recompute seconds) from L1, stale or not; None if absent"""
+    entry = cache.get(key)  # Entries past their hard expiry are never returned
+    if entry is None:
+        return None
+    value, expiry, _, delta = entry
+    return value, expiry, delta
+
+
+def _read_l2(keys) -> Dict[Any, tuple]:
+    """Entries for many keys from L2 in one round trip, copied into L1; keys L2 doesn't hold are left out"""
+    l2 = get_l2()
+    if l2 is None or not keys:
+        return {}
+    try:
+        pipe = l2.pipeline()
+        for key in keys:
+            pipe.get(_l2_key(key))
+            pipe.pttl(_l2_key(key))
+        replies = pipe.execute()
+    except Exception as e:
+        print(f"Redis cache read error for {len(keys)} key(s): {e}")
+        return {}
+    found = {}
+    now = time.time()
+    for key, data, pttl in zip(keys, replies[::2], replies[1::2]):
+        if data is None:
+            continue
+        try:
+            value, expiry, delta = serialization.unpackb(data)
+        except Exception as e:
+            print(f"Redis cache read error for {key}: {e}")
+            continue
+        hard_expiry = now + (pttl / 1000 if pttl and pttl > 0 else active_config.CACHE_L1_TTL)
+        _set_l1(key, value, expiry, hard_expiry, delta)
+        found[key] = (value, expiry, delta)
+    return found
+
+
+def _prefetch(key):
+    """Copy a key from L2 into L1 on the redis pool, so a later lookup on the event loop sees it"""
+    claim = ("l2", key)
+    if not _claim_refresh(claim):
+        return
+
+    def run():
+        try:
+            _read_l2([key])
+        finally:
+            _release_refresh(claim)
+
+    get_executor("redis").submit(run)
+
+
+def _read(key):
+    """(value, soft expiry, recompute seconds) from L1, then L2; None if absent or past the hard TTL"""
+    local = _read_l1(key)
+    if local is not None and local[1] > time.time():
+        return local
+    # A stale local copy may already have been refreshed by another worker
+    if not _l2_configured():
+        return local
+    if _on_event_loop():
+        # Never wait on Redis on the event loop: answer from L1 and fetch the shared copy for next
+        # time. Async code that needs it now uses lookup_cache_async / lookup_many_async.
+        _prefetch(key)
+        return local
+    return _read_l2([key]).get(key, local)
+
+
+async def _read_many_async(keys: Iterable) -> Dict[Any, Optional[tuple]]:
+    """_read() for many keys without blocking the loop: one L2 round trip, on the redis pool, for all L1 misses"""
+    entries = {key: _read_l1(key) for key in keys}
+    now = time.time()
+    remote = [key for key, entry in entries.items() if entry is None or entry[1] <= now]
+    if remote and _l2_configured():
+        entries.update(await run_blocking("redis", _read_l2, remote))
+    return entries
+
+
+def _namespace(key) -> str:
+    return key.split(":", 1)[0] if isinstance(key, str) else "other"
+
+
+def lookup_cache(key, record: bool = True) -> Tuple[Any, str, bool]:
+    """
+    (value, state, refresh_due). Stale values are returned rather than dropped, and a
+    fresh value may already be due for refresh: XFetch-style probabilistic early
+    expiration spreads recomputation of hot keys out ahead of their soft TTL,
+    earlier for keys that are slow to recompute. record=False skips the hit/miss metrics.
+    """
+    return _lookup_result(key, _read(key), record)
+
+
+def _lookup_result(key, entry, record: bool) -> Tuple[Any, str, bool]:
+    if entry is None:
+        state, result = MISS, (None, MISS, True)
+    else:
+        value, expiry, delta = entry
+        now = time.time()
+        if now >= expiry:
+            state, result = STALE, (value, STALE, True)
+        else:
+            early = delta > 0 and now - delta * active_config.CACHE_XFETCH_BETA * math.log(1.0 - random.random()) >= expiry
+            state, result = FRESH, (value, FRESH, early)
+    if record:
+        CACHE_LOOKUPS.labels(_namespace(key), state).inc()
+    return result
+
+
+async def lookup_many_async(keys: Iterable, record: bool = True) -> Dict[Any, Tuple[Any, str, bool]]:
+    """lookup_cache() for many keys from async code; L2 is read off the loop in one round trip"""
+    entries = await _read_many_async(keys)
+    return {key: _lookup_result(key, entry, record) for key, entry in entries.items()}
+
+
+async def lookup_cache_async(key, record: bool = True) -> Tuple[Any, str, bool]:
+    return (await lookup_many_async([key], record))[key]
 
-# Simple in-memory cache with TTL
-cache = {}
 
 def get_cache(key):
     """Get a value from the cache if it exists and hasn't expired"""
-    if key in cache:
-        value, expiry = cache[key]
-        if expiry > time.time():
-            return value
-        else:
-            # Remove expired item
-            del cache[key]
-    return None
+    value, state, _ = lookup_cache(key)
+    return value if state == FRESH else None
 
-def set_cache(key, value, ttl=300):  # Default TTL: 5 minutes
-    """Set a value in the cache with a TTL"""
-    expiry = time.time() + ttl
-    cache[key] = (value, expiry)
 
-def clear_cache():
-    """Clear the entire cache"""
-    cache.clear()
+async def get_cache_async(key):
+    value, state, _ = await lookup_cache_async(key)
+    return value if state == FRESH else None
 
-def remove_expired():
-    """Remove all expired items from the cache"""
+
+def cache_ttl(key) -> float:
+    """Seconds until the key's soft expiry; 0 if it is stale or absent"""
+    entry = _read(key)
+    return max(0.0, entry[1] - time.time()) if entry is not None else 0.0
+
+
+def _l2_write(description: str, fn: Callable[[Any], Any]):
+    """Run fn(l2): inline on worker threads, queued on the redis pool when called on the event loop"""
+    def run():
+        l2 = get_l2()
+        if l2 is None:
+            return
+        try:
+            fn(l2)
+        except Exception as e:
+            print(f"Redis cache {description}: {e}")
+
+    if not _l2_configured():
+        return
+    if _on_event_loop():
+        get_executor("redis").submit(run)
+    else:
+        run()
+
+
+def set_cache(key, value, ttl=300, stale_ttl=0, delta=0.0):  # Default TTL: 5 minutes
+    """
+    Set a value in the cache with a TTL. For stale_ttl seconds after that it can
+    still be served (as STALE) while a refresh runs; delta is how long the value
+    took to compute, which drives early expiration.
+    """
     now = time.time()
-    expired_keys = [k for k, (_, expiry) in cache.items() if expiry <= now]
-    for k in expired_keys:
-        del cache[k]
+    _set_l1(key, value, now + ttl, now + ttl + stale_ttl, delta)
+    if not _l2_configured():
+        return
+    try:
+        payload = serialization.packb([value, now + ttl, delta])
+    except Exception as e:
+        print(f"Redis cache write error for {key}: {e}")
+        return
+    _l2_write(f"write error for {key}",
+              lambda l2: l2.set(_l2_key(key), payload, px=max(1, int((ttl + stale_ttl) * 1000))))
+
+
+def _claim_refresh(key) -> bool:
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+        return True
+
+
+def _release_refresh(key):
+    with _refreshing_lock:
+        _refreshing.discard(key)
+
+
+def schedule_refresh(key, fn: Callable[[], Any]) -> bool:
+    """Run fn once on the background refresh pool unless a refresh for key is already running"""
+    if not _claim_refresh(key):
+        return False
+
+    def run():
+        try:
+            fn()
+        except Exception as e:
+            print(f"Background cache refresh failed for {key}: {e}")
+        finally:
+            _release_refresh(key)
+
+    get_executor("cache-refresh").submit(run)
+    return True
+
+
+def _load_and_store(key, loader, ttl, stale_ttl):
+    start = time.monotonic()
+    value = loader()
+    if value is not None:
+        set_cache(key, value, ttl=ttl, stale_ttl=stale_ttl, delta=time.monotonic() - start)
+    return value
+
+
+def cached(key, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0) -> Tuple[Any, str]:
+    """
+    Read-through cache: (value, state). A miss calls loader inline; a stale or
+    early-expiring hit is served at once while one background refresh reloads it.
+    """
+    value, state, due = lookup_cache(key)
+    if state == MISS:
+        return _load_and_store(key, loader, ttl, stale_ttl), MISS
+    if due:
+        schedule_refresh(key, lambda: _load_and_store(key, loader, ttl, stale_ttl))
+    return value, state
+
+
+async def cached_async(key, loader: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float = 0) -> Tuple[Any, str]:
+    """cached() for coroutine loaders; the background refresh runs as a task on the event loop"""
+    async def load():
+        start = time.monotonic()
+        value = await loader()
+        if value is not None:
+            set_cache(key, value, ttl=ttl, stale_ttl=stale_ttl, delta=time.monotonic() - start)
+        return value
+
+    value, state, due = await lookup_cache_async(key)
+    if state == MISS:
+        return await load(), MISS
+    if due and _claim_refresh(key):
+        async def refresh():
+            try:
+                await load()
+            except Exception as e:
+                print(f"Background cache refresh failed for {key}: {e}")
+            finally:
+                _release_refresh(key)
+
+        task = asyncio.create_task(refresh())
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+    return value, state
+
+
+def delete_cache(key):
+    """Remove one key from both tiers"""
+    cache.pop(key, None)
+    _l2_write(f"delete error for {key}", lambda l2: l2.delete(_l2_key(key)))
+
+
+def clear_cache(prefix=""):
+    """Clear the entire cache, or only keys starting with prefix (e.g. 'stock:')"""
+    cache.clear(prefix)
+
+    def clear(l2):
+        keys = list(l2.scan_iter(match=f"{_l2_key(prefix)}*", count=500))
+        for start in range(0, len(keys), 500):
+            l2.delete(*keys[start:start + 500])
+
+    _l2_write("clear error", clear)
+
+
+def remove_expired():
+    """Remove all items past their hard TTL from the cache"""
+    return cache.purge_expired()
+
+
+def cache_stats():
+    """Hit/miss/eviction counters and memory use of the in-process L1"""
+    return cache.stats()
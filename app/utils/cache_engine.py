@@ -0,0 +1,287 @@
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Seeds mixing the key hash into independent rows of the frequency sketch
+_SKETCH_SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+_HALVE = bytes(count >> 1 for count in range(256))  # bytearray.translate table that halves every counter
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Rough byte size of a cached value (recursing a few levels into containers and models)"""
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    if _depth > 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, _depth + 1) for item in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value), _depth + 1)
+    return sys.getsizeof(value)
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency (TinyLFU). Counters saturate at 15 and
+    are halved once enough increments accumulate, so old popularity fades out.
+    Not locked: each cache shard owns one and updates it under the shard's lock.
+    """
+
+    def __init__(self, capacity: int):
+        width = 1
+        while width < max(16, capacity):
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in _SKETCH_SEEDS]
+        self._additions = 0
+        self._reset_at = 10 * width
+
+    def _indexes(self, key: Hashable):
+        h = hash(key)
+        return [((h ^ seed) * 0x01000193 >> 7) & self._mask for seed in _SKETCH_SEEDS]
+
+    def increment(self, key: Hashable):
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < 15:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._reset_at:
+            for row in self._rows:
+                row[:] = row.translate(_HALVE)
+            self._additions //= 2
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel: expiry times map to slots of `resolution` seconds, so
+    scheduling and cancelling are O(1) and a purge only visits the slots that
+    elapsed since the last one instead of scanning every entry.
+    """
+
+    def __init__(self, resolution: float, slots: int, now: Optional[float] = None):
+        self.resolution = resolution
+        self.slots = slots
+        self._buckets: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._current = self._tick(now if now is not None else time.time())
+
+    def _tick(self, moment: float) -> int:
+        return int(moment // self.resolution)
+
+    def schedule(self, key: Hashable, expires_at: float) -> int:
+        tick = math.ceil(expires_at / self.resolution)
+        self._buckets[tick % self.slots][key] = tick
+        return tick
+
+    def cancel(self, key: Hashable, tick: int):
+        self._buckets[tick % self.slots].pop(key, None)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Keys whose expiry tick has passed"""
+        target = self._tick(now)
+        if target <= self._current:
+            return []
+        if target - self._current >= self.slots:
+            ticks = range(self.slots)  # Idle for a full revolution: every slot is due
+        else:
+            ticks = range(self._current + 1, target + 1)
+        expired = []
+        for tick in ticks:
+            bucket = self._buckets[tick % self.slots]
+            # Entries more than one revolution out share the slot and stay put
+            due = [key for key, when in bucket.items() if when <= target]
+            for key in due:
+                del bucket[key]
+            expired.extend(due)
+        self._current = target
+        return expired
+
+    def clear(self):
+        for bucket in self._buckets:
+            bucket.clear()
+
+
+class _Shard:
+    def __init__(self, max_entries: int, max_bytes: int, resolution: float, slots: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.sketch: Optional[FrequencySketch] = None  # TinyLFU policy only
+        self.entries: "OrderedDict[Hashable, Tuple[Any, float, int, int]]" = OrderedDict()  # value, expiry, size, tick
+        self.bytes = 0
+        self.wheel = TimingWheel(resolution, slots)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "rejections": 0}
+
+    def remove(self, key: Hashable):
+        _, _, size, tick = self.entries.pop(key)
+        self.bytes -= size
+        self.wheel.cancel(key, tick)
+
+    def purge(self, now: float) -> int:
+        removed = 0
+        for key in self.wheel.advance(now):
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= now:
+                _, _, size, _ = self.entries.pop(key)
+                self.bytes -= size
+                removed += 1
+        self.stats["expirations"] += removed
+        return removed
+
+
+class CacheEngine:
+    """
+    Bounded, thread-safe in-process key/value store with per-entry expiry.
+    Keys are spread over independently locked shards; each shard keeps LRU order,
+    an entry/byte budget and a timing wheel for expiry. With the "tinylfu" policy a
+    new key only displaces the LRU victim if it has been requested more often recently.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, shards: int = 16, policy: str = "tinylfu",
+                 resolution: float = 1.0, slots: int = 4096):
+        count = 1
+        while count < max(1, shards):
+            count <<= 1
+        self._shard_mask = count - 1
+        self._shards = [
+            _Shard(max(1, max_entries // count), max(1, max_bytes // count), resolution, slots)
+            for _ in range(count)
+        ]
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._tinylfu = policy == "tinylfu"
+        if self._tinylfu:
+            # One sketch per shard: a key and its eviction victim always share a shard
+            for shard in self._shards:
+                shard.sketch = FrequencySketch(shard.max_entries)
+
+    def _shard(self, key: Hashable) -> _Shard:
+        return self._shards[hash(key) & self._shard_mask]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            if self._tinylfu:
+                shard.sketch.increment(key)
+            shard.purge(now)
+            entry = shard.entries.get(key)
+            if entry is None:
+                shard.stats["misses"] += 1
+                return default
+            if entry[1] <= now:
+                shard.remove(key)
+                shard.stats["expirations"] += 1
+                shard.stats["misses"] += 1
+                return default
+            shard.entries.move_to_end(key)
+            shard.stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float, size: Optional[int] = None) -> bool:
+        """Store a value until expires_at (epoch seconds); False if it was not admitted"""
+        if size is None:
+            size = estimate_size(value)
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            if self._tinylfu:
+                shard.sketch.increment(key)
+            shard.purge(now)
+            if key in shard.entries:
+                shard.remove(key)
+            elif self._tinylfu and shard.entries and self._over_budget(shard, size):
+                victim = next(iter(shard.entries))
+                if shard.sketch.estimate(key) < shard.sketch.estimate(victim):
+                    shard.stats["rejections"] += 1
+                    return False
+            if size > shard.max_bytes:
+                shard.stats["rejections"] += 1
+                return False
+            while shard.entries and self._over_budget(shard, size):
+                shard.remove(next(iter(shard.entries)))
+                shard.stats["evictions"] += 1
+            tick = shard.wheel.schedule(key, expires_at)
+            shard.entries[key] = (value, expires_at, size, tick)
+            shard.bytes += size
+            return True
+
+    @staticmethod
+    def _over_budget(shard: _Shard, size: int) -> bool:
+        return len(shard.entries) >= shard.max_entries or shard.bytes + size > shard.max_bytes
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                return default
+            shard.remove(key)
+            return entry[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            return entry is not None and entry[1] > time.time()
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def keys(self) -> List[Hashable]:
+        keys = []
+        for shard in self._shards:
+            with shard.lock:
+                keys.extend(shard.entries)
+        return keys
+
+    def clear(self, prefix: str = ""):
+        """Remove everything, or only string keys starting with prefix"""
+        for shard in self._shards:
+            with shard.lock:
+                if not prefix:
+                    shard.entries.clear()
+                    shard.bytes = 0
+                    shard.wheel.clear()
+                    continue
+                for key in [key for key in shard.entries if isinstance(key, str) and key.startswith(prefix)]:
+                    shard.remove(key)
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired entries in every shard; returns how many were removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.purge(now)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        totals = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "rejections": 0}
+        entries = size = 0
+        for shard in self._shards:
+            with shard.lock:
+                for name, count in shard.stats.items():
+                    totals[name] += count
+                entries += len(shard.entries)
+                size += shard.bytes
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            **totals,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, TypeVar
+
+from app.configs import active_config
+
+T = TypeVar("T")
+
+# One bounded pool per upstream so a slow dependency can only exhaust its own threads
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_executor(upstream: str) -> ThreadPoolExecutor:
+    """Thread pool for an upstream ('yfinance', 'groq', 'rss', ...), sized by UPSTREAM_MAX_WORKERS"""
+    pool = _pools.get(upstream)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(upstream)
+            if pool is None:
+                workers = active_config.UPSTREAM_MAX_WORKERS.get(upstream, active_config.UPSTREAM_DEFAULT_WORKERS)
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=upstream)
+                _pools[upstream] = pool
+    return pool
+
+
+async def run_blocking(upstream: str, fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run blocking I/O on the upstream's pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(upstream), partial(fn, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = False):
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+        _pools.clear()
@@ -0,0 +1,28 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a heavy module (yfinance, pandas, feedparser, bs4) that imports it on
+    first attribute access, so importing the app doesn't pay for libraries a worker may
+    not need until its first request. Thread-safe: the real import runs under the
+    interpreter's import lock, and attributes are always read from the real module, so
+    patches applied to it (e.g. yfinance.Ticker in the benchmarks) are seen.
+    """
+
+    def __getattr__(self, attr: str):
+        return getattr(importlib.import_module(self.__name__), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(importlib.import_module(self.__name__), attr, value)
+
+    def __repr__(self) -> str:
+        loaded = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module {self.__name__!r} ({loaded})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """The module if it is already imported, else a LazyModule that imports it on first use"""
+    return sys.modules.get(name) or LazyModule(name)
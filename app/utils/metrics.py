@@ -0,0 +1,206 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, cheap enough to observe on every request"""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. requests in flight)"""
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+
+class Family:
+    """A metric with label names; each distinct label combination gets its own child"""
+
+    def __init__(self, kind: type, name: str, help: str, labelnames: Sequence[str], **options):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._options = options
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self.kind(self.name, self.help, **self._options)
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], object]]:
+        return list(self._children.items())
+
+
+_histograms: Dict[str, Family] = {}
+_counters: Dict[str, Family] = {}
+_gauges: Dict[str, Family] = {}
+_registry_lock = threading.Lock()
+
+
+def _family(registry: Dict[str, Family], kind: type, name: str, help: str,
+            labelnames: Sequence[str], **options) -> Family:
+    with _registry_lock:
+        family = registry.get(name)
+        if family is None:
+            family = registry[name] = Family(kind, name, help, labelnames, **options)
+        return family
+
+
+def histogram(name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS,
+              labelnames: Sequence[str] = ()):
+    """Get or create a named histogram; with labelnames, returns the family (use .labels(...))"""
+    family = _family(_histograms, Histogram, name, help, labelnames, buckets=buckets)
+    return family if labelnames else family.labels()
+
+
+def counter(name: str, help: str = "", labelnames: Sequence[str] = ()):
+    """Get or create a named counter; with labelnames, returns the family (use .labels(...))"""
+    family = _family(_counters, Counter, name, help, labelnames)
+    return family if labelnames else family.labels()
+
+
+def gauge(name: str, help: str = "", labelnames: Sequence[str] = ()):
+    """Get or create a named gauge; with labelnames, returns the family (use .labels(...))"""
+    family = _family(_gauges, Gauge, name, help, labelnames)
+    return family if labelnames else family.labels()
+
+
+UPSTREAM_LATENCY = histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external dependencies",
+    labelnames=("upstream", "operation")
+)
+UPSTREAM_ERRORS = counter(
+    "upstream_errors_total", "Failed calls to external dependencies", labelnames=("upstream", "operation")
+)
+CACHE_LOOKUPS = counter(
+    "cache_lookups_total", "Cache lookups by namespace and outcome", labelnames=("namespace", "result")
+)
+
+
+@contextmanager
+def track_upstream(upstream: str, operation: str) -> Iterator[None]:
+    """Time a call to an external dependency and count it as an error if it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.labels(upstream, operation).inc()
+        raise
+    finally:
+        UPSTREAM_LATENCY.labels(upstream, operation).observe(time.perf_counter() - started)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_prometheus() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for registry, kind in ((_counters, "counter"), (_gauges, "gauge")):
+        for name, family in sorted(registry.items()):
+            lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for values, child in family.children():
+                lines.append(f"{name}{_label_text(family.labelnames, values)} {_format_number(child.value)}")
+    for name, family in sorted(_histograms.items()):
+        lines.append(f"# HELP {name} {family.help}")
+        lines.append(f"# TYPE {name} histogram")
+        for values, child in family.children():
+            snap = child.snapshot()
+            for bound, count in snap["buckets"]:
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{name}_bucket{_label_text(family.labelnames, values, le)} {count}")
+            labels = _label_text(family.labelnames, values)
+            lines.append(f"{name}_sum{labels} {_format_number(snap['sum'])}")
+            lines.append(f"{name}_count{labels} {snap['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def histogram_stats() -> Dict[str, Dict[str, object]]:
+    """Count, sum and mean of every histogram (for /api/stats)"""
+    stats = {}
+    for name, family in list(_histograms.items()):
+        for values, hist in family.children():
+            snap = hist.snapshot()
+            key = name + _label_text(family.labelnames, values)
+            stats[key] = {
+                "count": snap["count"],
+                "sum": round(snap["sum"], 6),
+                "mean": round(snap["sum"] / snap["count"], 6) if snap["count"] else None
+            }
+    return stats
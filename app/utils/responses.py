@@ -0,0 +1,72 @@
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app.utils.cache import get_cache_async, set_cache
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder produces the same bytes, only slower
+    orjson = None
+
+
+@dataclass(frozen=True)
+class EncodedResponse:
+    """A JSON body encoded once, with its strong ETag and the time it stops being fresh"""
+    body: bytes
+    etag: str
+    expires: float  # Epoch seconds
+
+    def max_age(self) -> int:
+        return max(0, int(self.expires - time.time()))
+
+
+def encode_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON, the same bytes FastAPI's JSONResponse would send"""
+    content = content.model_dump(mode="json") if isinstance(content, BaseModel) else jsonable_encoder(content)
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_response(content: Any, ttl: float) -> EncodedResponse:
+    body = encode_json(content)
+    etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+    return EncodedResponse(body=body, etag=etag, expires=time.time() + max(0.0, ttl))
+
+
+async def get_response(key: str) -> Optional[EncodedResponse]:
+    """A still-fresh encoded response from the cache"""
+    value = await get_cache_async(key)
+    return EncodedResponse(*value) if value is not None else None
+
+
+def store_response(key: str, content: Any, ttl: float) -> EncodedResponse:
+    """Encode content and, if it stays fresh for a while, cache the bytes for ttl seconds"""
+    encoded = encode_response(content, ttl)
+    if ttl >= 1:
+        # Stored as a plain list so it round-trips through the shared (msgpack) cache
+        set_cache(key, [encoded.body, encoded.etag, encoded.expires], ttl=ttl)
+    return encoded
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def json_response(request: Request, encoded: EncodedResponse, headers: Optional[Dict[str, str]] = None) -> Response:
+    """The encoded body, or an empty 304 if the client already holds this version"""
+    headers = {**(headers or {}), "ETag": encoded.etag, "Cache-Control": f"max-age={encoded.max_age()}"}
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
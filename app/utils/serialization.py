@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Dict, Type
+
+import msgpack
+from pydantic import BaseModel
+
+from app.models.news_models import NewsArticle, StockNews
+from app.models.stock_models import StockInfo
+
+# msgpack extension type codes
+_EXT_DATETIME = 1
+_EXT_MODEL = 2
+
+# Models that can round-trip through the shared cache, by class name
+MODEL_REGISTRY: Dict[str, Type[BaseModel]] = {}
+
+
+def register_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Allow instances of a Pydantic model to be stored in the shared cache"""
+    MODEL_REGISTRY[model.__name__] = model
+    return model
+
+
+for _model in (StockInfo, NewsArticle, StockNews):
+    register_model(_model)
+
+
+def _default(obj: Any):
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("ascii"))
+    if isinstance(obj, BaseModel) and type(obj).__name__ in MODEL_REGISTRY:
+        # Unset optional fields are dropped to keep payloads small
+        fields = obj.model_dump(exclude_none=True)
+        return msgpack.ExtType(_EXT_MODEL, packb([type(obj).__name__, fields]))
+    raise TypeError(f"Cannot serialize {type(obj).__name__} for the cache")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode("ascii"))
+    if code == _EXT_MODEL:
+        name, fields = unpackb(data)
+        return MODEL_REGISTRY[name](**fields)
+    return msgpack.ExtType(code, data)
+
+
+def packb(value: Any) -> bytes:
+    """Encode a cache value (plain data, datetimes and registered models) with msgpack"""
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
@@ -0,0 +1,89 @@
+import hashlib
+import re
+from typing import Dict, Hashable, List, Optional, Set
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+def _shingles(text: str, size: int) -> List[str]:
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash of a text's word shingles. Near-identical texts (the same wire story
+    with a different intro line or footer) differ in only a few bits.
+    """
+    shingles = _shingles(text, shingle_size)
+    if not shingles:
+        return 0
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), 64)
+    # Each bit of the fingerprint is the majority vote of that bit across shingles
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(votes).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Finds stored fingerprints within `max_distance` bits of a query. The 64 bits are
+    split into max_distance + 1 bands; two fingerprints that close must agree on at
+    least one whole band, so only keys sharing a band value are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self._bands = max_distance + 1
+        self._width = 64 // self._bands
+        self._tables: List[Dict[int, Set[Hashable]]] = [{} for _ in range(self._bands)]
+        self._fingerprints: Dict[Hashable, int] = {}
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._width) - 1
+        return [(fingerprint >> (band * self._width)) & mask for band in range(self._bands)]
+
+    def add(self, key: Hashable, fingerprint: int):
+        self.remove(key)
+        self._fingerprints[key] = fingerprint
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            table.setdefault(value, set()).add(key)
+
+    def remove(self, key: Hashable):
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is None:
+            return
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            keys = table.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del table[value]
+
+    def find(self, fingerprint: int, exclude: Optional[Hashable] = None) -> Optional[Hashable]:
+        """A stored key whose fingerprint is within max_distance bits, if any"""
+        best, best_distance = None, self.max_distance + 1
+        for table, value in zip(self._tables, self._band_values(fingerprint)):
+            for key in table.get(value, ()):
+                if key == exclude:
+                    continue
+                distance = hamming(fingerprint, self._fingerprints[key])
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        return best
+
+    def clear(self):
+        for table in self._tables:
+            table.clear()
+        self._fingerprints.clear()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
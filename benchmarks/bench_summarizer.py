@@ -0,0 +1,166 @@
+"""
+Throughput and latency of the summarization backends: the Groq path (against the
+fake Groq endpoint from fakes.py, so only client overhead and the simulated latency
+count) and the local CPU model with dynamic batching. Every request carries a
+distinct article so the summary cache never answers:
+
+    python -m benchmarks.bench_summarizer --requests 64 --concurrency 8
+    python -m benchmarks.bench_summarizer --backends local --local-threads 2 --no-quantize
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+_SENTENCES = [
+    "{company} reported a {pct}% rise in quarterly net profit, beating analyst estimates on stronger margins.",
+    "Revenue from operations grew {pct}% year on year as demand recovered across its core segments.",
+    "The board recommended a dividend and said capital expenditure would stay elevated through the fiscal year.",
+    "Brokerages raised their price targets, citing improving return ratios and a healthier order book.",
+    "Shares of {company} closed {pct}% higher on the NSE while the Nifty 50 ended marginally lower.",
+    "Management flagged input-cost inflation and currency volatility as the key risks for the coming quarters.",
+    "Foreign institutional investors trimmed their stake slightly, according to the latest shareholding data.",
+    "The company expects its new capacity to be commissioned by the end of the next financial year.",
+]
+_COMPANIES = ["Reliance Industries", "Tata Consultancy Services", "HDFC Bank", "Infosys", "ITC", "Larsen & Toubro"]
+
+
+def make_article(n: int, sentences: int = 12) -> str:
+    """Deterministic, distinct article text for request n"""
+    rng = np.random.default_rng(n)
+    company = _COMPANIES[n % len(_COMPANIES)]
+    body = [
+        _SENTENCES[i].format(company=company, pct=round(float(rng.uniform(1, 25)), 1))
+        for i in rng.integers(0, len(_SENTENCES), size=sentences)
+    ]
+    return f"Article {n}. " + " ".join(body)
+
+
+def _setup_groq(args):
+    from benchmarks.fakes import FakeUpstreamServer
+    upstream = FakeUpstreamServer(groq_latency=args.groq_latency, groq_token_latency=0).start()
+    os.environ["GROQ_API_KEY"] = "benchmark"
+    os.environ["GROQ_API_URL"] = f"{upstream.url}/groq"
+    return upstream
+
+
+def _setup_local(args) -> bool:
+    from app.services.local_summarizer import local_summarizer
+    local_summarizer.threads = args.local_threads
+    local_summarizer.quantize = not args.no_quantize
+    local_summarizer.batcher.max_batch = args.local_max_batch
+    local_summarizer.batcher.max_wait = args.local_batch_wait
+    try:
+        started = time.perf_counter()
+        local_summarizer.load()
+        local_summarizer.summarize([make_article(-1)])  # First generate() pays one-off allocation costs
+    except Exception as e:
+        print(f"Skipping local backend: {e}")
+        return False
+    print(f"Loaded {local_summarizer.model_name} in {time.perf_counter() - started:.1f}s")
+    return True
+
+
+def run_backend(backend: str, requests: int, concurrency: int, per_request: int, offset: int) -> Dict[str, object]:
+    """Fire `requests` summarize_batch calls from `concurrency` threads; latency per call"""
+    from app.configs import active_config
+    from app.services.local_summarizer import local_summarizer
+    from app.services.summarizer import summarize_batch
+
+    active_config.SUMMARY_BACKEND = backend
+    before = local_summarizer.batcher.stats()
+
+    def one(i: int) -> float:
+        texts = [make_article(offset + i * per_request + j) for j in range(per_request)]
+        started = time.perf_counter()
+        summaries = summarize_batch(texts)
+        elapsed = time.perf_counter() - started
+        if any(summary is None for summary in summaries):
+            raise RuntimeError("summarization failed")
+        return elapsed
+
+    latencies: List[float] = []
+    errors = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(one, i) for i in range(requests)]:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    wall = time.perf_counter() - started
+    ms = np.array(latencies or [0.0]) * 1000
+    report = {
+        "requests": requests,
+        "articles_per_request": per_request,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "articles_per_second": round(len(latencies) * per_request / wall, 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "max_ms": round(float(ms.max()), 1),
+    }
+    if backend == "local":
+        after = local_summarizer.batcher.stats()
+        batches = after["batches"] - before["batches"]
+        report["mean_batch_size"] = round((after["items"] - before["items"]) / batches, 2) if batches else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["groq", "local"], choices=["groq", "local"])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--per-request", type=int, default=1, help="Articles per summarize_batch call")
+    parser.add_argument("--groq-latency", type=float, default=0.5, help="Seconds per fake Groq response")
+    parser.add_argument("--groq-rpm", type=float, default=6000, help="Client-side Groq rate limit")
+    parser.add_argument("--local-threads", type=int, default=4)
+    parser.add_argument("--local-max-batch", type=int, default=8)
+    parser.add_argument("--local-batch-wait", type=float, default=0.01, help="Seconds the batcher waits to fill a batch")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/summarizer-<timestamp>.json)")
+    args = parser.parse_args()
+
+    upstream = _setup_groq(args) if "groq" in args.backends else None
+    from app.configs import active_config
+    active_config.REDIS_ENABLED = False
+
+    from app.services.groq_client import TokenBucket, groq_client
+    groq_client.bucket = TokenBucket(rate=args.groq_rpm / 60.0, capacity=max(1.0, args.groq_rpm / 60.0))
+
+    reports = {}
+    try:
+        for n, backend in enumerate(args.backends):
+            if backend == "local" and not _setup_local(args):
+                continue
+            reports[backend] = run_backend(
+                backend, args.requests, args.concurrency, args.per_request, offset=n * args.requests * args.per_request
+            )
+    finally:
+        if upstream is not None:
+            upstream.stop()
+
+    print(f"{'backend':<8} {'art/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'errors':>7} {'batch':>6}")
+    for backend, report in reports.items():
+        print(f"{backend:<8} {report['articles_per_second']:>8} {report['p50_ms']:>9} {report['p95_ms']:>9} "
+              f"{report['max_ms']:>9} {report['errors']:>7} {report.get('mean_batch_size', '-'):>6}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"summarizer-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as handle:
+        json.dump({"args": vars(args), "backends": reports}, handle, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
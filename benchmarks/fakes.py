@@ -0,0 +1,258 @@
+"""
+Local stand-ins for the app's upstreams, so benchmarks are reproducible offline:
+a yfinance stub with deterministic data and configurable latency, and one HTTP
+server that serves recorded RSS XML and mimics the Groq chat-completions API.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Upstream calls made against the fakes, e.g. calls["yfinance.info"]
+calls: Counter = Counter()
+_calls_lock = threading.Lock()
+
+
+def _count(name: str):
+    with _calls_lock:
+        calls[name] += 1
+
+
+def _seed(symbol: str) -> int:
+    return int(hashlib.sha256(symbol.encode()).hexdigest()[:8], 16)
+
+
+def _noise(symbol: str, ticks: np.ndarray, salt: int) -> np.ndarray:
+    """Uniform [0, 1) values fixed by (symbol, bar time), so overlapping downloads agree"""
+    mixed = (ticks.astype(np.uint64) * np.uint64(2654435761) + np.uint64(_seed(symbol) + salt)) % np.uint64(2**32)
+    mixed = (mixed ^ (mixed >> np.uint64(13))) * np.uint64(1274126177) % np.uint64(2**32)
+    return mixed.astype(np.float64) / 2**32
+
+
+def _bars(symbol: str, periods: int, freq: str, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Deterministic OHLCV bars for a symbol. Each bar depends only on its own timestamp,
+    like real history, so an incremental refresh sees the bars it already stored unchanged.
+    """
+    end = (end or pd.Timestamp.now(tz="UTC")).floor(freq)
+    index = pd.date_range(end=end, periods=periods, freq=freq, tz="UTC")
+    ticks = index.asi8 // pd.Timedelta(freq).value
+    phase = (_seed(symbol) % 997) / 997.0
+    close = 100.0 * np.exp(0.1 * np.sin(2 * np.pi * (ticks / 250.0 + phase)) + 0.02 * (_noise(symbol, ticks, 1) - 0.5))
+    spread = 0.01 * _noise(symbol, ticks, 2) * close
+    return pd.DataFrame({
+        "Open": close - spread / 2,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": np.floor(1_000 + 99_000 * _noise(symbol, ticks, 3)),
+    }, index=index)
+
+
+_FREQ = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "1h", "1d": "1D", "1wk": "7D"}
+_PERIOD_BARS = {"1d": 375, "5d": 5, "7d": 7 * 375, "60d": 60 * 75, "1mo": 22, "730d": 730 * 7, "5y": 5 * 252, "10y": 520}
+
+
+class FakeTicker:
+    """Enough of yfinance.Ticker for the app: info, fast_info and history"""
+
+    latency = 0.05
+    unknown_prefix = "UNKNOWN"
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+
+    @property
+    def info(self) -> dict:
+        _count("yfinance.info")
+        time.sleep(self.latency)
+        if self.symbol.startswith(self.unknown_prefix):
+            return {}
+        price = float(_bars(self.symbol, 2, "1D")["Close"].iloc[-1])
+        return {
+            "shortName": f"{self.symbol.split('.')[0].title()} Ltd",
+            "currency": "INR",
+            "exchange": "NSI",
+            "sector": "Financial Services",
+            "industry": "Banks",
+            "regularMarketPrice": price,
+            "regularMarketPreviousClose": round(price * 0.99, 2),
+            "marketCap": 1.5e12,
+            "averageVolume": 2_500_000,
+            "fiftyTwoWeekHigh": round(price * 1.3, 2),
+            "fiftyTwoWeekLow": round(price * 0.7, 2),
+            "trailingPE": 24.5,
+            "trailingEps": round(price / 24.5, 2),
+            "dividendYield": 0.012,
+            "bookValue": round(price / 3, 2),
+        }
+
+    @property
+    def fast_info(self):
+        _count("yfinance.fast_info")
+        time.sleep(self.latency / 2)
+        day = _bars(self.symbol, 375, "1min")
+        return SimpleNamespace(
+            last_price=float(day["Close"].iloc[-1]),
+            last_volume=float(day["Volume"].sum()),
+            day_high=float(day["High"].max()),
+            day_low=float(day["Low"].min()),
+        )
+
+    def history(self, period: str = "1mo", interval: str = "1d", start=None, end=None, **kwargs) -> pd.DataFrame:
+        _count("yfinance.history")
+        time.sleep(self.latency)
+        if self.symbol.startswith(self.unknown_prefix):
+            return pd.DataFrame()
+        freq = _FREQ.get(interval, "1D")
+        return _bars(self.symbol, _periods(period, freq, start), freq)
+
+
+def _periods(period: str, freq: str, start=None) -> int:
+    """Bars a history/download call returns for a period, or since start"""
+    if start is not None:
+        step = pd.Timedelta(freq)
+        return min(max(1, int((pd.Timestamp.now(tz="UTC") - pd.Timestamp(start)) / step) + 1), 5000)
+    return _PERIOD_BARS.get(period, 22)
+
+
+def fake_download(tickers, period: str = "1d", interval: str = "1m", start=None, **kwargs) -> pd.DataFrame:
+    """Multi-ticker download in yfinance's group_by='ticker' layout"""
+    _count("yfinance.download")
+    symbols: List[str] = tickers.split() if isinstance(tickers, str) else list(tickers)
+    time.sleep(FakeTicker.latency)
+    freq = _FREQ.get(interval, "1min")
+    frames = {
+        symbol: _bars(symbol.upper(), _periods(period, freq, start), freq)
+        for symbol in symbols if not symbol.upper().startswith(FakeTicker.unknown_prefix)
+    }
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+
+def install_fake_yfinance(latency: float = 0.05):
+    """Patch yfinance so every Ticker/download call hits the stub"""
+    import yfinance as yf
+    FakeTicker.latency = latency
+    yf.Ticker = FakeTicker
+    yf.download = fake_download
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeUpstreamServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/calls":
+            self._json(call_counts())
+            return
+        match = re.match(r"^/rss/([\w-]+)(?:\.xml)?", self.path)
+        if not match:
+            self.send_error(404)
+            return
+        name = match.group(1)
+        _count(f"rss.{name}")
+        path = os.path.join(FIXTURES_DIR, "rss", f"{name}.xml")
+        if not os.path.exists(path):
+            # Per-symbol searches get the general markets feed
+            path = os.path.join(FIXTURES_DIR, "rss", "markets.xml")
+        with open(path, "rb") as handle:
+            body = handle.read()
+        time.sleep(self.server.rss_latency)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.startswith("/groq"):
+            self.send_error(404)
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.groq_latency)
+        if payload.get("stream"):
+            _count("groq.chat_stream")
+            self._stream("This is a benchmark answer streamed from the fake Groq endpoint.")
+            return
+        if payload.get("response_format"):
+            _count("groq.summarize")
+            articles = len(re.findall(r"^Article \d+:", payload["messages"][-1]["content"], re.M))
+            content = json.dumps({"summaries": [
+                {"id": i + 1, "summary": f"Benchmark summary {i + 1}."} for i in range(articles)
+            ]})
+        else:
+            _count("groq.chat")
+            content = "This is a benchmark answer from the fake Groq endpoint."
+        self._json({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    def _json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, text: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for word in text.split(" "):
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.server.groq_token_latency)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    """Serves /rss/<name>.xml from fixtures, a Groq-compatible POST /groq and GET /calls"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, groq_latency: float = 0.3, groq_token_latency: float = 0.01,
+                 rss_latency: float = 0.05):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.groq_latency = groq_latency
+        self.groq_token_latency = groq_token_latency
+        self.rss_latency = rss_latency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeUpstreamServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-upstreams", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def call_counts() -> Dict[str, int]:
+    with _calls_lock:
+        return dict(calls)
@@ -0,0 +1,270 @@
+"""
+Concurrent load test of every API route against local fakes (see serve.py).
+Reports p50/p95/p99 latency, throughput and errors per route plus upstream call
+counts, and saves them as JSON so runs can be compared between versions:
+
+    python -m benchmarks.load_test --duration 30 --concurrency 32
+    python -m benchmarks.load_test --baseline benchmarks/results/<earlier run>.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SYMBOLS = [
+    "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
+    "HINDUNILVR.NS", "ITC.NS", "KOTAKBANK.NS", "LT.NS", "BAJFINANCE.NS"
+]
+QUESTIONS = ["Is it a good long-term buy?", "How did the last quarter go?", "What are the key risks?"]
+
+
+def _symbol() -> str:
+    return random.choice(SYMBOLS)
+
+
+def _days_ago(days: int) -> str:
+    """ISO date for the history endpoint's start/end parameters"""
+    return (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
+
+
+# name -> (weight, request factory returning (method, path, json body or None))
+ROUTES = {
+    "stock_info": (20, lambda: ("GET", f"/api/stocks/{_symbol()}", None)),
+    "stock_price": (20, lambda: ("GET", f"/api/stocks/{_symbol()}/price", None)),
+    "stock_history": (10, lambda: ("GET", f"/api/stocks/{_symbol()}/history?start={_days_ago(30)}&interval=1d", None)),
+    "stock_status": (5, lambda: ("GET", f"/api/stocks/{_symbol()}/status", None)),
+    "stock_batch": (5, lambda: ("POST", "/api/stocks/batch", {"symbols": random.sample(SYMBOLS, 5)})),
+    "indicators": (5, lambda: ("POST", "/api/stocks/indicators", {"symbols": random.sample(SYMBOLS, 5)})),
+    "portfolio": (3, lambda: ("POST", "/api/portfolio/analyze", {"holdings": [
+        {"symbol": symbol, "quantity": random.randint(1, 100), "cost": random.uniform(50, 150)}
+        for symbol in random.sample(SYMBOLS, 10)
+    ]})),
+    "popular": (5, lambda: ("GET", "/api/stocks/popular/indian", None)),
+    "news": (15, lambda: ("GET", f"/api/news/{_symbol()}", None)),
+    "llm_query": (5, lambda: ("POST", "/api/llm-query", {"symbol": _symbol(), "question": random.choice(QUESTIONS)})),
+    "llm_stream": (5, lambda: ("POST", "/api/llm-query/stream",
+                               {"symbol": _symbol(), "question": random.choice(QUESTIONS)})),
+    "stats": (1, lambda: ("GET", "/api/stats", None)),
+}
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host, self.port, self.timeout = parts.hostname, parts.port or 80, timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, bytes]:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+            except Exception:
+                conn.close()
+                self._local.conn = None
+                raise
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(client: Client, server: Optional[subprocess.Popen] = None, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"benchmarks.serve exited with code {server.returncode}")
+        try:
+            if client.request("GET", "/")[0] == 200:
+                return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+def upstream_counts(client: Client) -> Dict[str, int]:
+    """Upstream calls by upstream/operation, from the app's /metrics"""
+    _, body = client.request("GET", "/metrics")
+    pattern = re.compile(r'^upstream_request_duration_seconds_count\{upstream="([^"]*)",operation="([^"]*)"\} (\d+)')
+    counts = {}
+    for line in body.decode().splitlines():
+        match = pattern.match(line)
+        if match:
+            counts[f"{match.group(1)}.{match.group(2)}"] = int(match.group(3))
+    return counts
+
+
+def run_load(client: Client, duration: float, concurrency: int, routes: List[str]) -> Dict[str, dict]:
+    names = list(routes)
+    weights = [ROUTES[name][0] for name in names]
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        while time.perf_counter() < deadline:
+            name = random.choices(names, weights)[0]
+            method, path, body = ROUTES[name][1]()
+            started = time.perf_counter()
+            try:
+                status, _ = client.request(method, path, body)
+                failed = status >= 400
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples[name].append(elapsed)
+                errors[name] += failed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+
+    report = {}
+    for name in names:
+        latencies = np.array(samples[name]) * 1000
+        if not len(latencies):
+            continue
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[name] = {
+            "requests": int(len(latencies)),
+            "errors": errors[name],
+            "throughput_rps": round(len(latencies) / duration, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2),
+        }
+    return report
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict):
+    """Print per-route p50/p99/throughput changes against an earlier run"""
+    print(f"\nAgainst {baseline.get('revision') or 'baseline'} ({baseline.get('started_at')}):")
+    for name, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p99_ms", "throughput_rps"):
+            if before.get(key):
+                deltas.append(f"{key} {(stats[key] - before[key]) / before[key]:+.1%}")
+        print(f"  {name:<14} " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Target an already running server instead of starting benchmarks.serve")
+    parser.add_argument("--port", type=int, help="Port for the spawned server (default: any free port)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds of load before measuring")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--routes", nargs="*", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--yf-latency", type=float, default=0.05)
+    parser.add_argument("--groq-latency", type=float, default=0.3)
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="JSON path (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        port = args.port or free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.serve", "--port", str(port),
+            "--yf-latency", str(args.yf_latency), "--groq-latency", str(args.groq_latency)
+        ])
+    client = Client(base_url, args.timeout)
+    try:
+        wait_ready(client, server)
+        if args.warmup > 0:
+            run_load(client, args.warmup, args.concurrency, args.routes)
+        before = upstream_counts(client)
+        started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        routes = run_load(client, args.duration, args.concurrency, args.routes)
+        after = upstream_counts(client)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    total = sum(stats["requests"] for stats in routes.values())
+    result = {
+        "revision": _git_revision(),
+        "started_at": started_at,
+        "config": {
+            "duration": args.duration, "concurrency": args.concurrency,
+            "yf_latency": args.yf_latency, "groq_latency": args.groq_latency,
+        },
+        "total": {"requests": total, "throughput_rps": round(total / args.duration, 2)},
+        "routes": routes,
+        "upstream_calls": {name: count - before.get(name, 0) for name, count in after.items()
+                           if count - before.get(name, 0)},
+    }
+
+    print(f"{'route':<14} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in routes.items():
+        print(f"{name:<14} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>8} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+    print(f"Total: {total} requests, {result['total']['throughput_rps']} req/s")
+    print("Upstream calls:", json.dumps(result["upstream_calls"], sort_keys=True))
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(result, handle, indent=2)
+    print(f"Saved {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            compare(result, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Run the API against local fakes: stubbed yfinance, recorded RSS feeds and a fake
+Groq endpoint, all in this process. Used by load_test.py, or on its own:
+
+    python -m benchmarks.serve --port 8765 --yf-latency 0.05 --groq-latency 0.3
+"""
+import argparse
+import os
+import tempfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--upstream-port", type=int, default=0, help="Port for the fake RSS/Groq server (0 = any)")
+    parser.add_argument("--yf-latency", type=float, default=0.05, help="Seconds per yfinance call")
+    parser.add_argument("--groq-latency", type=float, default=0.3, help="Seconds before a Groq response starts")
+    parser.add_argument("--groq-token-latency", type=float, default=0.01, help="Seconds between streamed tokens")
+    parser.add_argument("--rss-latency", type=float, default=0.05, help="Seconds per feed fetch")
+    parser.add_argument("--groq-rpm", type=float, default=6000, help="Client-side Groq rate limit")
+    args = parser.parse_args()
+
+    from benchmarks.fakes import FakeUpstreamServer, install_fake_yfinance
+
+    upstream = FakeUpstreamServer(
+        port=args.upstream_port,
+        groq_latency=args.groq_latency,
+        groq_token_latency=args.groq_token_latency,
+        rss_latency=args.rss_latency
+    ).start()
+
+    # Everything the app reads at import time must point at the fakes before it is imported
+    os.environ["GROQ_API_KEY"] = "benchmark"
+    os.environ["GROQ_API_URL"] = f"{upstream.url}/groq"
+    os.environ["BAR_STORE_DIR"] = tempfile.mkdtemp(prefix="bench-bars-")
+    for name in ("REDIS_URL", "REDIS_HOST"):
+        os.environ.pop(name, None)
+
+    from app.configs import active_config
+    active_config.REDIS_ENABLED = False
+    active_config.NEWS_FEEDS = [
+        {"name": "Markets", "url": f"{upstream.url}/rss/markets.xml", "interval": 60},
+        {"name": "Results", "url": f"{upstream.url}/rss/results.xml", "interval": 60},
+    ]
+    active_config.GOOGLE_NEWS_URL = upstream.url + "/rss/search-{query}.xml"
+    install_fake_yfinance(args.yf_latency)
+
+    import uvicorn
+    from app.services.groq_client import TokenBucket, groq_client
+    from main import app
+
+    groq_client.bucket = TokenBucket(rate=args.groq_rpm / 60.0, capacity=max(1.0, args.groq_rpm / 60.0))
+    print(f"Fake upstreams on {upstream.url}")
+    try:
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+    finally:
+        upstream.stop()
+
+
+if __name__ == "__main__":
+    main()
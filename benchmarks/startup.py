@@ -0,0 +1,146 @@
+"""
+Cold-start cost of a worker: how long `import main` takes in a fresh interpreter
+(and which imports dominate), and how long a freshly spawned server (benchmarks.serve,
+against local fakes) needs before it answers, and before its first stock requests,
+with and without the cache warm-up:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --skip-server
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.load_test import Client, free_port
+
+HEAVY_MODULES = ["pandas", "yfinance", "bs4", "feedparser", "selectolax", "torch", "transformers"]
+
+_IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+)
+
+
+def _child_env(**overrides: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(overrides)
+    return env
+
+
+def measure_import(runs: int) -> Dict[str, object]:
+    """Median wall time of `import main` over fresh interpreters, and the heavy modules it loaded"""
+    timings, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE], capture_output=True, text=True,
+                                check=True, env=_child_env()).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        loaded = result["loaded"]
+    return {
+        "median_ms": round(float(np.median(timings)) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "heavy_modules_loaded": loaded,
+    }
+
+
+def import_breakdown(top: int) -> List[Dict[str, object]]:
+    """Modules imported directly by main, by cumulative import time (from -X importtime)"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True,
+                            text=True, check=True, env=_child_env()).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name[1:]
+        # Direct imports of main are indented by exactly two spaces
+        if name.startswith("   ") or not name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        rows.append({"module": name.strip(), "ms": round(int(cumulative) / 1000, 1)})
+    return sorted(rows, key=lambda row: row["ms"], reverse=True)[:top]
+
+
+def _timed(client: Client, path: str) -> Optional[float]:
+    started = time.perf_counter()
+    status, _ = client.request("GET", path)
+    return round((time.perf_counter() - started) * 1000, 1) if status == 200 else None
+
+
+def measure_server(warmup: bool, settle: float, timeout: float) -> Dict[str, object]:
+    """Spawn-to-first-200 on /, then the latency of the first stock requests"""
+    port = free_port()
+    usage_file = os.path.join(tempfile.mkdtemp(prefix="bench-usage-"), "symbol_usage.json")
+    with open(usage_file, "w") as handle:
+        json.dump({"SBIN.NS": 40, "TATAMOTORS.NS": 25}, handle)  # A previous run's favourites
+    env = _child_env(CACHE_WARMUP="true" if warmup else "false", SYMBOL_USAGE_FILE=usage_file)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.serve", "--port", str(port)], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = Client(f"http://127.0.0.1:{port}", timeout=30)
+    try:
+        ready = None
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"benchmarks.serve exited with code {server.returncode}")
+            try:
+                if client.request("GET", "/")[0] == 200:
+                    ready = time.perf_counter() - started
+                    break
+            except Exception:
+                time.sleep(0.01)
+        if ready is None:
+            raise RuntimeError("Server did not become ready")
+        time.sleep(settle)
+        return {
+            "warmup": warmup,
+            "ready_ms": round(ready * 1000, 1),
+            "first_stock_ms": _timed(client, "/api/stocks/RELIANCE.NS"),
+            "first_favourite_ms": _timed(client, "/api/stocks/SBIN.NS"),
+            "first_popular_ms": _timed(client, "/api/stocks/popular/indian"),
+        }
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters for the import timing")
+    parser.add_argument("--top", type=int, default=10, help="Imports listed in the breakdown")
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Seconds between readiness and the first stock request (time for the warm-up)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--skip-server", action="store_true", help="Only measure the import")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report: Dict[str, object] = {"import": measure_import(args.runs), "import_breakdown": import_breakdown(args.top)}
+    print(f"import main: median {report['import']['median_ms']} ms, min {report['import']['min_ms']} ms; "
+          f"heavy modules loaded: {', '.join(report['import']['heavy_modules_loaded']) or 'none'}")
+    for row in report["import_breakdown"]:
+        print(f"  {row['module']:<40} {row['ms']:>8} ms")
+
+    if not args.skip_server:
+        report["server"] = [measure_server(warmup, args.settle, args.timeout) for warmup in (False, True)]
+        print(f"{'warm-up':<8} {'ready ms':>9} {'stock ms':>9} {'fav ms':>9} {'popular ms':>11}")
+        for row in report["server"]:
+            print(f"{'on' if row['warmup'] else 'off':<8} {row['ready_ms']:>9} {row['first_stock_ms']!s:>9} "
+                  f"{row['first_favourite_ms']!s:>9} {row['first_popular_ms']!s:>11}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -123,21 +123,37 @@ def get_stock_news(symbol):
         return f"Error: {str(e)}"
 
 def ask_llm(symbol, question):
-    """Ask a question about a stock to the LLM"""
-    time.sleep(0.1)  # Small delay to ensure loading indicator appears
+    """Ask a question about a stock to the LLM, yielding the answer as it streams in"""
+    answer = ""
     try:
-        response = requests.post(
-            f"{API_URL}/llm-query",
-            json={"symbol": symbol, "question": question}
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        if data["success"] and "data" in data and "answer" in data["data"]:
-            return data["data"]["answer"]
-        return "No answer available"
+        with requests.post(
+            f"{API_URL}/llm-query/stream",
+            json={"symbol": symbol, "question": question},
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            event = "message"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    event = "message"
+                    continue
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+                payload = json.loads(line[len("data:"):].strip() or "{}")
+                if event == "error":
+                    yield payload.get("error", "No answer available")
+                    return
+                if event == "done":
+                    break
+                answer += payload.get("token", "")
+                yield answer
+        if not answer:
+            yield "No answer available"
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
 # Create Gradio interface
 with gr.Blocks(title="Market Mentor") as demo:
@@ -153,7 +169,7 @@ with gr.Blocks(title="Market Mentor") as demo:
             with gr.Column(scale=3):
                 stock_symbol_input = gr.Textbox(
                     label="Stock Symbol (e.g., RELIANCE.NS, TCS.NS, INFY.NS)",
-                    placeholder="Enter stock symbol...",
+                    placeholder="Enter stock symbol or company name...",
                     value=""
                 )
             with gr.Column(scale=1):
@@ -229,7 +245,7 @@ with gr.Blocks(title="Market Mentor") as demo:
             with gr.Column(scale=3):
                 news_symbol_input = gr.Textbox(
                     label="Stock Symbol (e.g., RELIANCE.NS, TCS.NS, INFY.NS)",
-                    placeholder="Enter stock symbol...",
+                    placeholder="Enter stock symbol or company name...",
                     value=""
                 )
             with gr.Column(scale=1):
@@ -263,7 +279,7 @@ with gr.Blocks(title="Market Mentor") as demo:
             with gr.Column():
                 ask_symbol_input = gr.Textbox(
                     label="Stock Symbol (e.g., RELIANCE.NS, TCS.NS, INFY.NS)",
-                    placeholder="Enter stock symbol...",
+                    placeholder="Enter stock symbol or company name...",
                     value=""
                 )
                 ask_question_input = gr.Textbox(
@@ -276,8 +292,9 @@ with gr.Blocks(title="Market Mentor") as demo:
         ask_output = gr.Markdown(value="", visible=True)
         
         def update_llm_answer(symbol, question):
-            result = ask_llm(symbol, question)
-            return result, result  # Return for both display and state
+            # Render the answer incrementally as tokens arrive
+            for result in ask_llm(symbol, question):
+                yield result, result  # Return for both display and state
         
         ask_btn.click(
             fn=update_llm_answer,
@@ -1,13 +1,84 @@
-from fastapi import FastAPI
-from app.routes import stock, news, llm
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from app.configs import active_config
+from app.routes import stock, news, llm, symbols, system, portfolio
+from app.services.news_ingestion import start_ingestion, stop_ingestion
+from app.services.price_stream import price_stream
+from app.services.symbol_master import check_symbol
+from app.services.warmup import symbol_usage, warm_caches
+from app.utils.cache import get_l2
+from app.utils.executors import run_blocking, shutdown_executors
+from app.utils.metrics import counter, gauge, histogram, render_prometheus
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect to the shared cache (if configured) off the event loop, before the first request needs it
+    await run_blocking("redis", get_l2)
+    # Poll RSS feeds in the background so /api/news is a plain index lookup
+    if active_config.NEWS_INGESTION_ENABLED:
+        start_ingestion()
+    symbol_usage.load(active_config.SYMBOL_USAGE_FILE)
+    # Warm in the background: the worker accepts requests at once, and the warm-up absorbs the heavy imports
+    warmup = asyncio.create_task(warm_caches()) if active_config.CACHE_WARMUP_ENABLED else None
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    symbol_usage.save(active_config.SYMBOL_USAGE_FILE)
+    await stop_ingestion()
+    price_stream.stop()
+    shutdown_executors()
 
 app = FastAPI(title="Market Mentor API",
              description="API for Indian stock market research and analysis",
-             version="1.0.0")
+             version="1.0.0",
+             lifespan=lifespan)
 
 app.include_router(stock.router, prefix="/api", tags=["Stocks"])
 app.include_router(news.router, prefix="/api", tags=["News"])
 app.include_router(llm.router, prefix="/api", tags=["LLM"])
+app.include_router(symbols.router, prefix="/api", tags=["Symbols"])
+app.include_router(portfolio.router, prefix="/api", tags=["Portfolio"])
+app.include_router(system.router, prefix="/api", tags=["System"])
+
+REQUEST_LATENCY = histogram("http_request_duration_seconds", "HTTP request latency by route",
+                            labelnames=("method", "route", "status"))
+REQUESTS_IN_FLIGHT = gauge("http_requests_in_flight", "HTTP requests currently being handled")
+REQUEST_ERRORS = counter("http_request_errors_total", "Requests that raised an unhandled exception",
+                         labelnames=("method", "route"))
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        symbol = request.path_params.get("symbol")
+        if symbol and status < 400:
+            ticker = check_symbol(symbol)
+            if ticker:
+                symbol_usage.record(ticker)
+        return response
+    except Exception:
+        REQUEST_ERRORS.labels(request.method, _route_label(request)).inc()
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        REQUEST_LATENCY.labels(request.method, _route_label(request), status).observe(time.perf_counter() - started)
+
+def _route_label(request: Request) -> str:
+    # Route template (e.g. /api/stocks/{symbol}) keeps the label set bounded
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
 
 @app.get("/")
 async def root():